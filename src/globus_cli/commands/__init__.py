@@ -2,7 +2,10 @@ from globus_cli.commands.bookmark import bookmark_command
 from globus_cli.commands.cli_profile_list import cli_profile_list
 from globus_cli.commands.collection import collection_command
 from globus_cli.commands.delete import delete_command
+from globus_cli.commands.diff import diff_command
+from globus_cli.commands.du import du_command
 from globus_cli.commands.endpoint import endpoint_command
+from globus_cli.commands.find import find_command
 from globus_cli.commands.get_identities import get_identities_command
 from globus_cli.commands.group import group_command
 from globus_cli.commands.list_commands import list_commands
@@ -46,6 +49,9 @@ main.add_command(whoami_command)
 
 main.add_command(get_identities_command)
 main.add_command(ls_command)
+main.add_command(du_command)
+main.add_command(find_command)
+main.add_command(diff_command)
 main.add_command(mkdir_command)
 main.add_command(rename_command)
 main.add_command(delete_command)
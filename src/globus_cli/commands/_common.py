@@ -1,17 +1,330 @@
 import sys
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 import click
 
-from globus_cli.termio import FORMAT_SILENT, formatted_print
+from globus_cli.parsing import BatchDeduplicator
+from globus_cli.termio import FORMAT_SILENT, FORMAT_TEXT_RECORD, formatted_print
 
-from ..services.transfer import CustomTransferClient
+from ..services.polling import PollingSchedule, task_progress
+from ..services.transfer import (
+    BatchSummary,
+    CustomTransferClient,
+    JournalMismatchError,
+    SubmissionJournal,
+    TaskShards,
+)
+
+
+def join_listing_path(start_path: Optional[str], rel_path: str) -> str:
+    """
+    Join the start path of a recursive listing with the relative path of something
+    found in it, for display. If the listing started in the endpoint's default
+    directory, the result is relative to ".".
+    """
+    if not rel_path:
+        return start_path or "."
+    return (start_path.rstrip("/") if start_path else ".") + "/" + rel_path
+
+
+def dedupe_batch_items(
+    items: Iterable[Dict[str, Any]],
+    path_keys: Sequence[str],
+    *,
+    is_recursive: Callable[[Dict[str, Any]], bool],
+    can_fold: Callable[[Dict[str, Any]], bool] = lambda item: True,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Read all of the items of a batch, and yield them without the redundant ones,
+    as for `--dedupe`. The number of items dropped is printed to stderr.
+    """
+    dedupe = BatchDeduplicator(path_keys, is_recursive=is_recursive, can_fold=can_fold)
+    for item in items:
+        dedupe.add(item)
+    yield from dedupe
+    if dedupe.duplicate_count or dedupe.folded_count:
+        click.echo(
+            f"--dedupe dropped {dedupe.duplicate_count} duplicate items and "
+            f"{dedupe.folded_count} items covered by recursive items",
+            err=True,
+        )
+
+
+def print_batch_summary(
+    summary: BatchSummary,
+    document: Dict[str, Any],
+    path_fields: Sequence[Tuple[str, str]],
+) -> None:
+    """
+    Print the summary of the items of a task document, as for `--dry-run-summary`.
+
+    :param summary: The summary, which was used as the ``DATA`` of the document
+    :param document: The task document, as a dict
+    :param path_fields: (name, key) pairs for the paths in the items
+    """
+
+    def parent_directories(key: str) -> Callable[[Dict[str, Any]], int]:
+        return lambda data: data["parent_directories"][key]
+
+    formatted_print(
+        summary.summarize(document),
+        text_format=FORMAT_TEXT_RECORD,
+        fields=(
+            ("Items", "items"),
+            ("Recursive Items", "recursive_items"),
+            ("Duplicate Items", "duplicate_items"),
+            *(
+                (f"{name} Parent Directories", parent_directories(key))
+                for name, key in path_fields
+            ),
+            ("Tasks", "tasks"),
+            ("Request Bytes", "payload_bytes"),
+            ("Exact Counts", "exact"),
+        ),
+    )
+
+
+def check_journal_options(
+    journal: Optional[str],
+    resume_journal: bool,
+    max_items_per_task: Optional[int],
+    dry_run: bool,
+) -> None:
+    if resume_journal and not journal:
+        raise click.UsageError("--resume-journal requires --journal")
+    if journal and not max_items_per_task:
+        raise click.UsageError("--journal can only be used with --max-items-per-task")
+    if journal and dry_run:
+        raise click.UsageError("--journal cannot be used with --dry-run")
+
+
+def shard_settings(
+    command: str, new_task: Callable[[str], Any], max_items_per_task: int
+) -> Dict[str, Any]:
+    """
+    The settings of a sharded submission which must match for its journal to be
+    resumed: the command, the shard size, and every field of the task documents
+    except for the items and the submission ID, which differ between shards.
+    """
+    # the submission ID is left out, so a placeholder saves fetching a real one
+    task = new_task("-")
+    return {
+        "command": command,
+        "max_items_per_task": max_items_per_task,
+        "task": {
+            key: value
+            for key, value in task.data.items()
+            if key not in ("DATA", "submission_id")
+        },
+    }
+
+
+def start_submission_journal(
+    journal: Optional[str], resume_journal: bool, settings: Dict[str, Any]
+) -> Optional[SubmissionJournal]:
+    """
+    Start the journal of a sharded submission, if one was requested, resuming from
+    the file if requested.
+    """
+    if not journal:
+        return None
+    submission_journal = SubmissionJournal(journal, resume=resume_journal)
+    try:
+        submission_journal.start(settings)
+    except JournalMismatchError as err:
+        raise click.UsageError(f"cannot --resume-journal: {err}")
+    return submission_journal
+
+
+def submit_task_shards(shards: TaskShards, items: Iterable[Dict[str, Any]]) -> None:
+    """
+    Add items to a sharded task submission as they are read, and print the manifest
+    of the submitted tasks.
+
+    If using text output, the task IDs are printed one per line as each task is
+    submitted. If reading the items fails after some tasks were submitted, the
+    IDs of those tasks are printed to stderr before the error is raised, so that
+    they are never lost.
+
+    The journal of the shards, if any, is closed once the submission is done.
+    """
+    submitted: List[str] = []
+
+    def manifest() -> Iterator[Dict[str, Any]]:
+        try:
+            for item in items:
+                for entry in shards.add_item(**item):
+                    submitted.append(entry["task_id"])
+                    yield entry
+            for entry in shards.flush():
+                submitted.append(entry["task_id"])
+                yield entry
+        except Exception:
+            # submissions which were in flight may still have succeeded
+            submitted.extend(entry["task_id"] for entry in shards.close())
+            if submitted:
+                click.echo(
+                    f"{len(submitted)} tasks were submitted before this error: "
+                    + ", ".join(submitted),
+                    err=True,
+                )
+            raise
+
+    def print_task_ids(entries):
+        for entry in entries:
+            click.echo(entry["task_id"])
+
+    try:
+        formatted_print(
+            manifest(),
+            text_format=print_task_ids,
+            json_converter=lambda entries: {"DATA": list(entries)},
+        )
+    except JournalMismatchError as err:
+        raise click.UsageError(f"cannot --resume-journal: {err}")
+    finally:
+        if shards.journal is not None:
+            shards.journal.close()
+
+
+# the number of task IDs in each task_list filter query
+TASK_LIST_BATCH_SIZE = 50
+
+SLEEPY_CAT = r"""
+   |\      _,,,---,,_
+   /,`.-'`'    -.  ;-;;,_
+  |,4-  ) )-,_..;\ (  `'-'
+ '---''(_/--'  `-'\_)"""
+
+AWAKE_CAT = r"""
+                  _..
+  /}_{\           /.-'
+ ( a a )-.___...-'/
+ ==._.==         ;
+      \ i _..._ /,
+      {_;/   {_//"""
+
+
+def poll_tasks(
+    transfer_client: CustomTransferClient, task_ids: Sequence[str]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Get the documents of several tasks, by task ID, with as few calls as possible.
+
+    Tasks are fetched in batches with `task_id` filters on the task list. Any task
+    which is not in the task list is fetched on its own, so that an unknown task ID
+    raises an error rather than being waited on forever.
+    """
+    tasks: Dict[str, Dict[str, Any]] = {}
+    for start in range(0, len(task_ids), TASK_LIST_BATCH_SIZE):
+        batch = task_ids[start : start + TASK_LIST_BATCH_SIZE]
+        res = transfer_client.task_list(
+            filter={"task_id": list(batch)}, limit=len(batch)
+        )
+        for task in res:
+            tasks[task["task_id"]] = dict(task)
+    for task_id in task_ids:
+        if task_id not in tasks:
+            tasks[task_id] = transfer_client.get_task(task_id).data
+    return tasks
+
+
+def transfer_tasks_wait_with_io(
+    transfer_client: CustomTransferClient,
+    meow,
+    heartbeat,
+    polling: PollingSchedule,
+    timeout,
+    task_ids: Sequence[str],
+    timeout_exit_code,
+    wait_for_any: bool = False,
+) -> None:
+    """
+    Wait for several tasks at once, as for `globus task wait` on many task IDs.
+
+    All of the unfinished tasks are polled together, on the polling schedule. The
+    wait ends when all of the tasks have finished, or with `wait_for_any`, when
+    any of them has. The outcome of each task is printed to stderr as it finishes,
+    and with JSON output, the documents of all of the tasks are printed at the end.
+
+    Exits with status 1 if any finished task did not succeed, or with
+    `timeout_exit_code` if the wait timed out. It *does exit* on behalf of the
+    caller.
+    """
+    if meow:
+        click.echo(SLEEPY_CAT, err=True)
+
+    tasks: Dict[str, Dict[str, Any]] = {}
+    pending = list(task_ids)
+    waited_time = 0
+    # whether heartbeats have been printed since the last newline
+    beating = False
+    while True:
+        tasks.update(poll_tasks(transfer_client, pending))
+        for task_id in pending:
+            if tasks[task_id]["status"] != "ACTIVE":
+                if beating:
+                    click.echo("", err=True)
+                    beating = False
+                click.echo(f"{task_id}: {tasks[task_id]['status']}", err=True)
+        pending = [
+            task_id for task_id in pending if tasks[task_id]["status"] == "ACTIVE"
+        ]
+
+        finished = len(task_ids) - len(pending)
+        if not pending or (wait_for_any and finished):
+            break
+        if timeout is not None and waited_time >= timeout:
+            break
+
+        if heartbeat:
+            click.echo(".", err=True, nl=False)
+            sys.stderr.flush()
+            beating = True
+        interval = polling.next_interval(
+            tuple(task_progress(tasks[task_id]) for task_id in pending),
+            remaining=None if timeout is None else timeout - waited_time,
+        )
+        time.sleep(interval)
+        waited_time += interval
+
+    if beating:
+        click.echo("", err=True)
+    if meow and finished:
+        click.echo(AWAKE_CAT, err=True)
+
+    # output json if requested, but nothing for text mode
+    formatted_print(
+        {"DATA": [tasks[task_id] for task_id in task_ids]}, text_format=FORMAT_SILENT
+    )
+
+    if any(task["status"] not in ("ACTIVE", "SUCCEEDED") for task in tasks.values()):
+        click.get_current_context().exit(1)
+    if pending and not (wait_for_any and finished):
+        click.echo(
+            f"{len(pending)} tasks have yet to complete after {timeout} seconds",
+            err=True,
+        )
+        click.get_current_context().exit(timeout_exit_code)
+    click.get_current_context().exit(0)
 
 
 def transfer_task_wait_with_io(
     transfer_client: CustomTransferClient,
     meow,
     heartbeat,
-    polling_interval,
+    polling: PollingSchedule,
     timeout,
     task_id,
     timeout_exit_code,
@@ -31,69 +344,43 @@ def transfer_task_wait_with_io(
         else:
             return waited_time >= timeout
 
-    def check_completed():
-        completed = transfer_client.task_wait(
-            task_id, timeout=polling_interval, polling_interval=polling_interval
-        )
-        if completed:
-            if heartbeat:
-                click.echo("", err=True)
-            # meowing tasks wake up!
-            if meow:
-                click.echo(
-                    r"""
-                  _..
-  /}_{\           /.-'
- ( a a )-.___...-'/
- ==._.==         ;
-      \ i _..._ /,
-      {_;/   {_//""",
-                    err=True,
-                )
-
-            # TODO: possibly update TransferClient.task_wait so that we don't
-            # need to do an extra fetch to get the task status after completion
-            res = transfer_client.get_task(task_id)
-            formatted_print(res, text_format=FORMAT_SILENT)
-
-            status = res["status"]
-            if status == "SUCCEEDED":
-                click.get_current_context().exit(0)
-            else:
-                click.get_current_context().exit(1)
-
-        return completed
-
     # Tasks start out sleepy
     if meow:
-        click.echo(
-            r"""
-   |\      _,,,---,,_
-   /,`.-'`'    -.  ;-;;,_
-  |,4-  ) )-,_..;\ (  `'-'
- '---''(_/--'  `-'\_)""",
-            err=True,
-        )
+        click.echo(SLEEPY_CAT, err=True)
 
+    # the last poll is used for the outcome and the output, so that the task is
+    # never fetched again once the wait is over
     waited_time = 0
-    while not timed_out(waited_time) and not check_completed():
+    while True:
+        task = transfer_client.get_task(task_id)
+        if task["status"] != "ACTIVE" or timed_out(waited_time):
+            break
+
         if heartbeat:
             click.echo(".", err=True, nl=False)
             sys.stderr.flush()
 
-        waited_time += polling_interval
+        interval = polling.next_interval(
+            task_progress(task.data),
+            remaining=None if timeout is None else timeout - waited_time,
+        )
+        time.sleep(interval)
+        waited_time += interval
 
-    # add a trailing newline to heartbeats if we fail
+    # add a trailing newline to heartbeats
     if heartbeat:
         click.echo("", err=True)
 
-    exit_code = 1
-    if timed_out(waited_time):
+    if task["status"] != "ACTIVE":
+        # meowing tasks wake up!
+        if meow:
+            click.echo(AWAKE_CAT, err=True)
+        exit_code = 0 if task["status"] == "SUCCEEDED" else 1
+    else:
         click.echo(f"Task has yet to complete after {timeout} seconds", err=True)
         exit_code = timeout_exit_code
 
     # output json if requested, but nothing for text mode
-    res = transfer_client.get_task(task_id)
-    formatted_print(res, text_format=FORMAT_SILENT)
+    formatted_print(task, text_format=FORMAT_SILENT)
 
     click.get_current_context().exit(exit_code)
@@ -1,22 +1,96 @@
+import functools
+from typing import Any, Dict, Iterable, Iterator, Optional
+
 import click
 from globus_sdk import DeleteData
 
-from globus_cli import utils
 from globus_cli.login_manager import LoginManager
 from globus_cli.parsing import (
     ENDPOINT_PLUS_OPTPATH,
-    TaskPath,
+    BatchLineParser,
+    batch_dedupe_option,
     command,
     delete_and_rm_options,
+    dry_run_summary_option,
+    listing_cache_options,
+    rate_limit_options,
+    resolve_task_path,
+    task_sharding_options,
     task_submission_options,
 )
-from globus_cli.services.transfer import autoactivate
+from globus_cli.services.rate_limit import RateLimiter
+from globus_cli.services.transfer import (
+    BatchSummary,
+    CompactItemList,
+    GlobExpander,
+    ListingCache,
+    TaskShards,
+    autoactivate,
+)
 from globus_cli.termio import (
     FORMAT_TEXT_RECORD,
     err_is_terminal,
     formatted_print,
     term_is_interactive,
 )
+from globus_cli.utils import format_size
+
+from ._common import (
+    check_journal_options,
+    dedupe_batch_items,
+    print_batch_summary,
+    shard_settings,
+    start_submission_journal,
+    submit_task_shards,
+)
+
+
+def _expand_globs(
+    expander: GlobExpander, lines: Iterable[Dict[str, Any]], ignore_missing: bool
+) -> Iterator[Dict[str, Any]]:
+    for line in lines:
+        matched = False
+        for item in expander.expand(line["path"]):
+            matched = True
+            yield dict(line, path=item["path"])
+        if not (matched or ignore_missing):
+            raise click.ClickException(f'No paths match "{line["path"]}"')
+
+
+def _describe_matches(expander: GlobExpander) -> str:
+    return (
+        f"{expander.file_count} files ({format_size(expander.total_bytes)}) and "
+        f"{expander.dir_count} directories"
+    )
+
+
+def _expand_and_confirm(
+    expander: GlobExpander,
+    lines: Iterable[Dict[str, Any]],
+    *,
+    ignore_missing: bool,
+    confirm: bool,
+) -> CompactItemList:
+    """
+    Expand all of the lines before anything is submitted, report what matched,
+    and if ``confirm`` is set and stderr is interactive, ask before going on.
+    """
+    matches = CompactItemList()
+    for line in _expand_globs(expander, lines, ignore_missing):
+        matches.append(line)
+    click.echo(f"--expand-globs matched {_describe_matches(expander)}", err=True)
+    if (
+        confirm
+        and err_is_terminal()
+        and term_is_interactive()
+        and not click.confirm(
+            f"Are you sure you want to delete {_describe_matches(expander)}?",
+            err=True,
+        )
+    ):
+        click.echo("Aborted.", err=True)
+        click.get_current_context().exit(1)
+    return matches
 
 
 @command(
@@ -64,12 +138,36 @@ $ globus task wait "$task_id"
 """,
 )
 @task_submission_options
+@dry_run_summary_option
 @delete_and_rm_options
+@task_sharding_options
+@batch_dedupe_option
+@click.option(
+    "--expand-globs",
+    is_flag=True,
+    help=(
+        "Expand *, ?, and [ ] characters in any component of the paths by "
+        "listing the endpoint, and delete the paths which match. The number and "
+        "size of the matching files are shown before the task is submitted"
+    ),
+)
+@click.option(
+    "--parallel",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    metavar="N",
+    help="With --expand-globs, list up to N directories at a time",
+)
+@rate_limit_options
+@listing_cache_options
 @click.argument("endpoint_plus_path", type=ENDPOINT_PLUS_OPTPATH)
 @LoginManager.requires_login(LoginManager.TRANSFER_RS)
 def delete_command(
     *,
     login_manager: LoginManager,
+    rate_limiter: RateLimiter,
+    listing_cache: Optional[ListingCache],
     batch,
     ignore_missing,
     star_silent,
@@ -79,9 +177,17 @@ def delete_command(
     label,
     submission_id,
     dry_run,
+    dry_run_summary,
     deadline,
     skip_activation_check,
     notify,
+    max_items_per_task,
+    parallel_submissions,
+    journal,
+    resume_journal,
+    dedupe,
+    expand_globs,
+    parallel,
 ):
     """
     Submits an asynchronous task that deletes files and/or directories on the target
@@ -117,69 +223,166 @@ def delete_command(
     Batch only requires an ENDPOINT on the "base" command, but you may pass an
     ENPDOINT:PATH to prefix all the paths read in the batch with that path.
 
+    Very large batches can be split into several tasks with
+    `--max-items-per-task N`. A task is submitted for every N lines as the batch
+    is read, and the IDs of the tasks are printed as they are submitted.
+
+    With `--journal FILE`, each of these tasks is recorded in FILE before it is
+    submitted and once it is accepted. If the submission is interrupted, run
+    the same command again with `--resume-journal` to submit only the tasks
+    which were not accepted, without risk of submitting any task twice.
+
+    With `--dedupe`, duplicate lines are dropped, and with `--recursive`, so are
+    lines for paths under a directory which is already being deleted.
+
+    === Glob Expansion
+
+    With `--expand-globs`, paths may have *, ?, and [ ] characters in any of their
+    components, like `/data/2020-*/logs/*.tmp`, and are expanded on the CLI by
+    listing only the directories which can match. The task is submitted with the
+    matching paths, so it can be previewed with `--dry-run` or
+    `--dry-run-summary`, and split with `--max-items-per-task`. As in a shell, a
+    wildcard does not match a leading '.', and a backslash escapes the character
+    after it. A pattern which matches nothing is an error unless
+    `--ignore-missing` is given. All of the paths are expanded before any task
+    is submitted, and if stderr is a terminal, the number and size of the
+    matches are shown for confirmation, unless `-f` is given.
+
     {AUTOMATIC_ACTIVATION}
     """
     endpoint_id, path = endpoint_plus_path
     if path is None and (not batch):
         raise click.UsageError("delete requires either a PATH OR --batch")
+    if max_items_per_task and not batch:
+        raise click.UsageError("--max-items-per-task can only be used with --batch")
+    if dedupe and not batch:
+        raise click.UsageError("--dedupe can only be used with --batch")
+    if expand_globs and enable_globs:
+        raise click.UsageError("--expand-globs cannot be used with --enable-globs")
+    if max_items_per_task and submission_id:
+        raise click.UsageError(
+            "You cannot use --submission-id with --max-items-per-task, "
+            "because each task gets its own submission ID"
+        )
+    # a summary is a dry run too
+    dry_run = dry_run or dry_run_summary
+    check_journal_options(journal, resume_journal, max_items_per_task, dry_run)
 
     transfer_client = login_manager.get_transfer_client()
+    transfer_client.rate_limiter = rate_limiter
+    expander = (
+        GlobExpander(
+            transfer_client, endpoint_id, parallelism=parallel, cache=listing_cache
+        )
+        if expand_globs
+        else None
+    )
 
     # attempt to activate unless --skip-activation-check is given
     if not skip_activation_check:
         autoactivate(transfer_client, endpoint_id, if_expires_in=60)
 
-    delete_data = DeleteData(
-        transfer_client,
-        endpoint_id,
-        label=label,
-        recursive=recursive,
-        submission_id=submission_id,
-        deadline=deadline,
-        additional_fields={
-            "ignore_missing": ignore_missing,
-            "skip_activation_check": skip_activation_check,
-            "interpret_globs": enable_globs,
-            **notify,
-        },
-    )
+    def new_delete_data(submission_id: Optional[str] = None) -> DeleteData:
+        delete_data = DeleteData(
+            transfer_client,
+            endpoint_id,
+            label=label,
+            recursive=recursive,
+            submission_id=submission_id,
+            deadline=deadline,
+            additional_fields={
+                "ignore_missing": ignore_missing,
+                "skip_activation_check": skip_activation_check,
+                "interpret_globs": enable_globs,
+                **notify,
+            },
+        )
+        # a batch may have millions of items, so store them compactly, or only
+        # summarize them
+        if dry_run_summary:
+            delete_data["DATA"] = BatchSummary(
+                ("path",), max_items_per_task=max_items_per_task
+            )
+        else:
+            delete_data["DATA"] = CompactItemList()
+        return delete_data
 
     if batch:
-        # although this sophisticated structure (like that in transfer)
-        # isn't strictly necessary, it gives us the ability to add options in
-        # the future to these lines with trivial modifications
-        @click.command()
-        @click.argument("path", type=TaskPath(base_dir=path))
-        def process_batch_line(path):
-            """
-            Parse a line of batch input and add it to the delete submission
-            item.
-            """
-            delete_data.add_item(str(path))
-
-        utils.shlex_process_stream(process_batch_line, batch)
+        # although this structure (like that in transfer) isn't strictly
+        # necessary, it gives us the ability to add options in the future to
+        # these lines with trivial modifications
+        batch_parser = BatchLineParser(
+            ("path",),
+            convert={"path": functools.partial(resolve_task_path, base_dir=path)},
+        )
+        lines: Iterable[Dict[str, Any]] = batch_parser.parse(batch)
+        if expander is not None:
+            lines = _expand_and_confirm(
+                expander,
+                lines,
+                ignore_missing=ignore_missing,
+                confirm=not (star_silent or dry_run),
+            )
+        if dedupe:
+            # without --recursive, a directory cannot cover the paths under it
+            lines = dedupe_batch_items(
+                lines, ("path",), is_recursive=lambda item: recursive
+            )
+        if max_items_per_task and not dry_run:
+            shards = TaskShards(
+                new_delete_data,
+                transfer_client.submit_delete,
+                max_items_per_task,
+                get_submission_id=lambda: transfer_client.get_submission_id()["value"],
+                parallelism=parallel_submissions,
+                journal=start_submission_journal(
+                    journal,
+                    resume_journal,
+                    shard_settings("delete", new_delete_data, max_items_per_task),
+                ),
+            )
+            submit_task_shards(shards, lines)
+            return
+
+        delete_data = new_delete_data(submission_id)
+        for line in lines:
+            delete_data.add_item(line["path"])
     else:
-        if not star_silent and enable_globs and path.endswith("*"):
-            # not intuitive, but `click.confirm(abort=True)` prints to stdout
-            # unnecessarily, which we don't really want...
-            # only do this check if stderr is a pty
-            if (
-                err_is_terminal()
-                and term_is_interactive()
-                and not click.confirm(
-                    'Are you sure you want to delete all files matching "{}"?'.format(
-                        path
-                    ),
-                    err=True,
-                )
+        if expander is not None:
+            delete_data = new_delete_data(submission_id)
+            for line in _expand_and_confirm(
+                expander,
+                [{"path": path}],
+                ignore_missing=ignore_missing,
+                confirm=not (star_silent or dry_run),
             ):
-                click.echo("Aborted.", err=True)
-                click.get_current_context().exit(1)
-        delete_data.add_item(path)
+                delete_data.add_item(line["path"])
+        else:
+            if not star_silent and enable_globs and path.endswith("*"):
+                # not intuitive, but `click.confirm(abort=True)` prints to stdout
+                # unnecessarily, which we don't really want...
+                # only do this check if stderr is a pty
+                if (
+                    err_is_terminal()
+                    and term_is_interactive()
+                    and not click.confirm(
+                        f'Are you sure you want to delete all files matching "{path}"?',
+                        err=True,
+                    )
+                ):
+                    click.echo("Aborted.", err=True)
+                    click.get_current_context().exit(1)
+            delete_data = new_delete_data(submission_id)
+            delete_data.add_item(path)
 
+    if dry_run_summary:
+        print_batch_summary(delete_data["DATA"], delete_data.data, (("Path", "path"),))
+        return
     if dry_run:
         formatted_print(
-            delete_data.data, response_key="DATA", fields=[("Path", "path")]
+            dict(delete_data.data, DATA=list(delete_data["DATA"])),
+            response_key="DATA",
+            fields=[("Path", "path")],
         )
         # exit safely
         return
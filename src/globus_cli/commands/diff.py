@@ -0,0 +1,185 @@
+import shlex
+from typing import Any, Dict, Iterator, Optional
+
+import click
+
+from globus_cli.login_manager import LoginManager
+from globus_cli.parsing import (
+    ENDPOINT_PLUS_OPTPATH,
+    command,
+    listing_cache_options,
+    rate_limit_options,
+)
+from globus_cli.services.rate_limit import RateLimiter
+from globus_cli.services.transfer import ListingCache, TreeDiff, autoactivate
+from globus_cli.termio import formatted_print, outformat_is_text
+from globus_cli.utils import format_size
+
+
+@command(
+    "diff",
+    short_help="Compare directory trees on two endpoints",
+    adoc_examples="""Show what a sync from one directory to another would transfer:
+
+[source,bash]
+----
+$ source_ep=ddb59aef-6d04-11e5-ba46-22000b92c6ec
+$ dest_ep=ddb59af0-6d04-11e5-ba46-22000b92c6ec
+$ globus diff $source_ep:/share/godata/ $dest_ep:~/godata/
+----
+
+Write a batch of the new and changed files, and transfer only those:
+
+[source,bash]
+----
+$ globus diff $source_ep:/share/godata/ $dest_ep:~/godata/ --batch delta.txt
+$ globus transfer $source_ep:/share/godata/ $dest_ep:~/godata/ --batch delta.txt
+----
+""",
+)
+@click.argument(
+    "source", metavar="SOURCE_ENDPOINT_ID[:SOURCE_PATH]", type=ENDPOINT_PLUS_OPTPATH
+)
+@click.argument(
+    "destination", metavar="DEST_ENDPOINT_ID[:DEST_PATH]", type=ENDPOINT_PLUS_OPTPATH
+)
+@click.option(
+    "--sync-level",
+    "-s",
+    default="mtime",
+    show_default=True,
+    type=click.Choice(("exists", "size", "mtime"), case_sensitive=False),
+    help=(
+        "How to decide if a file on both endpoints has changed, as with "
+        "`globus transfer --sync-level`"
+    ),
+)
+@click.option(
+    "--batch",
+    type=click.File("w"),
+    help=(
+        "Write the paths of the added and changed files to this file, in the "
+        "format read by `globus transfer --batch`. Use `-` to write to stdout, "
+        "which moves the text output to stderr"
+    ),
+)
+@click.option(
+    "--parallel",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    metavar="N",
+    help="List up to N directories at a time on each endpoint",
+)
+@rate_limit_options
+@listing_cache_options
+@LoginManager.requires_login(LoginManager.TRANSFER_RS)
+def diff_command(
+    *,
+    login_manager: LoginManager,
+    rate_limiter: RateLimiter,
+    listing_cache: Optional[ListingCache],
+    source,
+    destination,
+    sync_level,
+    batch,
+    parallel,
+):
+    """
+    Compare a directory tree on a source endpoint with a directory tree on a
+    destination endpoint, to plan a sync between them.
+
+    The two trees are listed together, and their contents are matched up by path.
+    Each difference is reported as soon as it is found, with one of these statuses:
+
+    - 'added': on the source, but not on the destination
+    - 'changed': on both, but different according to `--sync-level`
+    - 'missing': on the destination, but missing from the source
+    - 'conflict': on both, but a directory on one and not on the other
+
+    Only differences are reported. Directories which only exist on the
+    destination are reported without looking inside of them. Hidden files are
+    included.
+
+    With `--batch`, the added and changed files are written to a file which
+    `globus transfer --batch` can read. Paths in the batch are relative to the
+    given paths, so use the same paths when submitting the transfer. If the batch
+    is written to stdout, the differences are printed to stderr instead, and
+    only text output is allowed.
+
+    If using text output, each line holds a status, a size in bytes, and a path
+    relative to the given paths, separated by tabs. Directories are printed with
+    a trailing '/'. Totals are printed to stderr at the end.
+
+    {AUTOMATIC_ACTIVATION}
+    """
+    source_id, source_path = source
+    dest_id, dest_path = destination
+
+    # the batch and the differences must not be mixed together on stdout
+    batch_to_stdout = batch is not None and batch.name == "<stdout>"
+    if batch_to_stdout and not outformat_is_text():
+        raise click.UsageError("--batch - can only be used with text output")
+
+    transfer_client = login_manager.get_transfer_client()
+    autoactivate(transfer_client, source_id, if_expires_in=60)
+    autoactivate(transfer_client, dest_id, if_expires_in=60)
+    transfer_client.rate_limiter = rate_limiter
+
+    source_params: Dict[str, Any] = {"show_hidden": 1}
+    if source_path:
+        source_params["path"] = source_path
+    dest_params: Dict[str, Any] = {"show_hidden": 1}
+    if dest_path:
+        dest_params["path"] = dest_path
+
+    tree_diff = TreeDiff(
+        transfer_client,
+        source_id,
+        source_params,
+        dest_id,
+        dest_params,
+        sync_level=sync_level.lower(),
+        parallelism=parallel,
+        cache=listing_cache,
+    )
+
+    if batch is not None:
+        # the batch is only meaningful with the same paths, so note them
+        source_arg = shlex.quote(f"{source_id}:{source_path or ''}")
+        dest_arg = shlex.quote(f"{dest_id}:{dest_path or ''}")
+        batch_arg = "-" if batch_to_stdout else shlex.quote(batch.name)
+        click.echo(
+            f"# globus transfer {source_arg} {dest_arg} --batch {batch_arg}",
+            file=batch,
+        )
+
+    def differences() -> Iterator[Dict[str, Any]]:
+        for doc in tree_diff:
+            if (
+                batch is not None
+                and doc["status"] in ("added", "changed")
+                and doc["type"] != "dir"
+            ):
+                quoted = shlex.quote(doc["path"])
+                click.echo(f"{quoted} {quoted}", file=batch)
+            yield doc
+
+    def print_differences(docs):
+        # print as we go, so that differences stream out as the trees are listed
+        for doc in docs:
+            suffix = "/" if doc["type"] == "dir" else ""
+            click.echo(
+                f"{doc['status']}\t{doc['size']}\t{doc['path']}{suffix}",
+                err=batch_to_stdout,
+            )
+        summary = tree_diff.summary
+        for status in ("added", "changed", "missing", "conflict"):
+            files, size = summary[status]["files"], summary[status]["bytes"]
+            click.echo(f"{status}: {files} files, {format_size(size)}", err=True)
+
+    formatted_print(
+        differences(),
+        text_format=print_differences,
+        json_converter=lambda docs: {"DATA": list(docs), "summary": tree_diff.summary},
+    )
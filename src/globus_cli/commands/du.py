@@ -0,0 +1,145 @@
+import sys
+from typing import Any, Dict, Iterable, Optional
+
+import click
+
+from globus_cli.login_manager import LoginManager
+from globus_cli.parsing import (
+    ENDPOINT_PLUS_OPTPATH,
+    MutexInfo,
+    command,
+    listing_cache_options,
+    mutex_option_group,
+    rate_limit_options,
+)
+from globus_cli.services.rate_limit import RateLimiter
+from globus_cli.services.transfer import ListingCache, autoactivate
+from globus_cli.services.transfer.disk_usage import iter_disk_usage
+from globus_cli.termio import formatted_print
+from globus_cli.utils import format_size
+
+from ._common import join_listing_path
+
+
+@command(
+    "du",
+    short_help="Summarize disk usage under a directory on an endpoint",
+    adoc_examples="""Show the total size and number of files under a directory, and
+under each of its subdirectories:
+
+[source,bash]
+----
+$ ep_id=ddb59aef-6d04-11e5-ba46-22000b92c6ec
+$ globus du --max-depth 1 --human-readable $ep_id:/share/godata/
+----
+
+Show only the total for a directory, listing up to 8 directories at a time:
+
+[source,bash]
+----
+$ globus du -s --parallel 8 $ep_id:/share/godata/
+----
+""",
+)
+@click.argument("endpoint_plus_path", type=ENDPOINT_PLUS_OPTPATH)
+@click.option(
+    "--max-depth",
+    "-d",
+    type=click.IntRange(min=0),
+    metavar="N",
+    help=(
+        "Only print totals for directories up to N levels below the given "
+        "path. Deeper directories are still counted in the totals"
+    ),
+)
+@click.option(
+    "--summarize",
+    "-s",
+    is_flag=True,
+    help="Only print the total for the given path. Same as `--max-depth 0`",
+)
+@click.option(
+    "--human-readable",
+    is_flag=True,
+    help="For text output only. Print sizes with units, like 1.5K, 20M, or 3.2G",
+)
+@click.option(
+    "--parallel",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    metavar="N",
+    help="List up to N directories at a time",
+)
+@rate_limit_options
+@listing_cache_options
+@mutex_option_group(
+    "--summarize",
+    MutexInfo("--max-depth", present=lambda d: d.get("max_depth") is not None),
+)
+@LoginManager.requires_login(LoginManager.TRANSFER_RS)
+def du_command(
+    *,
+    login_manager: LoginManager,
+    rate_limiter: RateLimiter,
+    listing_cache: Optional[ListingCache],
+    endpoint_plus_path,
+    max_depth,
+    summarize,
+    human_readable,
+    parallel,
+):
+    """
+    Print the total size and number of files under a directory on an endpoint, and
+    under each of its subdirectories.
+
+    The whole tree under the directory is listed, and totals are added up as the
+    listings arrive. Each directory's totals are printed as soon as everything
+    under it has been listed, so subdirectories are printed before their parents
+    and the given path is printed last.
+
+    Sizes are the sum of the sizes of the files, and do not include the space
+    used by directories themselves. Hidden files are included.
+
+    If using text output, each line holds a size in bytes, a number of files, and
+    a path, separated by tabs.
+
+    {AUTOMATIC_ACTIVATION}
+    """
+    endpoint_id, path = endpoint_plus_path
+    if summarize:
+        max_depth = 0
+
+    transfer_client = login_manager.get_transfer_client()
+    autoactivate(transfer_client, endpoint_id, if_expires_in=60)
+    transfer_client.rate_limiter = rate_limiter
+
+    ls_params: Dict[str, Any] = {"show_hidden": 1}
+    if path:
+        ls_params["path"] = path
+
+    # the whole tree must be listed to get correct totals
+    res = transfer_client.recursive_operation_ls(
+        endpoint_id,
+        ls_params,
+        depth=sys.maxsize,
+        parallelism=parallel,
+        cache=listing_cache,
+    )
+
+    def usage_docs() -> Iterable[Dict[str, Any]]:
+        for doc in iter_disk_usage(res.listings(), max_depth=max_depth):
+            doc["path"] = join_listing_path(path, doc["path"])
+            yield doc
+
+    def print_usage(docs):
+        # print as we go, so that totals stream out as directories are completed
+        for doc in docs:
+            size = format_size(doc["size"]) if human_readable else doc["size"]
+            click.echo(f"{size}\t{doc['files']}\t{doc['path']}")
+
+    formatted_print(
+        usage_docs(),
+        text_format=print_usage,
+        json_converter=lambda docs: {"DATA": list(docs)},
+    )
@@ -0,0 +1,197 @@
+import sys
+from typing import Any, Dict, Iterator, Optional
+
+import click
+
+from globus_cli.login_manager import LoginManager
+from globus_cli.parsing import (
+    ENDPOINT_PLUS_OPTPATH,
+    NumericComparison,
+    command,
+    listing_cache_options,
+    rate_limit_options,
+)
+from globus_cli.services.rate_limit import RateLimiter
+from globus_cli.services.transfer import ListingCache, autoactivate
+from globus_cli.services.transfer.find import FindPredicates
+from globus_cli.termio import formatted_print
+
+from ._common import join_listing_path
+
+
+@command(
+    "find",
+    short_help="Search for files and directories on an endpoint",
+    adoc_examples="""Find all of the `.txt` files under a directory:
+
+[source,bash]
+----
+$ ep_id=ddb59aef-6d04-11e5-ba46-22000b92c6ec
+$ globus find $ep_id:/share/godata/ --name '*.txt'
+----
+
+Find files larger than 1GB which have not been modified in 30 days, without
+looking inside of any `.git` directories:
+
+[source,bash]
+----
+$ globus find $ep_id:/projects/ --type file --size +1G --mtime +30 --prune .git
+----
+""",
+)
+@click.argument("endpoint_plus_path", type=ENDPOINT_PLUS_OPTPATH)
+@click.option(
+    "--name",
+    "names",
+    multiple=True,
+    metavar="PATTERN",
+    help=(
+        "Only find items whose names match this glob pattern. "
+        "Give this option more than once to match any of several patterns"
+    ),
+)
+@click.option(
+    "--type",
+    "types",
+    multiple=True,
+    type=click.Choice(("file", "dir", "link")),
+    help=(
+        "Only find items of this type. 'link' finds broken symlinks, since the "
+        "Transfer service lists other symlinks as the files or directories they "
+        "point to. Give this option more than once to match any of several types"
+    ),
+)
+@click.option(
+    "--size",
+    "sizes",
+    multiple=True,
+    type=NumericComparison(units=NumericComparison.SIZE_UNITS, metavar="[+-]N[KMGTP]"),
+    help=(
+        "Only find items larger than (+N), smaller than (-N), or exactly (N) "
+        "this many bytes. Sizes may have a K, M, G, T, or P suffix"
+    ),
+)
+@click.option(
+    "--mtime",
+    "mtimes",
+    multiple=True,
+    type=NumericComparison(metavar="[+-]DAYS"),
+    help=(
+        "Only find items last modified more than (+N), less than (-N), or "
+        "exactly (N) days ago"
+    ),
+)
+@click.option(
+    "--mindepth",
+    "min_depth",
+    type=click.IntRange(min=0),
+    default=0,
+    metavar="N",
+    help="Only find items at least N levels below the given path",
+)
+@click.option(
+    "--maxdepth",
+    "max_depth",
+    type=click.IntRange(min=1),
+    metavar="N",
+    help=(
+        "Only find items at most N levels below the given path. Directories at "
+        "this depth are not listed"
+    ),
+)
+@click.option(
+    "--prune",
+    multiple=True,
+    metavar="PATTERN",
+    help=(
+        "Do not look inside of directories whose names match this glob pattern. "
+        "Give this option more than once to prune several patterns"
+    ),
+)
+@click.option(
+    "--parallel",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    metavar="N",
+    help="List up to N directories at a time",
+)
+@rate_limit_options
+@listing_cache_options
+@LoginManager.requires_login(LoginManager.TRANSFER_RS)
+def find_command(
+    *,
+    login_manager: LoginManager,
+    rate_limiter: RateLimiter,
+    listing_cache: Optional[ListingCache],
+    endpoint_plus_path,
+    names,
+    types,
+    sizes,
+    mtimes,
+    min_depth,
+    max_depth,
+    prune,
+    parallel,
+):
+    """
+    Search a directory tree on an endpoint for files and directories which match
+    all of the given conditions.
+
+    Conditions are checked on the CLI as the tree is listed. Use `--maxdepth`
+    and `--prune` to skip listing parts of the tree which are not of interest,
+    which can make a search much faster.
+
+    Hidden files are included. Depths count from the given path, so that the
+    items directly in it are at depth 1.
+
+    If using text output, the paths of matching items are printed one per line.
+    Directories are printed with a trailing '/'.
+
+    {AUTOMATIC_ACTIVATION}
+    """
+    endpoint_id, path = endpoint_plus_path
+    predicates = FindPredicates(
+        names=names,
+        types=types,
+        sizes=sizes,
+        mtimes=mtimes,
+        min_depth=min_depth,
+        max_depth=max_depth,
+        prune=prune,
+    )
+
+    transfer_client = login_manager.get_transfer_client()
+    autoactivate(transfer_client, endpoint_id, if_expires_in=60)
+    transfer_client.rate_limiter = rate_limiter
+
+    ls_params: Dict[str, Any] = {"show_hidden": 1}
+    if path:
+        ls_params["path"] = path
+
+    # depth is limited by the predicates, rather than by the listing
+    res = transfer_client.recursive_operation_ls(
+        endpoint_id,
+        ls_params,
+        depth=sys.maxsize,
+        parallelism=parallel,
+        descend=predicates.descend,
+        cache=listing_cache,
+    )
+
+    def matching_items() -> Iterator[Dict[str, Any]]:
+        for item in res:
+            if predicates.matches(item, item["name"].count("/") + 1):
+                item["path"] = join_listing_path(path, item["name"])
+                yield item
+
+    def print_paths(items):
+        # print as we go, so that results stream out during the search
+        for item in items:
+            click.echo(item["path"] + ("/" if item["type"] == "dir" else ""))
+
+    formatted_print(
+        matching_items(),
+        text_format=print_paths,
+        json_converter=lambda items: {"DATA": list(items)},
+    )
@@ -1,16 +1,23 @@
-from typing import Any, Dict, Union
+from typing import Any, Dict, Optional
 
 import click
-from globus_sdk.services.transfer.response import IterableTransferResponse
 
 from globus_cli.login_manager import LoginManager
-from globus_cli.parsing import ENDPOINT_PLUS_OPTPATH, command
+from globus_cli.parsing import (
+    ENDPOINT_PLUS_OPTPATH,
+    command,
+    listing_cache_options,
+    rate_limit_options,
+)
+from globus_cli.services.rate_limit import RateLimiter
 from globus_cli.services.transfer import (
-    RecursiveLsResponse,
+    CheckpointMismatchError,
+    ListingCache,
+    RecursiveLsCheckpoint,
     autoactivate,
     iterable_response_to_dict,
 )
-from globus_cli.termio import formatted_print, is_verbose, outformat_is_text
+from globus_cli.termio import FORMAT_TEXT_TABLE, formatted_print, is_verbose
 
 
 @command(
@@ -77,6 +84,24 @@ $ ep_id=ddb59aef-6d04-11e5-ba46-22000b92c6ec
 $ globus ls $ep_id:/share/godata/ | egrep '.*\.txt$'  # done with grep, okay
 $ globus ls $ep_id:/share/godata/ --filter '~*.txt'  # done with --filter, better
 ----
+
+=== Recursive Listings
+
+List a large directory tree recursively, listing up to 8 directories at a time:
+
+[source,bash]
+----
+$ ep_id=ddb59aef-6d04-11e5-ba46-22000b92c6ec
+$ globus ls -r --parallel 8 $ep_id:/share/godata/
+----
+
+Stream a recursive listing as JSON, one entry per line, so that other tools can
+process entries as they arrive:
+
+[source,bash]
+----
+$ globus ls -r -F jsonl $ep_id:/share/godata/ | jq -r 'select(.size > 0) | .name'
+----
 """,
 )
 @click.argument("endpoint_plus_path", type=ENDPOINT_PLUS_OPTPATH)
@@ -119,13 +144,68 @@ $ globus ls $ep_id:/share/godata/ --filter '~*.txt'  # done with --filter, bette
         "this should behave like a non-recursive `ls`"
     ),
 )
+@click.option(
+    "--parallel",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    metavar="N",
+    help=(
+        "In `--recursive` listings, list up to N directories at a time. "
+        "Results are printed in the order in which listings complete, unless "
+        "`--ordered` is given"
+    ),
+)
+@click.option(
+    "--ordered",
+    is_flag=True,
+    help=(
+        "In `--recursive` listings with `--parallel`, always print results in the "
+        "same order as a non-parallel listing"
+    ),
+)
+@click.option(
+    "--traversal",
+    default="dfs",
+    show_default=True,
+    type=click.Choice(("dfs", "bfs", "iddfs"), case_sensitive=False),
+    help=(
+        "In `--recursive` listings, the order in which to list directories: "
+        "depth-first, breadth-first, or iterative deepening"
+    ),
+)
+@click.option(
+    "--checkpoint",
+    type=click.Path(dir_okay=False, writable=True),
+    help=(
+        "In `--recursive` listings, record progress to this file, so that an "
+        "interrupted listing can be continued with `--resume`"
+    ),
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help=(
+        "Continue an interrupted `--recursive` listing from the `--checkpoint` "
+        "file, if it exists. The listing must use the same path and options"
+    ),
+)
+@rate_limit_options
+@listing_cache_options
 @LoginManager.requires_login(LoginManager.TRANSFER_RS)
 def ls_command(
     *,
     login_manager: LoginManager,
+    rate_limiter: RateLimiter,
+    listing_cache: Optional[ListingCache],
     endpoint_plus_path,
     recursive_depth_limit,
     recursive,
+    parallel,
+    ordered,
+    traversal,
+    checkpoint,
+    resume,
     long_output,
     show_hidden,
     filter_val,
@@ -156,10 +236,51 @@ def ls_command(
     \b
     "~*.txt" matches all .txt files, for example
 
+    \b
+    === Resuming Recursive Listings
+
+    A `--recursive` listing with `--checkpoint FILE` records its progress to FILE
+    as it goes. If the listing is interrupted, run the same command again with
+    `--resume` to continue from where it stopped. Directories which were being
+    listed when it was interrupted are listed again, so a few entries may be
+    printed twice.
+
+    \b
+    === Traversal Order
+
+    By default, `--recursive` listings are depth-first ('dfs'): each directory's
+    subdirectories are finished before its next sibling is started. This uses the
+    least memory, and prints the first results quickly.
+
+    With `--traversal bfs`, the tree is listed breadth-first, one level at a time,
+    so that shallow results are printed first. This holds a whole level of the
+    tree in memory (or in a temporary file, for very wide trees).
+
+    With `--traversal iddfs`, the tree is listed in the same order as 'bfs', but
+    with the memory use of 'dfs', by doing a depth-first pass for each level.
+    Upper levels are listed again on each pass, so this makes more calls. Use it
+    with `--cache` to make the repeated listings cheap. It cannot be used with
+    `--checkpoint`.
+
+    \b
+    === Caching Listings
+    With `--cache`, listings are stored in a local cache and reused for up to
+    `--cache-ttl` seconds. In `--recursive` listings, a cached listing of a
+    directory is not reused if the directory has been modified since it was
+    cached. Use `--refresh` to ignore and replace the cached listings.
+
     {AUTOMATIC_ACTIVATION}
     """
     endpoint_id, path = endpoint_plus_path
 
+    if resume and not checkpoint:
+        raise click.UsageError("--resume requires --checkpoint")
+    if checkpoint and not recursive:
+        raise click.UsageError("--checkpoint can only be used with --recursive")
+    traversal = traversal.lower()
+    if checkpoint and traversal == "iddfs":
+        raise click.UsageError("--checkpoint cannot be used with --traversal iddfs")
+
     # do autoactivation before the `ls` call so that recursive invocations
     # won't do this repeatedly, and won't have to instantiate new clients
     transfer_client = login_manager.get_transfer_client()
@@ -178,41 +299,66 @@ def ls_command(
         # format into a simple filter clause which operates on filenames
         ls_params["filter"] = f"name:{filter_val}"
 
-    # get the `ls` result
-    if recursive:
-        # NOTE:
-        # --recursive and --filter have an interplay that some users may find
-        # surprising
-        # if we're asked to change or "improve" the behavior in the future, we
-        # could do so with "type:dir" or "type:file" filters added in, and
-        # potentially work out some viable behavior based on what people want
-        res: Union[
-            IterableTransferResponse, RecursiveLsResponse
-        ] = transfer_client.recursive_operation_ls(
-            endpoint_id, ls_params, depth=recursive_depth_limit
-        )
-    else:
-        res = transfer_client.operation_ls(endpoint_id, **ls_params)
-
     def cleaned_item_name(item):
         return item["name"] + ("/" if item["type"] == "dir" else "")
 
-    # and then print it, per formatting rules
-    formatted_print(
-        res,
-        fields=[
-            ("Permissions", "permissions"),
-            ("User", "user"),
-            ("Group", "group"),
-            ("Size", "size"),
-            ("Last Modified", "last_modified"),
-            ("File Type", "type"),
-            ("Filename", cleaned_item_name),
-        ],
-        simple_text=(
-            None
-            if long_output or is_verbose() or not outformat_is_text()
-            else "\n".join(cleaned_item_name(x) for x in res)
-        ),
-        json_converter=iterable_response_to_dict,
-    )
+    def print_names(data):
+        # print as we go, so that recursive listings stream their output
+        for item in data:
+            click.echo(cleaned_item_name(item))
+
+    def print_result(res):
+        formatted_print(
+            res,
+            fields=[
+                ("Permissions", "permissions"),
+                ("User", "user"),
+                ("Group", "group"),
+                ("Size", "size"),
+                ("Last Modified", "last_modified"),
+                ("File Type", "type"),
+                ("Filename", cleaned_item_name),
+            ],
+            text_format=(
+                FORMAT_TEXT_TABLE if long_output or is_verbose() else print_names
+            ),
+            json_converter=iterable_response_to_dict,
+        )
+
+    # get the `ls` result and print it, per formatting rules
+    if not recursive:
+        if listing_cache is not None:
+            listing = listing_cache.operation_ls(
+                transfer_client, endpoint_id, ls_params
+            )
+            print_result(listing["DATA"])
+        else:
+            print_result(transfer_client.operation_ls(endpoint_id, **ls_params))
+        return
+
+    transfer_client.rate_limiter = rate_limiter
+    # NOTE:
+    # --recursive and --filter have an interplay that some users may find
+    # surprising
+    # if we're asked to change or "improve" the behavior in the future, we
+    # could do so with "type:dir" or "type:file" filters added in, and
+    # potentially work out some viable behavior based on what people want
+    ckpt = RecursiveLsCheckpoint(checkpoint, resume=resume) if checkpoint else None
+    try:
+        try:
+            res = transfer_client.recursive_operation_ls(
+                endpoint_id,
+                ls_params,
+                depth=recursive_depth_limit,
+                parallelism=parallel,
+                ordered=ordered,
+                traversal=traversal,
+                checkpoint=ckpt,
+                cache=listing_cache,
+            )
+        except CheckpointMismatchError as err:
+            raise click.UsageError(f"cannot --resume: {err}")
+        print_result(res)
+    finally:
+        if ckpt is not None:
+            ckpt.close()
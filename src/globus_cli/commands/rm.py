@@ -56,7 +56,7 @@ def rm_command(
     notify,
     meow,
     heartbeat,
-    polling_interval,
+    polling,
     timeout,
     timeout_exit_code,
 ):
@@ -126,7 +126,7 @@ def rm_command(
         transfer_client,
         meow,
         heartbeat,
-        polling_interval,
+        polling,
         timeout,
         task_id,
         timeout_exit_code,
@@ -1,11 +1,13 @@
 from globus_cli.commands.task.cancel import cancel_task
 from globus_cli.commands.task.event_list import task_event_list
 from globus_cli.commands.task.generate_submission_id import generate_submission_id
+from globus_cli.commands.task.history import history_command
 from globus_cli.commands.task.list import task_list
 from globus_cli.commands.task.pause_info import task_pause_info
 from globus_cli.commands.task.show import show_task
 from globus_cli.commands.task.update import update_task
 from globus_cli.commands.task.wait import task_wait
+from globus_cli.commands.task.watch import task_watch
 from globus_cli.parsing import group
 
 
@@ -21,4 +23,6 @@ task_command.add_command(cancel_task)
 task_command.add_command(task_event_list)
 task_command.add_command(task_pause_info)
 task_command.add_command(task_wait)
+task_command.add_command(task_watch)
 task_command.add_command(generate_submission_id)
+task_command.add_command(history_command)
@@ -0,0 +1,14 @@
+from globus_cli.commands.task.history.list import history_list
+from globus_cli.commands.task.history.summary import history_summary
+from globus_cli.commands.task.history.sync import history_sync
+from globus_cli.parsing import group
+
+
+@group("history")
+def history_command() -> None:
+    """Query a local history of your tasks"""
+
+
+history_command.add_command(history_sync)
+history_command.add_command(history_list)
+history_command.add_command(history_summary)
@@ -0,0 +1,97 @@
+import functools
+
+import click
+
+from globus_cli import login_manager
+from globus_cli.services.transfer import TaskHistory
+
+
+def open_task_history() -> TaskHistory:
+    """Open the local task history of the current login."""
+    filename, namespace = login_manager.task_history_location()
+    return TaskHistory(filename, namespace=namespace)
+
+
+def sync_option(f):
+    return click.option(
+        "--sync",
+        is_flag=True,
+        help="Sync the history with the Transfer service before querying it.",
+    )(f)
+
+
+def task_history_filter_options(f):
+    """
+    Options for filtering the tasks in the local task history, which match the
+    filters of `globus task list`.
+
+    The options are combined into a single `filters` parameter, holding keyword
+    arguments for the queries of the history.
+    """
+
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        kwargs["filters"] = {
+            "statuses": kwargs.pop("filter_status"),
+            "types": kwargs.pop("filter_type"),
+            "labels": kwargs.pop("filter_label"),
+            "not_labels": kwargs.pop("filter_not_label"),
+            "exact": not kwargs.pop("inexact"),
+            "requested_after": kwargs.pop("filter_requested_after"),
+            "requested_before": kwargs.pop("filter_requested_before"),
+            "completed_after": kwargs.pop("filter_completed_after"),
+            "completed_before": kwargs.pop("filter_completed_before"),
+        }
+        return f(*args, **kwargs)
+
+    for name, help_text in (
+        ("completed-before", "completed before given time"),
+        ("completed-after", "completed after given time"),
+        ("requested-before", "requested before given time"),
+        ("requested-after", "requested after given time"),
+    ):
+        wrapper = click.option(
+            f"--filter-{name}",
+            type=click.DateTime(),
+            help=f"Filter results to tasks that were {help_text} (in UTC).",
+        )(wrapper)
+    wrapper = click.option(
+        "--inexact / --exact",
+        default=True,
+        help=(
+            "Allows / disallows --filter-label and --filter-not-label to use "
+            "'*' as a wild-card character and ignore case"
+        ),
+    )(wrapper)
+    wrapper = click.option(
+        "--filter-not-label",
+        multiple=True,
+        help=(
+            "Filter not results whose label matches pattern. "
+            "This option can be used multiple times."
+        ),
+    )(wrapper)
+    wrapper = click.option(
+        "--filter-label",
+        multiple=True,
+        help=(
+            "Filter results to task whose label matches pattern. "
+            "This option can be used multiple times."
+        ),
+    )(wrapper)
+    wrapper = click.option(
+        "--filter-status",
+        multiple=True,
+        type=click.Choice(["ACTIVE", "INACTIVE", "FAILED", "SUCCEEDED"]),
+        help=(
+            "Task status to filter results by. "
+            "This option can be used multiple times."
+        ),
+    )(wrapper)
+    wrapper = click.option(
+        "--filter-type",
+        multiple=True,
+        type=click.Choice(["TRANSFER", "DELETE"]),
+        help="Filter results to only TRANSFER or DELETE tasks.",
+    )(wrapper)
+    return wrapper
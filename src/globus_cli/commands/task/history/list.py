@@ -0,0 +1,62 @@
+import click
+
+from globus_cli.login_manager import LoginManager
+from globus_cli.parsing import command
+from globus_cli.termio import formatted_print
+
+from ._common import open_task_history, sync_option, task_history_filter_options
+
+
+@command(
+    "list",
+    short_help="List tasks from the local task history",
+    adoc_output="""When text output is requested, the following fields are used:
+
+- 'Task ID'
+- 'Status'
+- 'Type'
+- 'Source Display Name'
+- 'Dest Display Name'
+- 'Label'
+""",
+    adoc_examples="""List the failed tasks labeled 'nightly-*' which were requested in
+March 2021, syncing the history first:
+
+[source,bash]
+----
+$ globus task history list --sync --limit 100 \
+    --filter-status FAILED --filter-label 'nightly-*' \
+    --filter-requested-after 2021-03-01 \
+    --filter-requested-before 2021-04-01
+----
+""",
+)
+@click.option("--limit", default=10, show_default=True, help="Limit number of results.")
+@task_history_filter_options
+@sync_option
+@LoginManager.requires_login(LoginManager.TRANSFER_RS)
+def history_list(*, login_manager: LoginManager, limit, filters, sync) -> None:
+    """
+    List tasks from the local history of your tasks, most recent first.
+
+    This takes the same filters as 'globus task list', but answers from the local
+    history, without calling the Transfer service unless '--sync' is given. The
+    history is as up to date as its last sync.
+    """
+    with open_task_history() as history:
+        if sync:
+            history.sync(login_manager.get_transfer_client())
+        tasks = history.tasks(limit=limit, **filters)
+
+    formatted_print(
+        {"DATA": tasks},
+        response_key="DATA",
+        fields=[
+            ("Task ID", "task_id"),
+            ("Status", "status"),
+            ("Type", "type"),
+            ("Source Display Name", "source_endpoint_display_name"),
+            ("Dest Display Name", "destination_endpoint_display_name"),
+            ("Label", "label"),
+        ],
+    )
@@ -0,0 +1,72 @@
+import click
+
+from globus_cli.login_manager import LoginManager
+from globus_cli.parsing import command
+from globus_cli.termio import formatted_print
+
+from ._common import open_task_history, sync_option, task_history_filter_options
+
+
+@command(
+    "summary",
+    short_help="Summarize the local task history",
+    adoc_output="""When text output is requested, the following fields are used:
+
+- 'Status' or 'Day'
+- 'Tasks'
+- 'Bytes Transferred'
+- 'Files Transferred'
+""",
+    adoc_examples="""Count your tasks by status:
+
+[source,bash]
+----
+$ globus task history summary
+----
+
+Show the bytes moved each day by successful transfers since the start of 2021:
+
+[source,bash]
+----
+$ globus task history summary --by day \
+    --filter-type TRANSFER --filter-status SUCCEEDED \
+    --filter-completed-after 2021-01-01
+----
+""",
+)
+@click.option(
+    "--by",
+    type=click.Choice(["status", "day"]),
+    default="status",
+    show_default=True,
+    help=(
+        "Group tasks by status, or by the day they completed. Active tasks are "
+        "grouped by the day they were requested"
+    ),
+)
+@task_history_filter_options
+@sync_option
+@LoginManager.requires_login(LoginManager.TRANSFER_RS)
+def history_summary(*, login_manager: LoginManager, by, filters, sync) -> None:
+    """
+    Summarize the local history of your tasks: count the tasks, and the bytes and
+    files they transferred, by status or by day.
+
+    This takes the same filters as 'globus task list', but answers from the local
+    history, without calling the Transfer service unless '--sync' is given.
+    """
+    with open_task_history() as history:
+        if sync:
+            history.sync(login_manager.get_transfer_client())
+        rows = history.summarize(by, **filters)
+
+    formatted_print(
+        {"DATA": rows},
+        response_key="DATA",
+        fields=[
+            (by.capitalize(), by),
+            ("Tasks", "tasks"),
+            ("Bytes Transferred", "bytes_transferred"),
+            ("Files Transferred", "files_transferred"),
+        ],
+    )
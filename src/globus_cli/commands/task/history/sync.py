@@ -0,0 +1,50 @@
+from globus_cli.login_manager import LoginManager
+from globus_cli.parsing import command
+from globus_cli.termio import FORMAT_TEXT_RECORD, formatted_print
+
+from ._common import open_task_history
+
+
+@command(
+    "sync",
+    short_help="Sync the local task history",
+    adoc_output="""When text output is requested, the following fields are used:
+
+- 'New Tasks'
+- 'Updated Tasks'
+- 'Total Tasks'
+- 'API Calls'
+""",
+    adoc_examples="""Bring the local task history up to date, e.g. from a cron job:
+
+[source,bash]
+----
+$ globus task history sync
+----
+""",
+)
+@LoginManager.requires_login(LoginManager.TRANSFER_RS)
+def history_sync(*, login_manager: LoginManager) -> None:
+    """
+    Sync the local history of your tasks with the Transfer service.
+
+    The history is kept in a database in the Globus CLI data directory. The first
+    sync fetches all of your tasks. After that, each sync only fetches the tasks
+    which were requested since the last sync, and the tasks which were still
+    active then.
+    """
+    transfer_client = login_manager.get_transfer_client()
+    with open_task_history() as history:
+        result = history.sync(transfer_client)
+        result["total"] = len(history)
+
+    formatted_print(
+        result,
+        text_format=FORMAT_TEXT_RECORD,
+        fields=[
+            ("New Tasks", "new"),
+            ("Updated Tasks", "updated"),
+            ("Total Tasks", "total"),
+            ("API Calls", "api_calls"),
+        ],
+    )
@@ -1,7 +1,8 @@
 import click
 
 from globus_cli.login_manager import LoginManager
-from globus_cli.parsing import command
+from globus_cli.parsing import command, rate_limit_options
+from globus_cli.services.rate_limit import RateLimiter
 from globus_cli.services.transfer import iterable_response_to_dict
 from globus_cli.termio import formatted_print
 from globus_cli.utils import PagingWrapper
@@ -143,10 +144,12 @@ globus task list --format=unix --jmespath='DATA[*].[task_id, status]' | \
     callback=_format_date_callback,
     help="Filter results to tasks that were completed before given time.",
 )
+@rate_limit_options
 @LoginManager.requires_login(LoginManager.TRANSFER_RS)
 def task_list(
     *,
     login_manager: LoginManager,
+    rate_limiter: RateLimiter,
     limit,
     filter_task_id,
     filter_status,
@@ -203,6 +206,7 @@ def task_list(
     )
 
     transfer_client = login_manager.get_transfer_client()
+    transfer_client.rate_limiter = rate_limiter
     task_iterator = PagingWrapper(
         transfer_client.paginated.task_list(
             query_params={"filter": filter_string[:-1]},  # remove trailing /
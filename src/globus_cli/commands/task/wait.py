@@ -1,8 +1,9 @@
+import click
+
 from globus_cli.login_manager import LoginManager
 from globus_cli.parsing import command, synchronous_task_wait_options
 
-from .._common import transfer_task_wait_with_io
-from ._common import task_id_arg
+from .._common import transfer_task_wait_with_io, transfer_tasks_wait_with_io
 
 
 @command(
@@ -14,6 +15,10 @@ is written to standard error.
 
 When JSON output is requested, the standard error output remains, but the task
 status after waiting will be sent to stdout.
+
+When waiting on several tasks, the final status of each task is written to
+standard error as it finishes. With JSON output, the task documents are sent to
+stdout, as the "DATA" list of an object.
 """,
     adoc_examples="""
 Wait 30 seconds for a task to complete, printing heartbeats to stderr and
@@ -30,9 +35,22 @@ Wait for a task without limit, silently, polling every 5 minutes:
 ----
 $ globus task wait --polling-interval 300 TASK_ID
 ----
+
+Wait for all of the tasks listed in a file, polling them together:
+
+[source,bash]
+----
+$ globus task wait - < task_ids.txt
+----
 """,
 )
-@task_id_arg
+@click.argument("task_ids", metavar="TASK_ID...", nargs=-1, required=True)
+@click.option(
+    "--any",
+    "wait_for_any",
+    is_flag=True,
+    help="When waiting on several tasks, stop waiting once any of them finishes",
+)
 @synchronous_task_wait_options
 @LoginManager.requires_login(LoginManager.TRANSFER_RS)
 def task_wait(
@@ -40,9 +58,10 @@ def task_wait(
     login_manager: LoginManager,
     meow,
     heartbeat,
-    polling_interval,
+    polling,
     timeout,
-    task_id,
+    task_ids,
+    wait_for_any,
     timeout_exit_code
 ):
     """
@@ -53,14 +72,39 @@ def task_wait(
 
     If the task succeeds by then, it exits with status 0. Otherwise, it exits with
     status 1.
+
+    Several task IDs may be given, or read from stdin, whitespace separated, by
+    giving `-` as the only TASK_ID. All of the tasks are polled together, in as
+    few API calls as possible. The wait ends when all of the tasks have finished,
+    or with `--any`, when any of them has. It exits with status 1 if any task which
+    finished did not succeed, and otherwise as for a single task.
     """
+    if task_ids == ("-",):
+        task_ids = tuple(click.get_text_stream("stdin").read().split())
+        if not task_ids:
+            raise click.UsageError("no task IDs were given on stdin")
+    # wait on each task once, in the order given
+    task_ids = tuple(dict.fromkeys(task_ids))
+
     transfer_client = login_manager.get_transfer_client()
-    transfer_task_wait_with_io(
-        transfer_client,
-        meow,
-        heartbeat,
-        polling_interval,
-        timeout,
-        task_id,
-        timeout_exit_code,
-    )
+    if len(task_ids) == 1:
+        transfer_task_wait_with_io(
+            transfer_client,
+            meow,
+            heartbeat,
+            polling,
+            timeout,
+            task_ids[0],
+            timeout_exit_code,
+        )
+    else:
+        transfer_tasks_wait_with_io(
+            transfer_client,
+            meow,
+            heartbeat,
+            polling,
+            timeout,
+            task_ids,
+            timeout_exit_code,
+            wait_for_any=wait_for_any,
+        )
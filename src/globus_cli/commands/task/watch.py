@@ -0,0 +1,167 @@
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import click
+
+from globus_cli.login_manager import LoginManager
+from globus_cli.parsing import ByteSize, command
+from globus_cli.services.polling import PollingSchedule, task_progress
+from globus_cli.services.throughput import ThroughputMonitor
+from globus_cli.termio import formatted_print, out_is_terminal
+from globus_cli.utils import format_size
+
+from ._common import task_id_arg
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+def _format_rate(rate: Optional[float]) -> str:
+    return "-" if rate is None else f"{format_size(rate)}/s"
+
+
+def _format_line(sample: Dict[str, Any]) -> str:
+    transferred = format_size(sample["bytes_transferred"])
+    if sample["total_bytes"] is not None:
+        transferred += f" of {format_size(sample['total_bytes'])}"
+    parts = [
+        sample["status"],
+        transferred,
+        f"{_format_rate(sample['instantaneous_bytes_per_second'])} "
+        f"(avg {_format_rate(sample['smoothed_bytes_per_second'])})",
+    ]
+    if sample["eta_seconds"] is not None:
+        parts.append(f"ETA {_format_duration(sample['eta_seconds'])}")
+    return "  ".join(parts)
+
+
+@command(
+    "watch",
+    short_help="Watch the throughput of a task",
+    adoc_output="""
+When text output is requested, a line is printed after each poll, with the task
+status, the bytes transferred, the current and smoothed throughput, and the time
+left, if it can be estimated. If stdout is a terminal, a single line is shown and
+updated in place instead.
+
+With '--format jsonl', one JSON object is written per poll, one per line, as
+each poll completes. With '--format json', the samples are written as a 'DATA'
+list once the task completes. Each sample has these fields:
+
+- 'time': the time of the poll, in seconds since the epoch
+- 'task_id'
+- 'status'
+- 'elapsed_seconds': the time since the first poll
+- 'bytes_transferred'
+- 'files_transferred'
+- 'instantaneous_bytes_per_second': the throughput since the last poll
+- 'smoothed_bytes_per_second': the throughput, averaged over recent polls
+- 'total_bytes': as given with '--total-bytes', or null
+- 'eta_seconds': the estimated time left, or null
+""",
+    adoc_examples="""
+Watch a task until it completes, estimating the time left for a 2 TB transfer:
+
+[source,bash]
+----
+$ globus task watch --total-bytes 2T TASK_ID
+----
+
+Record the throughput of a task every 30 seconds, for later analysis:
+
+[source,bash]
+----
+$ globus task watch --polling-interval 30 -F jsonl TASK_ID > samples.ndjson
+----
+""",
+)
+@task_id_arg
+@click.option(
+    "--polling-interval",
+    default=5,
+    type=click.IntRange(min=1),
+    show_default=True,
+    help="Number of seconds between Task status checks.",
+)
+@click.option(
+    "--max-polling-interval",
+    type=click.IntRange(min=1),
+    metavar="N",
+    help=(
+        "Poll adaptively: wait longer after each check in which the Task has made "
+        "no progress, up to N seconds"
+    ),
+)
+@click.option(
+    "--total-bytes",
+    type=ByteSize(),
+    help=(
+        "The total size of the data being transferred, used to estimate the time "
+        "left. Sizes may have a binary unit suffix"
+    ),
+)
+@LoginManager.requires_login(LoginManager.TRANSFER_RS)
+def task_watch(
+    *,
+    login_manager: LoginManager,
+    task_id: str,
+    polling_interval: int,
+    max_polling_interval: Optional[int],
+    total_bytes: Optional[int],
+) -> None:
+    """
+    Watch the progress of a task until it completes.
+
+    The task is polled every 'M' seconds (where 'M' is the polling interval), and
+    the throughput is computed from successive polls: both the throughput since
+    the last poll and an average which favors recent polls.
+
+    The time left is estimated from the average throughput, when the total size of
+    the transfer is given with '--total-bytes'.
+
+    If the task succeeds, this exits with status 0. Otherwise, it exits with
+    status 1.
+    """
+    transfer_client = login_manager.get_transfer_client()
+    polling = PollingSchedule(polling_interval, max_interval=max_polling_interval)
+    monitor = ThroughputMonitor(total_bytes=total_bytes)
+    final_status = None
+
+    def samples() -> Iterator[Dict[str, Any]]:
+        nonlocal final_status
+        while True:
+            task = transfer_client.get_task(task_id)
+            yield {
+                "time": round(time.time(), 3),
+                **monitor.sample(task.data, time.monotonic()),
+            }
+            if task["status"] != "ACTIVE":
+                final_status = task["status"]
+                return
+            time.sleep(polling.next_interval(task_progress(task.data)))
+
+    def print_samples(data: Iterable[Dict[str, Any]]) -> None:
+        live = out_is_terminal()
+        line_width = 0
+        for sample in data:
+            line = _format_line(sample)
+            if live:
+                # pad over whatever is left of a longer line
+                click.echo("\r" + line.ljust(line_width), nl=False)
+                line_width = len(line)
+            else:
+                click.echo(line)
+            sys.stdout.flush()
+        if live:
+            click.echo()
+
+    formatted_print(
+        samples(),
+        text_format=print_samples,
+        json_converter=lambda data: {"DATA": list(data)},
+    )
+    click.get_current_context().exit(0 if final_status == "SUCCEEDED" else 1)
@@ -1,19 +1,71 @@
-from typing import List, Optional
+import functools
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 import click
 from globus_sdk import TransferData
 
-from globus_cli import utils
 from globus_cli.login_manager import LoginManager
 from globus_cli.parsing import (
     ENDPOINT_PLUS_OPTPATH,
-    TaskPath,
+    BatchLineParser,
+    batch_dedupe_option,
     command,
+    dry_run_summary_option,
+    listing_cache_options,
     mutex_option_group,
+    resolve_task_path,
+    task_sharding_options,
     task_submission_options,
 )
-from globus_cli.services.transfer import autoactivate
+from globus_cli.services.transfer import (
+    BatchSummary,
+    CompactItemList,
+    ListingCache,
+    SyncPrefilter,
+    TaskShards,
+    autoactivate,
+)
 from globus_cli.termio import FORMAT_TEXT_RECORD, formatted_print
+from globus_cli.utils import format_size
+
+from ._common import (
+    check_journal_options,
+    dedupe_batch_items,
+    print_batch_summary,
+    shard_settings,
+    start_submission_journal,
+    submit_task_shards,
+)
+
+
+def _skip_unchanged(
+    prefilter: SyncPrefilter, items: Iterable[Dict[str, Any]]
+) -> Iterator[Dict[str, Any]]:
+    yield from prefilter.filter(items)
+    click.echo(
+        f"--skip-unchanged left out {prefilter.skipped_count} files "
+        f"({format_size(prefilter.skipped_bytes)}) which are already up to date",
+        err=True,
+    )
+
+
+def _require_recursive_item(
+    items: Iterable[Dict[str, Any]]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Hold back the items of a batch until a recursive item is read, so that a batch
+    which --exclude cannot apply to is rejected before any task is submitted.
+    """
+    held = CompactItemList()
+    items = iter(items)
+    for item in items:
+        held.append(item)
+        if item["recursive"]:
+            break
+    else:
+        raise click.UsageError("--exclude can only be used with --recursive transfers")
+    yield from held
+    yield from items
 
 
 @command(
@@ -108,6 +160,7 @@ fi
 """,
 )
 @task_submission_options
+@dry_run_summary_option
 @click.option(
     "--recursive",
     "-r",
@@ -219,11 +272,24 @@ fi
 @click.option("--perf-p", type=int, hidden=True)
 @click.option("--perf-pp", type=int, hidden=True)
 @click.option("--perf-udt", is_flag=True, default=None, hidden=True)
+@task_sharding_options
+@batch_dedupe_option
+@click.option(
+    "--skip-unchanged",
+    is_flag=True,
+    help=(
+        "With `--batch` and `--sync-level`, list the directories of the files in "
+        "the batch on both endpoints, and leave out the files which are already "
+        "up to date, rather than submitting them"
+    ),
+)
+@listing_cache_options
 @mutex_option_group("--recursive", "--external-checksum")
 @LoginManager.requires_login(LoginManager.TRANSFER_RS)
 def transfer_command(
     *,
     login_manager: LoginManager,
+    listing_cache: Optional[ListingCache],
     batch,
     sync_level,
     recursive,
@@ -240,10 +306,17 @@ def transfer_command(
     encrypt,
     submission_id,
     dry_run,
+    dry_run_summary,
     delete,
     deadline,
     skip_activation_check,
     notify,
+    max_items_per_task,
+    parallel_submissions,
+    journal,
+    resume_journal,
+    dedupe,
+    skip_unchanged,
     perf_cc,
     perf_p,
     perf_pp,
@@ -290,6 +363,21 @@ def transfer_command(
     If you use `--batch` and a commandline SOURCE_PATH and/or DEST_PATH, these
     paths will be used as dir prefixes to any paths read from the batch source.
 
+    Very large batches can be split into several tasks with
+    `--max-items-per-task N`. A task is submitted for every N lines as the batch
+    is read, so the whole batch is never held in memory, and the IDs of the tasks
+    are printed as they are submitted. `--exclude` only applies to the tasks
+    which have `--recursive` lines.
+
+    With `--journal FILE`, each of these tasks is recorded in FILE before it is
+    submitted and once it is accepted. If the submission is interrupted, run
+    the same command again with `--resume-journal` to submit only the tasks
+    which were not accepted, without risk of submitting any task twice.
+
+    With `--dedupe`, duplicate lines are dropped, and so are lines which copy a
+    path under a `--recursive` line to the same place under that line's
+    destination. Lines with `--external-checksum` are always kept.
+
     \b
     === Sync Levels
 
@@ -337,6 +425,25 @@ def transfer_command(
             "transfer requires either SOURCE_PATH and DEST_PATH or --batch"
         )
 
+    if max_items_per_task and not batch:
+        raise click.UsageError("--max-items-per-task can only be used with --batch")
+    if dedupe and not batch:
+        raise click.UsageError("--dedupe can only be used with --batch")
+    if skip_unchanged and not batch:
+        raise click.UsageError("--skip-unchanged can only be used with --batch")
+    if skip_unchanged and sync_level not in ("exists", "size", "mtime"):
+        raise click.UsageError(
+            "--skip-unchanged requires --sync-level exists, size, or mtime"
+        )
+    if max_items_per_task and submission_id:
+        raise click.UsageError(
+            "You cannot use --submission-id with --max-items-per-task, "
+            "because each task gets its own submission ID"
+        )
+    # a summary is a dry run too
+    dry_run = dry_run or dry_run_summary
+    check_journal_options(journal, resume_journal, max_items_per_task, dry_run)
+
     # the performance options (of which there are a few), have elements which should be
     # omitted in some cases
     # put them together before passing to TransferData
@@ -357,73 +464,153 @@ def transfer_command(
         filter_rules = None
 
     transfer_client = login_manager.get_transfer_client()
-    transfer_data = TransferData(
-        transfer_client,
-        source_endpoint,
-        dest_endpoint,
-        label=label,
-        sync_level=sync_level,
-        verify_checksum=verify_checksum,
-        preserve_timestamp=preserve_mtime,
-        encrypt_data=encrypt,
-        submission_id=submission_id,
-        deadline=deadline,
-        skip_source_errors=skip_source_errors,
-        fail_on_quota_errors=fail_on_quota_errors,
-        additional_fields={
-            "delete_destination_extra": delete,
-            "skip_activation_check": skip_activation_check,
-            "filter_rules": filter_rules,
-            **notify,
-            **perf_opts,
-        },
-    )
 
-    if batch:
+    def new_transfer_data(submission_id: Optional[str] = None) -> TransferData:
+        transfer_data = TransferData(
+            transfer_client,
+            source_endpoint,
+            dest_endpoint,
+            label=label,
+            sync_level=sync_level,
+            verify_checksum=verify_checksum,
+            preserve_timestamp=preserve_mtime,
+            encrypt_data=encrypt,
+            submission_id=submission_id,
+            deadline=deadline,
+            skip_source_errors=skip_source_errors,
+            fail_on_quota_errors=fail_on_quota_errors,
+            additional_fields={
+                "delete_destination_extra": delete,
+                "skip_activation_check": skip_activation_check,
+                "filter_rules": filter_rules,
+                **notify,
+                **perf_opts,
+            },
+        )
+        # a batch may have millions of items, so store them compactly, or only
+        # summarize them
+        if dry_run_summary:
+            transfer_data["DATA"] = BatchSummary(
+                ("source_path", "destination_path"),
+                max_items_per_task=max_items_per_task,
+            )
+        else:
+            transfer_data["DATA"] = CompactItemList()
+        return transfer_data
 
-        @click.command()
-        @click.option("--external-checksum")
-        @click.option("--recursive", "-r", is_flag=True)
-        @click.argument("source_path", type=TaskPath(base_dir=cmd_source_path))
-        @click.argument("dest_path", type=TaskPath(base_dir=cmd_dest_path))
-        @mutex_option_group("--recursive", "--external-checksum")
-        def process_batch_line(dest_path, source_path, recursive, external_checksum):
-            """
-            Parse a line of batch input and turn it into a transfer submission
-            item.
-            """
-            transfer_data.add_item(
-                str(source_path),
-                str(dest_path),
+    if batch:
+        batch_parser = BatchLineParser(
+            ("source_path", "destination_path"),
+            flags={"--recursive": "recursive", "-r": "recursive"},
+            options={"--external-checksum": "external_checksum"},
+            convert={
+                "source_path": functools.partial(
+                    resolve_task_path, base_dir=cmd_source_path
+                ),
+                "destination_path": functools.partial(
+                    resolve_task_path, base_dir=cmd_dest_path
+                ),
+            },
+            mutex=("--recursive", "--external-checksum"),
+        )
+        items: Iterable[Dict[str, Any]] = (
+            dict(line, checksum_algorithm=checksum_algorithm)
+            for line in batch_parser.parse(batch)
+        )
+        if dedupe:
+            items = dedupe_batch_items(
+                items,
+                ("source_path", "destination_path"),
+                is_recursive=lambda item: item["recursive"],
+                # a file with a checksum to verify is not redundant
+                can_fold=lambda item: item["external_checksum"] is None,
+            )
+        if skip_unchanged:
+            # the endpoints must be activated to list them
+            if not skip_activation_check:
+                autoactivate(transfer_client, source_endpoint, if_expires_in=60)
+                autoactivate(transfer_client, dest_endpoint, if_expires_in=60)
+            items = _skip_unchanged(
+                SyncPrefilter(
+                    transfer_client,
+                    source_endpoint,
+                    dest_endpoint,
+                    sync_level=sync_level,
+                    cache=listing_cache,
+                ),
+                items,
+            )
+    else:
+        items = [
+            dict(
+                source_path=cmd_source_path,
+                destination_path=cmd_dest_path,
                 external_checksum=external_checksum,
                 checksum_algorithm=checksum_algorithm,
                 recursive=recursive,
             )
-
-        utils.shlex_process_stream(process_batch_line, batch)
-
-    else:
-        transfer_data.add_item(
-            cmd_source_path,
-            cmd_dest_path,
-            external_checksum=external_checksum,
-            checksum_algorithm=checksum_algorithm,
-            recursive=recursive,
+        ]
+
+    if max_items_per_task and not dry_run:
+        # with --skip-unchanged, the endpoints were activated above
+        if not (skip_activation_check or skip_unchanged):
+            autoactivate(transfer_client, source_endpoint, if_expires_in=60)
+            autoactivate(transfer_client, dest_endpoint, if_expires_in=60)
+
+        if exclude:
+            items = _require_recursive_item(items)
+
+        def submit_shard(shard_data: TransferData):
+            # exclude rules only apply to recursive items, and a task with exclude
+            # rules but no recursive items is an error, so they are left out of
+            # the tasks which only have the files of a batch with recursive items
+            if not any(item["recursive"] for item in shard_data["DATA"]):
+                shard_data["filter_rules"] = None
+            return transfer_client.submit_transfer(shard_data)
+
+        shards = TaskShards(
+            new_transfer_data,
+            submit_shard,
+            max_items_per_task,
+            get_submission_id=lambda: transfer_client.get_submission_id()["value"],
+            parallelism=parallel_submissions,
+            journal=start_submission_journal(
+                journal,
+                resume_journal,
+                shard_settings("transfer", new_transfer_data, max_items_per_task),
+            ),
         )
+        submit_task_shards(shards, items)
+        return
 
-    for item in transfer_data["DATA"]:
-        if item["recursive"]:
-            has_recursive_items = True
-            break
+    transfer_data = new_transfer_data(submission_id)
+    for item in items:
+        transfer_data.add_item(**item)
+
+    if dry_run_summary:
+        has_recursive_items = transfer_data["DATA"].recursive_count > 0
     else:
-        has_recursive_items = False
+        for item in transfer_data["DATA"]:
+            if item["recursive"]:
+                has_recursive_items = True
+                break
+        else:
+            has_recursive_items = False
 
     if exclude and not has_recursive_items:
         raise click.UsageError("--exclude can only be used with --recursive transfers")
 
+    if dry_run_summary:
+        print_batch_summary(
+            transfer_data["DATA"],
+            transfer_data.data,
+            (("Source", "source_path"), ("Dest", "destination_path")),
+        )
+        return
+
     if dry_run:
         formatted_print(
-            transfer_data.data,
+            dict(transfer_data.data, DATA=list(transfer_data["DATA"])),
             response_key="DATA",
             fields=(
                 ("Source Path", "source_path"),
@@ -437,7 +624,7 @@ def transfer_command(
 
     # autoactivate after parsing all args and putting things together
     # skip this if skip-activation-check is given
-    if not skip_activation_check:
+    if not (skip_activation_check or skip_unchanged):
         autoactivate(transfer_client, source_endpoint, if_expires_in=60)
         autoactivate(transfer_client, dest_endpoint, if_expires_in=60)
 
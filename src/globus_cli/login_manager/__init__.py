@@ -6,6 +6,8 @@ from .tokenstore import (
     delete_templated_client,
     internal_auth_client,
     internal_native_client,
+    listing_cache_location,
+    task_history_location,
     token_storage_adapter,
 )
 
@@ -17,6 +19,8 @@ __all__ = [
     "internal_auth_client",
     "internal_native_client",
     "token_storage_adapter",
+    "listing_cache_location",
+    "task_history_location",
     "is_client_login",
     "get_client_login",
 ]
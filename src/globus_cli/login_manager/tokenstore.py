@@ -1,6 +1,6 @@
 import os
 import sys
-from typing import cast
+from typing import Tuple, cast
 
 import globus_sdk
 from globus_sdk.tokenstorage import SQLiteAdapter
@@ -117,6 +117,24 @@ def token_storage_adapter() -> SQLiteAdapter:
     return as_proto._instance
 
 
+def listing_cache_location() -> Tuple[str, str]:
+    """
+    Get the filename and namespace for the cache of directory listings, which is
+    stored next to the token storage and namespaced in the same way
+    """
+    fname = os.path.join(_ensure_data_dir(), "listing_cache.db")
+    return fname, _resolve_namespace()
+
+
+def task_history_location() -> Tuple[str, str]:
+    """
+    Get the filename and namespace for the local task history, which is stored
+    next to the token storage and namespaced in the same way
+    """
+    fname = os.path.join(_ensure_data_dir(), "task_history.db")
+    return fname, _resolve_namespace()
+
+
 def internal_auth_client():
     """
     Pull template client credentials from storage and use them to create a
@@ -1,28 +1,38 @@
+from globus_cli.parsing.batch_dedupe import BatchDeduplicator
+from globus_cli.parsing.batch_input import BatchLineParser
 from globus_cli.parsing.commands import command, group, main_group
 from globus_cli.parsing.mutex_group import MutexInfo, mutex_option_group
 from globus_cli.parsing.one_use_option import one_use_option
 from globus_cli.parsing.shared_options import (
+    batch_dedupe_option,
     collection_id_arg,
     delete_and_rm_options,
+    dry_run_summary_option,
     endpoint_id_arg,
+    listing_cache_options,
     no_local_server_option,
+    rate_limit_options,
     security_principal_opts,
     synchronous_task_wait_options,
+    task_sharding_options,
     task_submission_options,
 )
 
 from .param_types import (
     ENDPOINT_PLUS_OPTPATH,
     ENDPOINT_PLUS_REQPATH,
+    ByteSize,
     CommaDelimitedList,
     IdentityType,
     JSONStringOrFile,
     LocationType,
+    NumericComparison,
     ParsedIdentity,
     StringOrNull,
     TaskPath,
     UrlOrNull,
     nullable_multi_callback,
+    resolve_task_path,
 )
 
 __all__ = [
@@ -34,24 +44,35 @@ __all__ = [
     # param types
     "ENDPOINT_PLUS_OPTPATH",
     "ENDPOINT_PLUS_REQPATH",
+    "ByteSize",
     "CommaDelimitedList",
     "IdentityType",
     "JSONStringOrFile",
     "LocationType",
     "MutexInfo",
+    "NumericComparison",
     "ParsedIdentity",
     "StringOrNull",
     "TaskPath",
     "UrlOrNull",
     "mutex_option_group",
     "nullable_multi_callback",
+    "resolve_task_path",
+    # batch input
+    "BatchLineParser",
+    "BatchDeduplicator",
     "one_use_option",
     # Transfer options
     "collection_id_arg",
     "endpoint_id_arg",
     "task_submission_options",
     "delete_and_rm_options",
+    "dry_run_summary_option",
     "synchronous_task_wait_options",
+    "task_sharding_options",
+    "batch_dedupe_option",
+    "listing_cache_options",
+    "rate_limit_options",
     "security_principal_opts",
     "no_local_server_option",
 ]
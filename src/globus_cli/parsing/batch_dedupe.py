@@ -0,0 +1,157 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+ITEM_T = Dict[str, Any]
+# (depth, normalized paths of the other path keys) of a recursive item
+_ANCESTOR_T = Tuple[int, Tuple[str, ...]]
+# the sorted (key, value) pairs of an item other than its first path, with
+# trailing slashes stripped from its paths
+_IDENTITY_T = Tuple[Tuple[str, Any], ...]
+
+
+def _strip_slash(path: str) -> str:
+    return path.rstrip("/") or path[:1]
+
+
+def _segments(path: str) -> List[str]:
+    # absolute and relative paths go under different roots
+    return ["/" if path.startswith("/") else ""] + [
+        part for part in path.split("/") if part not in ("", ".")
+    ]
+
+
+def _join_segments(segments: Sequence[str]) -> str:
+    """The path of a node of the trie, from the segments leading to it."""
+    return segments[0] + "/".join(segments[1:])
+
+
+class _TrieNode:
+    __slots__ = ("children", "items")
+
+    def __init__(self) -> None:
+        self.children: Optional[Dict[str, "_TrieNode"]] = None
+        # the items with this node's path, without that path, by their identity
+        self.items: Optional[Dict[_IDENTITY_T, ITEM_T]] = None
+
+
+class BatchDeduplicator:
+    """
+    Drop the redundant items of a batch: exact duplicates, and items which are
+    already covered by a recursive item for one of their parent directories.
+
+    Items are stored in a trie on the segments of their first path, so that the
+    common prefixes of the paths in a batch are only stored once, and a recursive
+    item covers everything below its node. The first path is left out of the
+    items stored at each node, unless it differs from the node's path (e.g. by a
+    trailing slash), and the items at a node are kept by identity, so that a
+    duplicate is found with one lookup. An item below a recursive item is only
+    covered if its other paths are in the same place relative to that item's
+    paths, e.g. ``a/b/c x/b/c`` is covered by ``a x --recursive`` but not by
+    ``a y --recursive``.
+
+    Paths must already be normalized (as by ``resolve_task_path``). Trailing
+    slashes are ignored when comparing them.
+
+    Items are yielded once the whole batch has been added, grouped by directory:
+    the items for a path come before the items below it, and otherwise the first
+    item added comes first.
+
+    :param path_keys: The keys of the paths in an item, the first of which is used
+        for the trie
+    :param is_recursive: A function which checks if an item is recursive
+    :param can_fold: A function which checks if an item may be dropped when a
+        recursive item covers it
+    """
+
+    def __init__(
+        self,
+        path_keys: Sequence[str],
+        *,
+        is_recursive: Callable[[ITEM_T], bool],
+        can_fold: Callable[[ITEM_T], bool] = lambda item: True,
+    ) -> None:
+        self.path_keys = tuple(path_keys)
+        self.is_recursive = is_recursive
+        self.can_fold = can_fold
+        self._root = _TrieNode()
+        self.item_count = 0
+        self.duplicate_count = 0
+        self.folded_count = 0
+
+    def add(self, item: ITEM_T) -> None:
+        """Add an item, dropping it if it duplicates an item already added."""
+        first_key = self.path_keys[0]
+        segments = _segments(item[first_key])
+        node = self._root
+        for segment in segments:
+            if node.children is None:
+                node.children = {}
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = _TrieNode()
+            node = child
+
+        if node.items is None:
+            node.items = {}
+        rest = {key: value for key, value in item.items() if key != first_key}
+        # paths in the same node only differ by trailing slashes, so the first
+        # path is not part of the identity
+        identity = tuple(
+            (key, _strip_slash(value) if key in self.path_keys else value)
+            for key, value in sorted(rest.items())
+        )
+        if identity in node.items:
+            self.duplicate_count += 1
+            return
+        if item[first_key] != _join_segments(segments):
+            rest[first_key] = item[first_key]
+        node.items[identity] = rest
+        self.item_count += 1
+
+    def _covered(
+        self, item: ITEM_T, path: List[str], ancestors: Tuple[_ANCESTOR_T, ...]
+    ) -> bool:
+        if not ancestors or not self.can_fold(item):
+            return False
+        others = tuple(_strip_slash(item[key]) for key in self.path_keys[1:])
+        for depth, ancestor_others in ancestors:
+            rel_path = "/".join(path[depth:])
+            if all(
+                other == ancestor_other.rstrip("/") + "/" + rel_path
+                for other, ancestor_other in zip(others, ancestor_others)
+            ):
+                return True
+        return False
+
+    def __iter__(self) -> Iterator[ITEM_T]:
+        # an explicit stack, as paths may be deeper than the recursion limit
+        path: List[str] = []
+        stack: List[Tuple[int, str, _TrieNode, Tuple[_ANCESTOR_T, ...]]] = [
+            (0, "", self._root, ())
+        ]
+        while stack:
+            depth, segment, node, ancestors = stack.pop()
+            del path[max(depth - 1, 0) :]
+            if depth:
+                path.append(segment)
+
+            for rest in (node.items or {}).values():
+                item = rest
+                if self.path_keys[0] not in rest:
+                    item = {self.path_keys[0]: _join_segments(path), **rest}
+                if self._covered(item, path, ancestors):
+                    self.folded_count += 1
+                    continue
+                yield item
+                if self.is_recursive(item):
+                    ancestors += (
+                        (
+                            depth,
+                            tuple(_strip_slash(item[k]) for k in self.path_keys[1:]),
+                        ),
+                    )
+
+            if node.children:
+                stack.extend(
+                    (depth + 1, name, child, ancestors)
+                    for name, child in reversed(list(node.children.items()))
+                )
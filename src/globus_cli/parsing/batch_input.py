@@ -0,0 +1,147 @@
+import re
+import shlex
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    NoReturn,
+    Optional,
+    Sequence,
+    Set,
+)
+
+import click
+
+from ..utils import format_list_of_words
+
+# lines which contain none of these can be split on whitespace, with exactly the
+# same result as a shlex split: quotes, escapes, comments, and any whitespace which
+# shlex does not split on
+_NEEDS_SHLEX = re.compile(r"[\"'\\#]|[^\S \t\r\n]")
+
+
+def split_batch_line(line: str) -> List[str]:
+    """
+    Split a line of batch input into arguments, as a shell would, dropping any
+    comment. Simple lines are split without using shlex, which is much faster.
+    """
+    if _NEEDS_SHLEX.search(line) is None:
+        return line.split()
+    return shlex.split(line, comments=True)
+
+
+class BatchLineParser:
+    """
+    A parser for the lines of `--batch` input.
+
+    Batch input can have millions of lines, so rather than running a click command
+    for each line, lines are parsed with a simple parser which accepts the same
+    syntax for the few arguments and options that batch lines support: options may
+    come before, after, or between the arguments, option values may be given as
+    `--opt value` or `--opt=value`, and `--` ends the options.
+
+    Each line is parsed into a dict of param names to values. Flags default to
+    False, and options to None. Errors are raised as a click.UsageError which
+    gives the line number.
+
+    :param arguments: The names of the (required) positional arguments, in order
+    :param flags: A mapping of flag option strings to param names
+    :param options: A mapping of option strings which take a value to param names
+    :param convert: A mapping of param names to functions which convert their
+        values, applied to arguments and to options which are given
+    :param mutex: The option strings of options which cannot be given together
+    """
+
+    def __init__(
+        self,
+        arguments: Sequence[str],
+        *,
+        flags: Optional[Mapping[str, str]] = None,
+        options: Optional[Mapping[str, str]] = None,
+        convert: Optional[Mapping[str, Callable[[str], Any]]] = None,
+        mutex: Sequence[str] = (),
+    ) -> None:
+        self.arguments = tuple(arguments)
+        self.flags = dict(flags or {})
+        self.options = dict(options or {})
+        self.convert = dict(convert or {})
+        self.mutex = tuple(mutex)
+
+        self._defaults: Dict[str, Any] = {name: False for name in self.flags.values()}
+        self._defaults.update({name: None for name in self.options.values()})
+
+    def parse(self, stream: IO[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Parse batch input, yielding the values of each line which is not blank or
+        a comment. Lines are read one at a time, so the input is never held in
+        memory.
+        """
+        # readline() rather than implicit file read line looping, so that EOF on an
+        # interactive stdin is captured properly
+        for lineno, line in enumerate(iter(stream.readline, ""), start=1):
+            argv = split_batch_line(line)
+            if argv:
+                yield self.parse_args(argv, lineno)
+
+    def parse_args(self, argv: List[str], lineno: int = 0) -> Dict[str, Any]:
+        """Parse the arguments of a single line."""
+        values = dict(self._defaults)
+        given: Set[str] = set()
+        positional: List[str] = []
+
+        args = iter(argv)
+        for arg in args:
+            if arg == "--":
+                positional.extend(args)
+                break
+            if not arg.startswith("-") or arg == "-":
+                positional.append(arg)
+                continue
+
+            name, eq, value = (
+                arg.partition("=") if arg.startswith("--") else (arg, "", "")
+            )
+            if name in self.flags:
+                if eq:
+                    self._fail(lineno, f"Option {name} does not take a value.")
+                values[self.flags[name]] = True
+            elif name in self.options:
+                if not eq:
+                    try:
+                        value = next(args)
+                    except StopIteration:
+                        self._fail(lineno, f"Option {name} requires an argument.")
+                values[self.options[name]] = value
+            else:
+                self._fail(lineno, f"No such option: {name}")
+            given.add(self.flags.get(name) or self.options[name])
+
+        if len(positional) < len(self.arguments):
+            missing = self.arguments[len(positional)]
+            self._fail(lineno, f"Missing argument '{missing.upper()}'.")
+        if len(positional) > len(self.arguments):
+            extra = " ".join(positional[len(self.arguments) :])
+            self._fail(lineno, f"Got unexpected extra argument ({extra})")
+        values.update(zip(self.arguments, positional))
+
+        mutex_given = [
+            opt
+            for opt in self.mutex
+            if (self.flags.get(opt) or self.options.get(opt)) in given
+        ]
+        if len(mutex_given) > 1:
+            self._fail(
+                lineno, f"{format_list_of_words(*self.mutex)} are mutually exclusive"
+            )
+
+        for name, func in self.convert.items():
+            if values.get(name) is not None:
+                values[name] = func(values[name])
+        return values
+
+    def _fail(self, lineno: int, message: str) -> NoReturn:
+        raise click.UsageError(f"--batch line {lineno}: {message}")
@@ -8,6 +8,7 @@ import jmespath
 # Format Enum for output formatting
 # could use a namedtuple, but that's overkill
 JSON_FORMAT = "json"
+JSONL_FORMAT = "jsonl"
 TEXT_FORMAT = "text"
 UNIX_FORMAT = "unix"
 
@@ -61,6 +62,9 @@ class CommandState:
     def outformat_is_unix(self):
         return self.output_format == UNIX_FORMAT
 
+    def outformat_is_jsonl(self):
+        return self.output_format == JSONL_FORMAT
+
     def is_verbose(self):
         return self.verbosity > 0
 
@@ -92,9 +96,14 @@ def format_option(f: Callable) -> Callable:
         "-F",
         "--format",
         type=click.Choice(
-            [UNIX_FORMAT, JSON_FORMAT, TEXT_FORMAT], case_sensitive=False
+            [UNIX_FORMAT, JSON_FORMAT, JSONL_FORMAT, TEXT_FORMAT],
+            case_sensitive=False,
+        ),
+        help=(
+            "Output format for stdout. Defaults to text. 'jsonl' prints one JSON "
+            "document per line, as results arrive: for a list of results, each "
+            "result is printed on its own, without the 'DATA' list around them"
         ),
-        help="Output format for stdout. Defaults to text",
         expose_value=False,
         callback=callback,
     )(f)
@@ -104,7 +113,8 @@ def format_option(f: Callable) -> Callable:
         help=(
             "A JMESPath expression to apply to json output. "
             "Takes precedence over any specified '--format' and forces "
-            "the format to be json processed by this expression"
+            "the format to be json processed by this expression. With "
+            "'--format jsonl', it is applied to each result in turn"
         ),
         expose_value=False,
         callback=jmespath_callback,
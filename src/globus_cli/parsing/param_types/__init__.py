@@ -7,20 +7,25 @@ from .endpoint_plus_path import (
 from .identity_type import IdentityType, ParsedIdentity
 from .location import LocationType
 from .nullable import StringOrNull, UrlOrNull, nullable_multi_callback
+from .numeric_comparison import NumericComparison
 from .prefix_mapper import JSONStringOrFile
-from .task_path import TaskPath
+from .size import ByteSize
+from .task_path import TaskPath, resolve_task_path
 
 __all__ = (
+    "ByteSize",
     "CommaDelimitedList",
     "ENDPOINT_PLUS_OPTPATH",
     "ENDPOINT_PLUS_REQPATH",
     "EndpointPlusPath",
     "IdentityType",
     "LocationType",
+    "NumericComparison",
     "ParsedIdentity",
     "StringOrNull",
     "UrlOrNull",
     "nullable_multi_callback",
     "JSONStringOrFile",
     "TaskPath",
+    "resolve_task_path",
 )
@@ -0,0 +1,44 @@
+import re
+from typing import Dict, Optional
+
+import click
+
+
+class NumericComparison(click.ParamType):
+    """
+    A number with an optional "+" or "-" prefix, in the style of `find -size`.
+    "+N" means more than N, "-N" means less than N, and a bare "N" means exactly N.
+
+    If ``units`` are given, the number may have one of them as a (case-insensitive)
+    suffix, and is multiplied by its value.
+
+    Converts to a ``(sign, number)`` tuple, where sign is one of "+", "-", or "".
+    """
+
+    # binary size units, for use as ``units``
+    SIZE_UNITS = {
+        "K": 1024,
+        "M": 1024**2,
+        "G": 1024**3,
+        "T": 1024**4,
+        "P": 1024**5,
+    }
+
+    def __init__(
+        self, *, units: Optional[Dict[str, int]] = None, metavar: str = "[+-]N"
+    ) -> None:
+        super().__init__()
+        self.units = {k.upper(): v for k, v in (units or {}).items()}
+        self.metavar = metavar
+
+    def get_metavar(self, param):
+        return self.metavar
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, tuple):
+            return value
+        match = re.match(r"^([+-]?)(\d+(?:\.\d*)?)([a-zA-Z]?)$", value.strip())
+        if not match or (match.group(3) and match.group(3).upper() not in self.units):
+            self.fail(f"{value} is not of the form {self.metavar}", param, ctx)
+        sign, number, unit = match.groups()
+        return (sign, float(number) * self.units.get(unit.upper(), 1))
@@ -0,0 +1,29 @@
+import re
+
+import click
+
+from .numeric_comparison import NumericComparison
+
+
+class ByteSize(click.ParamType):
+    """
+    A number of bytes, which may have a binary unit suffix (K, M, G, T, or P,
+    ignoring case), like "2T" or "1.5G".
+
+    Converts to an int.
+    """
+
+    name = "size"
+
+    def get_metavar(self, param):
+        return "N[KMGTP]"
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, int):
+            return value
+        match = re.match(r"^(\d+(?:\.\d*)?)([a-zA-Z]?)$", value.strip())
+        units = NumericComparison.SIZE_UNITS
+        if not match or (match.group(2) and match.group(2).upper() not in units):
+            self.fail(f"{value} is not a size of the form N[KMGTP]", param, ctx)
+        number, unit = match.groups()
+        return int(float(number) * units.get(unit.upper(), 1))
@@ -1,3 +1,5 @@
+from typing import Optional
+
 import click
 
 
@@ -57,6 +59,27 @@ def _pathjoin(a, b):
         return a + "/" + b
 
 
+def resolve_task_path(
+    path: str,
+    base_dir: Optional[str] = None,
+    *,
+    coerce_to_dir: bool = False,
+    normalize: bool = True,
+) -> str:
+    """
+    Join a path with an (optional) base dir, and then coerce it to the dir format and
+    normalize it, as requested. This is the processing done by TaskPath, for use
+    where a click param type is too costly, like reading --batch input.
+    """
+    if base_dir:
+        path = _pathjoin(base_dir, path)
+    if coerce_to_dir and not path.endswith("/"):
+        path += "/"
+    if normalize:
+        path = _normpath(path)
+    return path
+
+
 class TaskPath(click.ParamType):
     def __init__(
         self, base_dir=None, coerce_to_dir=False, normalize=True, require_absolute=False
@@ -87,14 +110,13 @@ class TaskPath(click.ParamType):
         if isinstance(value, TaskPath):
             return value
 
-        self.orig_path = self.path = value
-
-        if self.base_dir:
-            self.path = _pathjoin(self.base_dir, self.path)
-        if self.coerce_to_dir and not self.path.endswith("/"):
-            self.path += "/"
-        if self.normalize:
-            self.path = _normpath(self.path)
+        self.orig_path = value
+        self.path = resolve_task_path(
+            value,
+            self.base_dir,
+            coerce_to_dir=self.coerce_to_dir,
+            normalize=self.normalize,
+        )
 
         if self.require_absolute and not (
             self.path.startswith("/") or self.path.startswith("~")
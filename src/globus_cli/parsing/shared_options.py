@@ -3,12 +3,20 @@ from typing import Callable, List, Optional
 
 import click
 
+from globus_cli import login_manager
 from globus_cli.parsing.command_state import (
     debug_option,
     format_option,
     map_http_status_option,
     verbose_option,
 )
+from globus_cli.services.polling import PollingSchedule
+from globus_cli.services.rate_limit import (
+    DEFAULT_RATE_LIMIT_STRATEGY,
+    RATE_LIMIT_STRATEGIES,
+    build_rate_limiter,
+)
+from globus_cli.services.transfer.listing_cache import DEFAULT_TTL, ListingCache
 
 
 def common_options(
@@ -253,9 +261,104 @@ def delete_and_rm_options(
     return f
 
 
+def task_sharding_options(f):
+    """
+    Options for splitting a `--batch` task submission into several tasks
+    """
+    f = click.option(
+        "--max-items-per-task",
+        type=click.IntRange(min=1),
+        metavar="N",
+        help=(
+            "With `--batch`, submit a new task for every N items, as the batch is "
+            "read, and print the IDs of all of the tasks. Each task gets its own "
+            "submission ID"
+        ),
+    )(f)
+    f = click.option(
+        "--parallel-submissions",
+        default=4,
+        show_default=True,
+        type=click.IntRange(min=1),
+        metavar="N",
+        help=(
+            "With `--max-items-per-task`, submit up to N tasks at a time. Task IDs "
+            "are still printed in the order of the batch"
+        ),
+    )(f)
+    f = click.option(
+        "--journal",
+        type=click.Path(dir_okay=False, writable=True),
+        help=(
+            "With `--max-items-per-task`, record each task to this file before it "
+            "is submitted and once it is accepted, so that an interrupted "
+            "submission can be continued with `--resume-journal`"
+        ),
+    )(f)
+    f = click.option(
+        "--resume-journal",
+        is_flag=True,
+        help=(
+            "Continue an interrupted submission from the `--journal` file, if it "
+            "exists. Tasks which were accepted are not submitted again. The "
+            "submission must use the same batch and options"
+        ),
+    )(f)
+    return f
+
+
+def batch_dedupe_option(f):
+    """
+    An option for dropping the redundant items of `--batch` input
+    """
+    return click.option(
+        "--dedupe",
+        is_flag=True,
+        help=(
+            "With `--batch`, drop duplicate lines, and lines for paths which are "
+            "already covered by a recursive line for a parent directory. The whole "
+            "batch is read before anything is submitted"
+        ),
+    )(f)
+
+
+def dry_run_summary_option(f):
+    """
+    An option for a dry run which prints a summary of the task items, rather than
+    every item
+    """
+    return click.option(
+        "--dry-run-summary",
+        is_flag=True,
+        help=(
+            "Don't actually submit the task, print a summary of the submission "
+            "data instead: counts of items, recursive items, duplicate items, and "
+            "parent directories, and the size of the request. The items are read "
+            "once and not stored, so this works for batches of any size. Counts "
+            "above a few thousand are estimates, and the count of duplicate items "
+            "is then a lower bound"
+        ),
+    )(f)
+
+
 def synchronous_task_wait_options(f):
+    """
+    Options for commands which wait on tasks.
+
+    The polling options are combined into a single `polling` parameter, holding
+    the schedule of the waits between polls.
+    """
+
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        kwargs["polling"] = PollingSchedule(
+            kwargs.pop("polling_interval"),
+            max_interval=kwargs.pop("max_polling_interval"),
+        )
+        return f(*args, **kwargs)
+
     def polling_interval_callback(ctx, param, value):
-        if not value:
+        if value is None:
             return None
 
         if value < 1:
@@ -275,7 +378,7 @@ def synchronous_task_wait_options(f):
 
         return value
 
-    f = click.option(
+    wrapper = click.option(
         "--timeout",
         type=int,
         metavar="N",
@@ -284,16 +387,26 @@ def synchronous_task_wait_options(f):
             "then, or terminates with an unsuccessful status, "
             "exit with status 1"
         ),
-    )(f)
-    f = click.option(
+    )(wrapper)
+    wrapper = click.option(
         "--polling-interval",
         default=1,
         type=int,
         show_default=True,
         callback=polling_interval_callback,
         help="Number of seconds between Task status checks.",
-    )(f)
-    f = click.option(
+    )(wrapper)
+    wrapper = click.option(
+        "--max-polling-interval",
+        type=click.IntRange(min=1),
+        metavar="N",
+        help=(
+            "Poll adaptively: start at the polling interval, and wait longer after "
+            "each check in which the Task has made no progress, up to N seconds. "
+            "Go back to the polling interval when the Task progresses"
+        ),
+    )(wrapper)
+    wrapper = click.option(
         "--heartbeat",
         "-H",
         is_flag=True,
@@ -301,8 +414,8 @@ def synchronous_task_wait_options(f):
             'Every polling interval, print "." to stdout to '
             "indicate that task wait is still active"
         ),
-    )(f)
-    f = click.option(
+    )(wrapper)
+    wrapper = click.option(
         "--timeout-exit-code",
         type=int,
         default=1,
@@ -312,9 +425,110 @@ def synchronous_task_wait_options(f):
             "If the task times out, exit with this status code. Must have "
             "a value in 0,1,50-99"
         ),
-    )(f)
-    f = click.option("--meow", is_flag=True, hidden=True)(f)
-    return f
+    )(wrapper)
+    wrapper = click.option("--meow", is_flag=True, hidden=True)(wrapper)
+    return wrapper
+
+
+def rate_limit_options(f):
+    """
+    Options for commands which make many API calls in a loop, controlling the
+    client-side rate limiting of those calls.
+
+    The options are combined into a single `rate_limiter` parameter.
+    """
+
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        strategy = kwargs.pop("rate_limit")
+        max_request_rate = kwargs.pop("max_request_rate")
+        kwargs["rate_limiter"] = build_rate_limiter(strategy, max_request_rate)
+        return f(*args, **kwargs)
+
+    wrapper = click.option(
+        "--max-request-rate",
+        type=click.FloatRange(min=0, min_open=True),
+        envvar="GLOBUS_CLI_MAX_REQUEST_RATE",
+        metavar="N",
+        help=(
+            "The maximum number of API requests to make per second. With "
+            "`--rate-limit fixed`, requests are made at this rate. With "
+            "`--rate-limit adaptive`, the rate will not exceed this value. "
+            "Can also be set with GLOBUS_CLI_MAX_REQUEST_RATE"
+        ),
+    )(wrapper)
+    wrapper = click.option(
+        "--rate-limit",
+        type=click.Choice(RATE_LIMIT_STRATEGIES, case_sensitive=False),
+        default=DEFAULT_RATE_LIMIT_STRATEGY,
+        show_default=True,
+        envvar="GLOBUS_CLI_RATE_LIMIT",
+        help=(
+            "How to limit the rate of API requests. 'adaptive' speeds up while "
+            "the service responds quickly and slows down when it is slow or "
+            "requests that clients back off. 'fixed' uses a constant rate. "
+            "Can also be set with GLOBUS_CLI_RATE_LIMIT"
+        ),
+    )(wrapper)
+    return wrapper
+
+
+def listing_cache_options(f):
+    """
+    Options for commands which list directories, controlling the use of the
+    persistent listing cache. The cache is off by default.
+
+    The options are combined into a single `listing_cache` parameter, which is None
+    when the cache is not in use. The cache is closed when the command returns.
+    """
+
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        use_cache = kwargs.pop("cache")
+        refresh = kwargs.pop("refresh")
+        ttl = kwargs.pop("cache_ttl")
+        if not (use_cache or refresh):
+            kwargs["listing_cache"] = None
+            return f(*args, **kwargs)
+
+        filename, namespace = login_manager.listing_cache_location()
+        with ListingCache(
+            filename, namespace=namespace, ttl=ttl, refresh=refresh
+        ) as listing_cache:
+            kwargs["listing_cache"] = listing_cache
+            return f(*args, **kwargs)
+
+    wrapper = click.option(
+        "--cache-ttl",
+        type=click.IntRange(min=0),
+        default=DEFAULT_TTL,
+        show_default=True,
+        envvar="GLOBUS_CLI_LISTING_CACHE_TTL",
+        metavar="SECONDS",
+        help=(
+            "The maximum age of a cached listing which will be used. "
+            "Can also be set with GLOBUS_CLI_LISTING_CACHE_TTL"
+        ),
+    )(wrapper)
+    wrapper = click.option(
+        "--refresh",
+        is_flag=True,
+        help=(
+            "Do not use cached listings, but store new listings in the cache. "
+            "Implies `--cache`"
+        ),
+    )(wrapper)
+    wrapper = click.option(
+        "--cache/--no-cache",
+        default=False,
+        envvar="GLOBUS_CLI_LISTING_CACHE",
+        help=(
+            "Reuse recent directory listings from a local cache, and store new "
+            "listings in it. Can also be turned on by setting "
+            "GLOBUS_CLI_LISTING_CACHE=1  [default: no-cache]"
+        ),
+    )(wrapper)
+    return wrapper
 
 
 def security_principal_opts(
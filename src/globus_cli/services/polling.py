@@ -0,0 +1,91 @@
+"""
+Polling schedules for commands which wait on tasks.
+
+A schedule decides how long to wait before each poll of a task. A fixed schedule
+always waits the same interval. An adaptive schedule starts at the interval and
+backs off towards a ceiling while nothing changes, so that long tasks are not
+polled needlessly often, and goes back to the interval as soon as the task makes
+progress, so that short tasks are not waited on for long after they finish.
+"""
+
+import logging
+import math
+from typing import Any, Hashable, Mapping, Optional
+
+log = logging.getLogger(__name__)
+
+# the factor by which an adaptive interval grows after a poll without progress
+DEFAULT_BACKOFF = 2.0
+
+
+def task_progress(task: Mapping[str, Any]) -> Hashable:
+    """
+    Get the fields of a task document which change as the task makes progress.
+    """
+    return (
+        task.get("status"),
+        task.get("subtasks_pending"),
+        task.get("bytes_transferred"),
+    )
+
+
+class PollingSchedule:
+    """
+    A schedule of waits between polls.
+
+    With no ``max_interval``, or one no larger than ``interval``, every wait is
+    ``interval`` seconds. Otherwise, the schedule is adaptive: each wait is
+    ``backoff`` times the one before, up to ``max_interval``, unless the progress
+    seen on the last poll differs from the poll before, in which case the wait goes
+    back to ``interval``.
+
+    :param interval: The number of seconds to wait between polls, or to start at
+    :param max_interval: The ceiling on the number of seconds to wait between polls
+    :param backoff: The factor by which the wait grows after a poll with no progress
+    """
+
+    def __init__(
+        self,
+        interval: int,
+        *,
+        max_interval: Optional[int] = None,
+        backoff: float = DEFAULT_BACKOFF,
+    ) -> None:
+        if interval < 1:
+            raise ValueError("interval must be at least 1")
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self._current: Optional[int] = None
+        self._last_progress: Optional[Hashable] = None
+
+    @property
+    def adaptive(self) -> bool:
+        return self.max_interval is not None and self.max_interval > self.interval
+
+    def next_interval(
+        self, progress: Optional[Hashable] = None, remaining: Optional[int] = None
+    ) -> int:
+        """
+        Get the number of seconds to wait before the next poll.
+
+        :param progress: The progress seen on the last poll, as by `task_progress`
+        :param remaining: The number of seconds left before a timeout. An adaptive
+            wait is cut short so that it does not run past the timeout.
+        """
+        if not self.adaptive:
+            return self.interval
+        assert self.max_interval is not None
+
+        if self._current is None or progress != self._last_progress:
+            self._current = self.interval
+        else:
+            self._current = min(
+                math.ceil(self._current * self.backoff), self.max_interval
+            )
+        self._last_progress = progress
+        log.debug("next poll in %ds", self._current)
+
+        if remaining is not None:
+            return max(1, min(self._current, remaining))
+        return self._current
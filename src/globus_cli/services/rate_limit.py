@@ -0,0 +1,226 @@
+"""
+Client-side rate limiting for commands which make many API calls in a loop.
+
+A limiter is attached to a client, which calls ``acquire()`` before sending each
+request and ``observe()`` with the result of every request attempt, including
+attempts which the SDK will retry. Limiters must be safe to use from multiple
+threads.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+import requests
+
+log = logging.getLogger(__name__)
+
+# statuses which indicate that the service wants us to slow down
+THROTTLE_STATUS_CODES = (429, 503)
+
+RATE_LIMIT_STRATEGIES = ("adaptive", "fixed", "none")
+DEFAULT_RATE_LIMIT_STRATEGY = "adaptive"
+DEFAULT_MAX_REQUEST_RATE = 25.0
+DEFAULT_ADAPTIVE_MAX_REQUEST_RATE = 100.0
+
+
+def parse_retry_after(response: requests.Response) -> Optional[float]:
+    """
+    Get the Retry-After header of a response as a number of seconds.
+    HTTP-date values are not supported and are treated as absent.
+    """
+    val = response.headers.get("Retry-After")
+    if not val:
+        return None
+    try:
+        return max(float(val), 0.0)
+    except ValueError:
+        return None
+
+
+class RateLimiter:
+    """
+    The base rate limiter does not limit requests at all. It is only used when
+    rate limiting is turned off explicitly.
+    """
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+
+    def observe(
+        self,
+        latency: float,
+        status_code: Optional[int],
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """Record the latency and status of a completed request attempt."""
+
+    def observe_response(self, response: requests.Response) -> None:
+        self.observe(
+            response.elapsed.total_seconds(),
+            response.status_code,
+            parse_retry_after(response),
+        )
+
+
+class TokenBucketRateLimiter(RateLimiter):
+    """
+    Allow requests at a steady ``rate`` per second, with bursts of up to ``burst``
+    requests.
+
+    Throttling responses (429 or 503) pause all requests for the duration given in
+    their Retry-After header, or for one request interval if there is none.
+
+    :param rate: The number of requests per second to allow
+    :param burst: The number of requests which may be sent at once after an idle
+        period. Defaults to ``rate``.
+    :param clock: A monotonic clock, used for testing
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(burst if burst is not None else rate, 1.0)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._last_refill = clock()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._last_refill) * self.rate
+        )
+        self._last_refill = now
+
+    def acquire(self) -> None:
+        # take a token under the lock, allowing the count to go negative
+        # a negative count is a reservation against future refills, so that
+        # concurrent callers queue up behind one another rather than all waking up
+        # at once
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= 1
+            delay = max(-self._tokens / self.rate, self._paused_until - now, 0.0)
+        if delay > 0:
+            log.debug("rate limiter sleeping %.3f seconds", delay)
+            time.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    def observe(
+        self,
+        latency: float,
+        status_code: Optional[int],
+        retry_after: Optional[float] = None,
+    ) -> None:
+        if status_code in THROTTLE_STATUS_CODES:
+            pause = retry_after if retry_after is not None else 1 / self.rate
+            log.debug("rate limiter saw status %s, pausing %s", status_code, pause)
+            self.pause(pause)
+
+
+class AdaptiveRateLimiter(TokenBucketRateLimiter):
+    """
+    An AIMD (additive-increase, multiplicative-decrease) rate limiter.
+
+    The allowed request rate grows by ``increase`` requests per second after each
+    fast, successful request, up to ``max_rate``. It is cut by ``decrease_factor``
+    when the service throttles us or when a request takes longer than
+    ``target_latency`` seconds, down to ``min_rate``.
+
+    :param rate: The initial number of requests per second to allow
+    :param min_rate: The lowest rate which the limiter will back off to
+    :param max_rate: The highest rate which the limiter will ramp up to
+    :param target_latency: Requests slower than this are treated as a sign of an
+        overloaded service
+    :param increase: The additive increase in rate after a fast request
+    :param decrease_factor: The multiplicative decrease in rate after a slow or
+        throttled request
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_MAX_REQUEST_RATE,
+        *,
+        min_rate: float = 1.0,
+        max_rate: float = DEFAULT_ADAPTIVE_MAX_REQUEST_RATE,
+        target_latency: float = 5.0,
+        increase: float = 0.5,
+        decrease_factor: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not 0 < min_rate <= max_rate:
+            raise ValueError("rates must satisfy 0 < min_rate <= max_rate")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+        super().__init__(min(max(rate, min_rate), max_rate), clock=clock)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.target_latency = target_latency
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+
+    def _set_rate(self, rate: float) -> None:
+        with self._lock:
+            self._refill(self._clock())
+            self.rate = min(max(rate, self.min_rate), self.max_rate)
+            # the bucket size tracks the rate, so that a fast endpoint can take
+            # advantage of bursts but a throttled one cannot
+            self.burst = max(self.rate, 1.0)
+            self._tokens = min(self._tokens, self.burst)
+
+    def observe(
+        self,
+        latency: float,
+        status_code: Optional[int],
+        retry_after: Optional[float] = None,
+    ) -> None:
+        if status_code in THROTTLE_STATUS_CODES or latency > self.target_latency:
+            self._set_rate(self.rate * self.decrease_factor)
+            log.debug(
+                "adaptive rate limiter backing off to %.2f req/s "
+                "(status=%s, latency=%.3f)",
+                self.rate,
+                status_code,
+                latency,
+            )
+        elif status_code is not None and status_code < 400:
+            self._set_rate(self.rate + self.increase)
+        super().observe(latency, status_code, retry_after)
+
+
+def build_rate_limiter(
+    strategy: str, max_request_rate: Optional[float] = None
+) -> RateLimiter:
+    """
+    Build a rate limiter from commandline settings.
+
+    :param strategy: One of "adaptive", "fixed", or "none"
+    :param max_request_rate: For "fixed", the rate of requests per second. For
+        "adaptive", the ceiling on the rate of requests per second.
+    """
+    strategy = strategy.lower()
+    if strategy == "none":
+        return RateLimiter()
+    elif strategy == "fixed":
+        return TokenBucketRateLimiter(max_request_rate or DEFAULT_MAX_REQUEST_RATE)
+    elif strategy == "adaptive":
+        max_rate = max_request_rate or DEFAULT_ADAPTIVE_MAX_REQUEST_RATE
+        return AdaptiveRateLimiter(
+            min(DEFAULT_MAX_REQUEST_RATE, max_rate),
+            min_rate=min(1.0, max_rate),
+            max_rate=max_rate,
+        )
+    raise ValueError(f"unknown rate limit strategy: {strategy}")
@@ -0,0 +1,104 @@
+"""
+Throughput estimates for watching a task.
+
+Each snapshot of a task gives the number of bytes transferred so far. The
+instantaneous throughput is the rate between two successive snapshots. The
+smoothed throughput is a moving average of those rates, weighted by time, so that
+it follows changes in the rate without jumping on every poll. The weight of a
+rate halves every ``half_life`` seconds, however often the task is polled.
+"""
+
+import logging
+from typing import Any, Dict, Mapping, Optional
+
+log = logging.getLogger(__name__)
+
+# the number of seconds over which the weight of a rate in the average halves
+DEFAULT_HALF_LIFE = 30.0
+
+
+class ThroughputMonitor:
+    """
+    Estimate the throughput of a task, and the time left until it completes, from
+    successive snapshots of its task document.
+
+    Until there are two snapshots, the smoothed throughput is the task's own
+    ``effective_bytes_per_second``, its average over its whole life, if it has one.
+    The time left can only be estimated when the total number of bytes to transfer
+    is known.
+
+    :param total_bytes: The number of bytes which the task will transfer
+    :param half_life: The number of seconds over which the weight of a rate in the
+        smoothed throughput halves
+    """
+
+    def __init__(
+        self,
+        *,
+        total_bytes: Optional[int] = None,
+        half_life: float = DEFAULT_HALF_LIFE,
+    ) -> None:
+        if half_life <= 0:
+            raise ValueError("half_life must be positive")
+        self.total_bytes = total_bytes
+        self.half_life = half_life
+        self.smoothed: Optional[float] = None
+        self._last_bytes: Optional[int] = None
+        self._last_time: Optional[float] = None
+        self._start_time: Optional[float] = None
+
+    def sample(self, task: Mapping[str, Any], now: float) -> Dict[str, Any]:
+        """
+        Add a snapshot of a task, taken at ``now`` seconds on a monotonic clock,
+        and get the estimates as of that snapshot.
+        """
+        transferred = task.get("bytes_transferred") or 0
+        instantaneous: Optional[float] = None
+
+        if self._last_time is None:
+            self._start_time = now
+            effective = task.get("effective_bytes_per_second")
+            # a task which has not moved any data yet has no rate to start from
+            if effective:
+                self.smoothed = float(effective)
+        else:
+            assert self._last_bytes is not None
+            elapsed = now - self._last_time
+            # a snapshot taken without time passing has no rate of its own
+            if elapsed > 0:
+                instantaneous = max(transferred - self._last_bytes, 0) / elapsed
+                if self.smoothed is None:
+                    self.smoothed = instantaneous
+                else:
+                    weight = 1 - 0.5 ** (elapsed / self.half_life)
+                    self.smoothed += weight * (instantaneous - self.smoothed)
+        if self._last_time is None or now > self._last_time:
+            self._last_bytes = transferred
+            self._last_time = now
+        assert self._start_time is not None
+
+        sample = {
+            "task_id": task.get("task_id"),
+            "status": task.get("status"),
+            "elapsed_seconds": round(now - self._start_time, 3),
+            "bytes_transferred": transferred,
+            "files_transferred": task.get("files_transferred"),
+            "instantaneous_bytes_per_second": instantaneous,
+            "smoothed_bytes_per_second": self.smoothed,
+            "total_bytes": self.total_bytes,
+            "eta_seconds": self._eta(task, transferred),
+        }
+        log.debug("throughput sample: %s", sample)
+        return sample
+
+    def _eta(self, task: Mapping[str, Any], transferred: int) -> Optional[float]:
+        if task.get("status") == "SUCCEEDED":
+            return 0.0
+        if task.get("status") != "ACTIVE" or self.total_bytes is None:
+            return None
+        remaining = max(self.total_bytes - transferred, 0)
+        if not remaining:
+            return 0.0
+        if not self.smoothed:
+            return None
+        return remaining / self.smoothed
@@ -3,10 +3,20 @@ from .activation import (
     autoactivate,
     supported_activation_methods,
 )
+from .batch_summary import BatchSummary
 from .client import CustomTransferClient
+from .compact_items import CompactItemList
 from .data import assemble_generic_doc, display_name_or_cname, iterable_response_to_dict
 from .delegate_proxy import fill_delegate_proxy_activation_requirements
+from .glob_expand import GlobExpander
+from .listing_cache import ListingCache
 from .recursive_ls import RecursiveLsResponse
+from .recursive_ls_checkpoint import CheckpointMismatchError, RecursiveLsCheckpoint
+from .submission_journal import JournalMismatchError, SubmissionJournal
+from .sync_filter import SyncPrefilter
+from .task_history import TaskHistory
+from .task_shards import TaskShards
+from .tree_diff import TreeDiff
 
 ENDPOINT_LIST_FIELDS = (
     ("ID", "id"),
@@ -18,7 +28,19 @@ ENDPOINT_LIST_FIELDS = (
 __all__ = (
     "ENDPOINT_LIST_FIELDS",
     "CustomTransferClient",
+    "CompactItemList",
+    "BatchSummary",
     "RecursiveLsResponse",
+    "RecursiveLsCheckpoint",
+    "CheckpointMismatchError",
+    "ListingCache",
+    "SubmissionJournal",
+    "JournalMismatchError",
+    "TaskShards",
+    "TaskHistory",
+    "SyncPrefilter",
+    "TreeDiff",
+    "GlobExpander",
     "supported_activation_methods",
     "activation_requirements_help_text",
     "autoactivate",
@@ -0,0 +1,183 @@
+import hashlib
+import math
+from typing import Any, Dict, Mapping, Optional, Sequence, Set
+
+from .compact_items import iter_document_json
+
+# distinct values are counted exactly up to this many, and estimated after that
+DEFAULT_EXACT_LIMIT = 4096
+# a HyperLogLog with 2**14 registers has a standard error of about 0.8%
+HLL_PRECISION = 14
+
+
+def _hash64(value: str) -> int:
+    digest = hashlib.blake2b(value.encode("utf-8", "surrogatepass"), digest_size=8)
+    return int.from_bytes(digest.digest(), "big")
+
+
+def _parent_directory(path: str) -> str:
+    directory, slash, _ = path.rstrip("/").rpartition("/")
+    return directory + slash
+
+
+class _DistinctCounter:
+    """
+    Count the distinct values in a stream, in bounded memory.
+
+    The hashes of the values are kept in a set until there are ``exact_limit`` of
+    them. After that, they are folded into a HyperLogLog, and the count becomes an
+    estimate.
+    """
+
+    __slots__ = ("_exact_limit", "_hashes", "_registers")
+
+    def __init__(self, exact_limit: int = DEFAULT_EXACT_LIMIT) -> None:
+        self._exact_limit = exact_limit
+        self._hashes: Optional[Set[int]] = set()
+        self._registers: Optional[bytearray] = None
+
+    @property
+    def is_exact(self) -> bool:
+        return self._hashes is not None
+
+    def add(self, value: str) -> None:
+        hashed = _hash64(value)
+        if self._hashes is not None:
+            self._hashes.add(hashed)
+            if len(self._hashes) > self._exact_limit:
+                self._registers = bytearray(1 << HLL_PRECISION)
+                for folded in self._hashes:
+                    self._add_to_registers(folded)
+                self._hashes = None
+        else:
+            self._add_to_registers(hashed)
+
+    def _add_to_registers(self, hashed: int) -> None:
+        assert self._registers is not None
+        rest_bits = 64 - HLL_PRECISION
+        index = hashed >> rest_bits
+        rest = hashed & ((1 << rest_bits) - 1)
+        # the position of the first set bit of the rest of the hash
+        rank = rest_bits - rest.bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def __len__(self) -> int:
+        if self._hashes is not None:
+            return len(self._hashes)
+        assert self._registers is not None
+        m = len(self._registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0**-rank for rank in self._registers)
+        zeros = self._registers.count(0)
+        # small counts are better estimated by how many registers are still empty
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+
+class BatchSummary:
+    """
+    A summary of the items of a task document, gathered as the items are added, so
+    that a batch of any size can be described without holding its items.
+
+    A ``BatchSummary`` can be put in place of the ``DATA`` list of a
+    ``TransferData`` or ``DeleteData``, so that the items are summarized exactly as
+    ``add_item`` builds them. It counts the items, the recursive items, the
+    distinct parent directories of each path, and the duplicate items, and sums the
+    size of the items as they would be encoded in the request body.
+
+    Distinct values are counted exactly up to ``exact_limit`` values, and estimated
+    in a fixed amount of memory beyond that. Duplicates are only counted among the
+    first ``exact_limit`` distinct items, so beyond that the count of duplicate
+    items is a lower bound, which never reports an item as a duplicate wrongly.
+
+    :param path_keys: The keys of the paths in an item
+    :param max_items_per_task: If the items would be split into several tasks,
+        the maximum number of items in each task
+    :param exact_limit: The number of distinct values to count exactly
+    """
+
+    def __init__(
+        self,
+        path_keys: Sequence[str],
+        *,
+        max_items_per_task: Optional[int] = None,
+        exact_limit: int = DEFAULT_EXACT_LIMIT,
+    ) -> None:
+        self.path_keys = tuple(path_keys)
+        self.max_items_per_task = max_items_per_task
+        self.item_count = 0
+        self.recursive_count = 0
+        self.item_bytes = 0
+        self.duplicate_count = 0
+        self._exact_limit = exact_limit
+        self._parents = {key: _DistinctCounter(exact_limit) for key in path_keys}
+        # the hashes of the first distinct items, and whether all have been kept
+        self._seen_items: Set[int] = set()
+        self._duplicates_exact = True
+
+    def append(self, item: Mapping[str, Any]) -> None:
+        self.item_count += 1
+        if item.get("recursive"):
+            self.recursive_count += 1
+        self.item_bytes += len(
+            "".join(iter_document_json(item)).encode("utf-8", "surrogatepass")
+        )
+        for key in self.path_keys:
+            self._parents[key].add(_parent_directory(item[key]))
+        # trailing slashes do not make a path different
+        identity = {
+            key: value.rstrip("/") if key in self.path_keys else value
+            for key, value in item.items()
+        }
+        hashed = _hash64("".join(iter_document_json(dict(sorted(identity.items())))))
+        if hashed in self._seen_items:
+            self.duplicate_count += 1
+        elif len(self._seen_items) < self._exact_limit:
+            self._seen_items.add(hashed)
+        else:
+            self._duplicates_exact = False
+
+    def __len__(self) -> int:
+        return self.item_count
+
+    @property
+    def is_exact(self) -> bool:
+        return self._duplicates_exact and all(
+            counter.is_exact for counter in self._parents.values()
+        )
+
+    def summarize(self, document: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Get the summary of the items, for a task document which holds this
+        summary as its ``DATA``.
+        """
+        tasks = 1
+        if self.max_items_per_task and self.item_count:
+            tasks = math.ceil(self.item_count / self.max_items_per_task)
+        # every task repeats the rest of the document
+        envelope = "".join(iter_document_json(dict(document, DATA=[])))
+        payload_bytes = (
+            tasks * len(envelope.encode("utf-8"))
+            + self.item_bytes
+            # the commas between the items of each task
+            + max(self.item_count - tasks, 0)
+        )
+
+        # a delete is recursive as a whole, rather than item by item
+        recursive_count = self.recursive_count
+        if "recursive" in document:
+            recursive_count = self.item_count if document["recursive"] else 0
+
+        return {
+            "items": self.item_count,
+            "recursive_items": recursive_count,
+            "duplicate_items": self.duplicate_count,
+            "parent_directories": {
+                key: len(counter) for key, counter in self._parents.items()
+            },
+            "tasks": tasks,
+            "payload_bytes": payload_bytes,
+            "exact": self.is_exact,
+        }
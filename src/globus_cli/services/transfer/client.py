@@ -1,11 +1,13 @@
 import logging
 import textwrap
 import uuid
-from typing import Any, Dict, Tuple, Union
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
 import click
+import requests
 from globus_sdk import GlobusHTTPResponse, TransferClient
 from globus_sdk.transport import (
+    JSONRequestEncoder,
     RetryCheckFlags,
     RetryCheckResult,
     RetryContext,
@@ -13,9 +15,16 @@ from globus_sdk.transport import (
 )
 
 from globus_cli.login_manager import get_client_login, is_client_login
+from globus_cli.services.rate_limit import (
+    DEFAULT_RATE_LIMIT_STRATEGY,
+    build_rate_limiter,
+)
 
+from .compact_items import StreamingJSONBody, count_compact_items, iter_document_json
 from .data import display_name_or_cname
+from .listing_cache import ListingCache
 from .recursive_ls import RecursiveLsResponse
+from .recursive_ls_checkpoint import RecursiveLsCheckpoint
 
 log = logging.getLogger(__name__)
 
@@ -41,10 +50,60 @@ def _retry_client_consent(ctx: RetryContext) -> RetryCheckResult:
     return RetryCheckResult.no_decision
 
 
+class _CompactItemsJSONEncoder(JSONRequestEncoder):
+    """
+    A JSON encoder which can encode task documents holding a CompactItemList,
+    expanding the items one at a time. The bodies of documents with at least
+    ``stream_min_items`` items are streamed, rather than encoded up front.
+    """
+
+    stream_min_items = 1000
+
+    def encode(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        data: Any,
+        headers: Dict[str, str],
+    ) -> requests.Request:
+        item_count = count_compact_items(data)
+        if item_count is None:
+            return super().encode(method, url, params, data, headers)
+        body: Union[bytes, StreamingJSONBody]
+        if item_count >= self.stream_min_items:
+            body = StreamingJSONBody(data)
+        else:
+            body = "".join(iter_document_json(data)).encode("utf-8")
+        headers = {"Content-Type": "application/json", **headers}
+        return requests.Request(method, url, data=body, params=params, headers=headers)
+
+
 class CustomTransferClient(TransferClient):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.transport.register_retry_check(_retry_client_consent)
+        # the encoders are shared by all transports, so replace rather than modify
+        self.transport.encoders = {
+            **self.transport.encoders,
+            "json": _CompactItemsJSONEncoder(),
+        }
+
+        # pace requests the same way as a command run with the default
+        # rate limiting options, which replace this limiter with their own
+        self.rate_limiter = build_rate_limiter(DEFAULT_RATE_LIMIT_STRATEGY)
+        # the rate limiter must see every response, so its check goes before the
+        # default checks, which stop the check chain when they decide to retry
+        self.transport.retry_checks.insert(0, self._observe_rate_limit)
+
+    def _observe_rate_limit(self, ctx: RetryContext) -> RetryCheckResult:
+        if ctx.response is not None:
+            self.rate_limiter.observe_response(ctx.response)
+        return RetryCheckResult.no_decision
+
+    def request(self, *args, **kwargs):
+        self.rate_limiter.acquire()
+        return super().request(*args, **kwargs)
 
     # TODO: Remove this function when endpoints natively support recursive ls
     def recursive_operation_ls(
@@ -52,6 +111,13 @@ class CustomTransferClient(TransferClient):
         endpoint_id: Union[str, uuid.UUID],
         params: Dict[str, Any],
         depth: int = 3,
+        *,
+        parallelism: int = 1,
+        ordered: bool = False,
+        traversal: str = "dfs",
+        checkpoint: Optional[RecursiveLsCheckpoint] = None,
+        descend: Optional[Callable[[Dict[str, Any], int], bool]] = None,
+        cache: Optional[ListingCache] = None,
     ) -> RecursiveLsResponse:
         """
         Makes recursive calls to ``GET /operation/endpoint/<endpoint_id>/ls``
@@ -65,15 +131,39 @@ class CustomTransferClient(TransferClient):
             in params, the start path is determined by this endpoint.
         :param params: Parameters that will be passed through as query params.
         :param depth: The maximum file depth the recursive ls will go to.
+        :param parallelism: The maximum number of ls calls to run concurrently.
+        :param ordered: When running concurrent ls calls, preserve the ordering of a
+            serial traversal in the results.
+        :param traversal: The order in which to list directories: "dfs" for
+            depth-first, "bfs" for breadth-first, or "iddfs" for iterative
+            deepening, which gives breadth-first order in the memory of a
+            depth-first traversal by listing upper levels again.
+        :param checkpoint: A checkpoint for recording progress, so that an
+            interrupted listing can be resumed.
+        :param descend: A function called with each subdirectory and its depth,
+            which returns False for subdirectories which should not be listed.
+        :param cache: A cache of listings to use and update.
         """
         endpoint_id = str(endpoint_id)
         log.info(
-            "TransferClient.recursive_operation_ls(%s, %s, %s)",
+            "TransferClient.recursive_operation_ls(%s, %s, %s, parallelism=%s)",
             endpoint_id,
             depth,
             params,
+            parallelism,
+        )
+        return RecursiveLsResponse(
+            self,
+            endpoint_id,
+            params,
+            max_depth=depth,
+            parallelism=parallelism,
+            ordered=ordered,
+            traversal=traversal,
+            checkpoint=checkpoint,
+            descend=descend,
+            cache=cache,
         )
-        return RecursiveLsResponse(self, endpoint_id, params, max_depth=depth)
 
     def get_endpoint_w_server_list(
         self, endpoint_id
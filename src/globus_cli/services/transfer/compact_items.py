@@ -0,0 +1,322 @@
+import array
+import functools
+import json
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    overload,
+)
+
+ITEM_T = Dict[str, Any]
+
+# the keys whose values are stored front coded
+FRONT_CODED_KEYS = frozenset(("path", "source_path", "destination_path"))
+# the keys with few distinct values, which are stored in a table of values
+# the values of any other key, such as a checksum, are nearly all distinct, so
+# they are kept in a plain list
+VALUE_CODED_KEYS = frozenset(("DATA_TYPE", "recursive", "checksum_algorithm"))
+# every this many strings, one is stored in full, so that any string can be found
+# without decoding the whole column
+RESTART_INTERVAL = 32
+# the size of the chunks of a streamed request body
+BODY_CHUNK_SIZE = 64 * 1024
+
+# like the SDK's JSON encoder, refuse values which are not valid JSON
+_dumps = functools.partial(json.dumps, separators=(",", ":"), allow_nan=False)
+
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(buffer: bytearray, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = buffer[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _shared_prefix_len(a: bytes, b: bytes) -> int:
+    # a binary search, so that the comparisons are done in C
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[:mid] == b[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+class _FrontCodedColumn:
+    """
+    A column of strings, each stored as the length of the prefix it shares with the
+    string before it, and the rest of the string, in one buffer. The paths in a
+    batch usually share long prefixes, so this takes a fraction of the memory of
+    the strings themselves.
+    """
+
+    __slots__ = ("_buffer", "_restarts", "_count", "_last")
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._restarts = array.array("Q")
+        self._count = 0
+        self._last = b""
+
+    def append(self, value: str) -> None:
+        encoded = value.encode("utf-8", "surrogatepass")
+        if self._count % RESTART_INTERVAL == 0:
+            self._restarts.append(len(self._buffer))
+            shared = 0
+        else:
+            shared = _shared_prefix_len(self._last, encoded)
+        _write_varint(self._buffer, shared)
+        _write_varint(self._buffer, len(encoded) - shared)
+        self._buffer += encoded[shared:]
+        self._last = encoded
+        self._count += 1
+
+    def _decode(self, start: int, count: int) -> Iterator[str]:
+        """Decode ``count`` strings, starting from a restart point."""
+        buffer = self._buffer
+        pos = self._restarts[start // RESTART_INTERVAL]
+        last = b""
+        for _ in range(count):
+            shared, pos = _read_varint(buffer, pos)
+            length, pos = _read_varint(buffer, pos)
+            last = last[:shared] + bytes(buffer[pos : pos + length])
+            pos += length
+            yield last.decode("utf-8", "surrogatepass")
+
+    def __getitem__(self, index: int) -> str:
+        start = index - index % RESTART_INTERVAL
+        *_, value = self._decode(start, index - start + 1)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return self._decode(0, self._count)
+
+
+class _ValueColumn:
+    """
+    A column of values with few distinct values, like flags and checksum
+    algorithms, each stored as an index into a table of the distinct values.
+    """
+
+    __slots__ = ("_values", "_ids", "_codes")
+
+    def __init__(self) -> None:
+        self._values: List[Any] = []
+        # keyed on the type too, so that True and 1 are not the same value
+        self._ids: Dict[Tuple[type, Hashable], int] = {}
+        self._codes = array.array("I")
+
+    def append(self, value: Hashable) -> None:
+        key = (type(value), value)
+        code = self._ids.get(key)
+        if code is None:
+            code = self._ids[key] = len(self._values)
+            self._values.append(value)
+        self._codes.append(code)
+
+    def __getitem__(self, index: int) -> Any:
+        return self._values[self._codes[index]]
+
+    def __iter__(self) -> Iterator[Any]:
+        values = self._values
+        return (values[code] for code in self._codes)
+
+
+COLUMN_T = Union[_FrontCodedColumn, _ValueColumn, List[Any]]
+
+
+class CompactItemList(Sequence[ITEM_T]):
+    """
+    A list of the items of a task document, like the ``DATA`` of a
+    ``TransferData``, which stores the items by column rather than as dicts.
+
+    Paths are front coded, and values which repeat, like flags and checksum
+    algorithms, are stored as indexes into a table of distinct values, so that an
+    item takes tens of bytes rather than the several hundred bytes of a dict of
+    strings. Other values, like checksums, are kept in a plain list. Items are
+    expanded into dicts only when they are read.
+
+    Items are added with ``append``, so a ``CompactItemList`` can be put in place
+    of the ``DATA`` list of a ``TransferData`` or ``DeleteData``, and items can be
+    added with ``add_item`` as usual. The keys of each item are kept in order.
+    Values which cannot be stored in a column, such as a path which is not a
+    string, are kept as they are.
+    """
+
+    def __init__(self) -> None:
+        self._shapes: List[Tuple[str, ...]] = []
+        self._shape_ids: Dict[Tuple[str, ...], int] = {}
+        self._shape_codes = array.array("I")
+        self._columns: Dict[str, COLUMN_T] = {}
+        # (index -> {key: value}) for the values which are not in columns
+        self._extras: Dict[int, ITEM_T] = {}
+
+    def append(self, item: Mapping[str, Any]) -> None:
+        index = len(self._shape_codes)
+        shape = tuple(item)
+        shape_id = self._shape_ids.get(shape)
+        if shape_id is None:
+            shape_id = self._shape_ids[shape] = len(self._shapes)
+            self._shapes.append(shape)
+        self._shape_codes.append(shape_id)
+
+        extras: Optional[ITEM_T] = None
+        for key, existing in self._columns.items():
+            if key not in item:
+                self._append_placeholder(existing)
+        for key, value in item.items():
+            if key in self._columns:
+                column = self._columns[key]
+            else:
+                column = self._columns[key] = self._new_column(key, index)
+            if isinstance(column, _FrontCodedColumn):
+                storable = isinstance(value, str)
+            elif isinstance(column, _ValueColumn):
+                storable = isinstance(value, (str, bool, int, float, type(None)))
+            else:
+                storable = True
+            if storable:
+                column.append(value)
+            else:
+                self._append_placeholder(column)
+                if extras is None:
+                    extras = self._extras[index] = {}
+                extras[key] = value
+
+    def _new_column(self, key: str, fill: int) -> COLUMN_T:
+        column: COLUMN_T
+        if key in FRONT_CODED_KEYS:
+            column = _FrontCodedColumn()
+        elif key in VALUE_CODED_KEYS:
+            column = _ValueColumn()
+        else:
+            column = []
+        # line the new column up with the items before it
+        for _ in range(fill):
+            self._append_placeholder(column)
+        return column
+
+    @staticmethod
+    def _append_placeholder(column: COLUMN_T) -> None:
+        if isinstance(column, _FrontCodedColumn):
+            column.append("")
+        else:
+            column.append(None)
+
+    def __len__(self) -> int:
+        return len(self._shape_codes)
+
+    @overload
+    def __getitem__(self, index: int) -> ITEM_T:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[ITEM_T]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[ITEM_T, List[ITEM_T]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("item index out of range")
+        extras = self._extras.get(index, {})
+        return {
+            key: extras[key] if key in extras else self._columns[key][index]
+            for key in self._shapes[self._shape_codes[index]]
+        }
+
+    def __iter__(self) -> Iterator[ITEM_T]:
+        # read the columns together, rather than looking up each item
+        columns = {key: iter(column) for key, column in self._columns.items()}
+        for index, shape_code in enumerate(self._shape_codes):
+            values = {key: next(column) for key, column in columns.items()}
+            values.update(self._extras.get(index, {}))
+            yield {key: values[key] for key in self._shapes[shape_code]}
+
+    def __repr__(self) -> str:
+        return f"CompactItemList(<{len(self)} items>)"
+
+
+def iter_document_json(document: Mapping[str, Any]) -> Iterator[str]:
+    """
+    Encode a task document as JSON, in pieces. Any ``CompactItemList`` in the
+    document is expanded one item at a time, so that its items are never all held
+    in memory as dicts.
+    """
+    yield "{"
+    for i, (key, value) in enumerate(document.items()):
+        if i:
+            yield ","
+        yield _dumps(key) + ":"
+        if isinstance(value, CompactItemList):
+            yield "["
+            for j, item in enumerate(value):
+                yield ("," if j else "") + _dumps(item)
+            yield "]"
+        else:
+            yield _dumps(value)
+    yield "}"
+
+
+def count_compact_items(data: Any) -> Optional[int]:
+    """
+    Count the items of any ``CompactItemList`` in a document, or return None if
+    the data is not a document with a ``CompactItemList`` in it.
+    """
+    if not isinstance(data, Mapping):
+        return None
+    lists = [value for value in data.values() if isinstance(value, CompactItemList)]
+    return sum(len(value) for value in lists) if lists else None
+
+
+class StreamingJSONBody:
+    """
+    A request body which encodes a task document as JSON while it is sent, in
+    chunks of about ``chunk_size`` bytes, so that the encoded document is never
+    held in memory. ``requests`` sends an iterable body with chunked transfer
+    encoding.
+
+    The document is encoded again each time the body is iterated over, so that a
+    request which is retried sends the whole body again.
+    """
+
+    def __init__(
+        self, document: Mapping[str, Any], chunk_size: int = BODY_CHUNK_SIZE
+    ) -> None:
+        self.document = document
+        self.chunk_size = chunk_size
+
+    def __iter__(self) -> Iterator[bytes]:
+        pieces: List[str] = []
+        size = 0
+        for piece in iter_document_json(self.document):
+            pieces.append(piece)
+            size += len(piece)
+            if size >= self.chunk_size:
+                yield "".join(pieces).encode("utf-8")
+                pieces, size = [], 0
+        if pieces:
+            yield "".join(pieces).encode("utf-8")
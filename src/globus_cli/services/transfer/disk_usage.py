@@ -0,0 +1,92 @@
+import logging
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from .recursive_ls import LISTING_T
+
+log = logging.getLogger(__name__)
+
+
+class _OpenDirectory:
+    """
+    The running totals for a directory whose subtree has not been fully listed
+    """
+
+    __slots__ = ("path", "depth", "size", "files", "directories", "pending")
+
+    def __init__(self, path: str, depth: int, pending: int) -> None:
+        self.path = path
+        self.depth = depth
+        self.size = 0
+        self.files = 0
+        self.directories = 0
+        # the number of subdirectories whose totals have not been added in yet
+        self.pending = pending
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "size": self.size,
+            "files": self.files,
+            "directories": self.directories,
+        }
+
+
+def _parent_path(path: str) -> str:
+    return path.rsplit("/", 1)[0] if "/" in path else ""
+
+
+def iter_disk_usage(
+    listings: Iterable[LISTING_T], max_depth: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Sum up the sizes and counts of files under each directory of a recursive
+    listing, yielding the totals for each directory as soon as all of its subtree
+    has been listed.
+
+    Only the directories which have been listed but whose subtrees are incomplete
+    are held in memory, so the listings can be streamed. Totals are yielded
+    children-first, and the totals for the start of the listing (with a path of "")
+    come last.
+
+    Sizes are the sum of the sizes of all non-directory items. Items of
+    subdirectories which were not listed (because of a depth limit) are not
+    counted.
+
+    :param listings: The directory listings, as given by
+        ``RecursiveLsResponse.listings()``
+    :param max_depth: If given, only yield totals for directories up to this depth
+        below the start of the listing
+    """
+    open_dirs: Dict[str, _OpenDirectory] = {}
+
+    for rel_path, items, subdirs in listings:
+        node = _OpenDirectory(
+            rel_path, rel_path.count("/") + 1 if rel_path else 0, len(subdirs)
+        )
+        for item in items:
+            if item["type"] == "dir":
+                node.directories += 1
+            else:
+                node.files += 1
+                node.size += item.get("size") or 0
+        open_dirs[rel_path] = node
+
+        # close out this directory, and any ancestors which were only waiting on
+        # it to be complete
+        while node.pending == 0:
+            del open_dirs[node.path]
+            if max_depth is None or node.depth <= max_depth:
+                yield node.as_dict()
+            if node.depth == 0:
+                break
+            parent = open_dirs[_parent_path(node.path)]
+            parent.size += node.size
+            parent.files += node.files
+            parent.directories += node.directories
+            parent.pending -= 1
+            node = parent
+
+    if open_dirs:
+        log.warning(
+            "disk usage listing ended with %d incomplete directories", len(open_dirs)
+        )
@@ -0,0 +1,140 @@
+import calendar
+import re
+import time
+from fnmatch import translate
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# a comparison as parsed by NumericComparison, e.g. ("+", 1024.0)
+COMPARISON_T = Tuple[str, float]
+ITEM_T = Dict[str, Any]
+
+SECONDS_PER_DAY = 86400
+
+# operation_ls lists a symlink as the file or directory it points to, so the only
+# links which can be found are the broken ones
+TYPE_ALIASES = {"link": "invalid_symlink"}
+
+
+def parse_last_modified(value: str) -> float:
+    """
+    Convert a Transfer ``last_modified`` timestamp, like
+    "2020-09-23 18:53:12+00:00", to seconds since the epoch. Timestamps are always
+    in UTC.
+    """
+    return calendar.timegm(time.strptime(value[:19], "%Y-%m-%d %H:%M:%S"))
+
+
+def _compile_globs(patterns: Iterable[str]) -> Optional["re.Pattern[str]"]:
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{translate(p)})" for p in patterns))
+
+
+def _compare(comparison: COMPARISON_T) -> Callable[[float], bool]:
+    sign, number = comparison
+    if sign == "+":
+        return lambda x: x > number
+    elif sign == "-":
+        return lambda x: x < number
+    return lambda x: x == number
+
+
+def _compare_age(comparison: COMPARISON_T) -> Callable[[float], bool]:
+    # like `find -mtime`, a bare number of days N matches ages in [N, N+1)
+    sign, number = comparison
+    if sign:
+        return _compare(comparison)
+    return lambda x: number <= x < number + 1
+
+
+def _check_size(compare: Callable[[float], bool]) -> Callable[[ITEM_T], bool]:
+    return lambda item: compare(float(item.get("size") or 0))
+
+
+def _check_age(
+    compare: Callable[[float], bool], now: float
+) -> Callable[[ITEM_T], bool]:
+    def check(item: ITEM_T) -> bool:
+        # an item with no modification time has no age to compare
+        if not item.get("last_modified"):
+            return False
+        modified = parse_last_modified(item["last_modified"])
+        return compare((now - modified) / SECONDS_PER_DAY)
+
+    return check
+
+
+def _basename(item: ITEM_T) -> str:
+    return str(item["name"]).rsplit("/", 1)[-1]
+
+
+class FindPredicates:
+    """
+    A set of conditions on the items of a recursive listing, in the style of
+    `find`. All of the given conditions must be true for an item to match.
+
+    The conditions are compiled once, into a list of checks which is run on every
+    item, so that the per-item cost is low.
+
+    Depths count from the start of the listing, so that the items in the start
+    directory have a depth of 1.
+
+    :param names: Glob patterns, one of which must match an item's name
+    :param types: Item types ("file", "dir", or "link"), one of which must match.
+        "link" matches broken symlinks, of type "invalid_symlink"
+    :param sizes: Comparisons with the size of an item, in bytes
+    :param mtimes: Comparisons with the age of an item, in days
+    :param min_depth: The minimum depth of a matching item
+    :param max_depth: The maximum depth of a matching item. Directories at this
+        depth are not listed.
+    :param prune: Glob patterns for the names of directories not to descend into
+    :param now: The current time, in seconds since the epoch, for computing ages
+    """
+
+    def __init__(
+        self,
+        *,
+        names: Iterable[str] = (),
+        types: Iterable[str] = (),
+        sizes: Iterable[COMPARISON_T] = (),
+        mtimes: Iterable[COMPARISON_T] = (),
+        min_depth: int = 0,
+        max_depth: Optional[int] = None,
+        prune: Iterable[str] = (),
+        now: Optional[float] = None,
+    ) -> None:
+        self.min_depth = min_depth
+        self.max_depth = max_depth
+        now = time.time() if now is None else now
+
+        checks: List[Callable[[ITEM_T], bool]] = []
+        name_re = _compile_globs(names)
+        if name_re is not None:
+            checks.append(lambda item: name_re.match(_basename(item)) is not None)
+        type_set = frozenset(TYPE_ALIASES.get(t, t) for t in types)
+        if type_set:
+            checks.append(lambda item: item["type"] in type_set)
+        checks.extend(_check_size(_compare(c)) for c in sizes)
+        checks.extend(_check_age(_compare_age(c), now) for c in mtimes)
+        self._checks = checks
+        self._prune_re = _compile_globs(prune)
+
+    def matches(self, item: ITEM_T, depth: int) -> bool:
+        """Check if an item at a given depth matches all of the conditions."""
+        if depth < self.min_depth:
+            return False
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+        return all(check(item) for check in self._checks)
+
+    def descend(self, item: ITEM_T, depth: int) -> bool:
+        """
+        Check if a directory at a given depth should be listed, or if nothing
+        under it can match.
+        """
+        if self.max_depth is not None and depth >= self.max_depth:
+            return False
+        if self._prune_re is not None and self._prune_re.match(_basename(item)):
+            return False
+        return True
@@ -0,0 +1,183 @@
+import functools
+import logging
+import re
+import sys
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+import globus_sdk
+
+from .recursive_ls import ITEM_T, RecursiveLsResponse
+
+if TYPE_CHECKING:
+    from .client import CustomTransferClient
+    from .listing_cache import ListingCache
+
+log = logging.getLogger(__name__)
+
+GLOB_CHARS = frozenset("*?[")
+
+
+def has_magic(segment: str) -> bool:
+    """Check if a path segment has any glob characters which are not escaped."""
+    escaped = False
+    for char in segment:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char in GLOB_CHARS:
+            return True
+    return False
+
+
+def unescape(segment: str) -> str:
+    """Remove the backslashes which escape glob characters in a path segment."""
+    return re.sub(r"\\(.)", r"\1", segment)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_segment(segment: str) -> "re.Pattern[str]":
+    """
+    Compile the glob pattern for one segment of a path into a regex.
+
+    ``*`` matches any characters, ``?`` matches one character, and ``[...]``
+    matches one of a set of characters (``[!...]`` for any but those characters).
+    A backslash escapes the character after it. As in a shell, a wildcard does not
+    match a leading '.' unless the pattern starts with one.
+    """
+    parts = []
+    if not segment.startswith("."):
+        parts.append(r"(?!\.)")
+    i = 0
+    while i < len(segment):
+        char = segment[i]
+        i += 1
+        if char == "\\" and i < len(segment):
+            parts.append(re.escape(segment[i]))
+            i += 1
+        elif char == "*":
+            parts.append(".*")
+        elif char == "?":
+            parts.append(".")
+        elif char == "[":
+            # a ']' right after the '[' (or '[!') is part of the set
+            start = i + 1 if segment[i : i + 1] == "!" else i
+            end = segment.find("]", start + 1)
+            if end < 0:
+                parts.append(re.escape(char))
+                continue
+            chars = segment[i:end].replace("\\", "\\\\")
+            if chars.startswith("!"):
+                chars = "^" + chars[1:]
+            parts.append(f"[{chars}]")
+            i = end + 1
+        else:
+            parts.append(re.escape(char))
+    return re.compile("".join(parts) + r"\Z", re.DOTALL)
+
+
+def split_pattern(pattern: str) -> Tuple[Optional[str], List[str]]:
+    """
+    Split a path pattern into the directory to start listing from, with the
+    escapes removed, and the segments to match below it.
+
+    The start directory is made of the segments before the first one with glob
+    characters, so that only the part of the tree which can match is listed. At
+    least the last segment is always matched, so that a path without glob
+    characters is only expanded if it exists.
+    """
+    parts = pattern.split("/")
+    first_magic = next(
+        (i for i, part in enumerate(parts) if has_magic(part)), len(parts) - 1
+    )
+    if first_magic == 0:
+        start = None
+    else:
+        start = "/".join(unescape(part) for part in parts[:first_magic]) + "/"
+    return start, [part for part in parts[first_magic:] if part]
+
+
+class GlobExpander:
+    """
+    Expand glob patterns into the paths which match them on an endpoint, by listing
+    the directories which they can match.
+
+    Patterns may have globs in any segment, e.g. ``/data/2020-*/logs/*.tmp``. The
+    listing starts from the deepest directory with no globs, and only descends
+    into subdirectories which match the next segment of the pattern. Hidden files
+    are matched only by segments which start with a '.'. A pattern which ends with
+    a '/' only matches directories.
+
+    The counts and sizes of the matches are kept, so that a batch can be described
+    before it is submitted. Sizes are those of files; the contents of matching
+    directories are not listed.
+
+    :param client: ``TransferClient`` used for making the operation_ls calls
+    :param endpoint_id: The endpoint to expand patterns on
+    :param parallelism: The maximum number of concurrent operation_ls calls
+    :param cache: A listing cache to read listings from and store them in
+    """
+
+    def __init__(
+        self,
+        client: "CustomTransferClient",
+        endpoint_id: str,
+        *,
+        parallelism: int = 1,
+        cache: Optional["ListingCache"] = None,
+    ) -> None:
+        self._client = client
+        self._endpoint_id = endpoint_id
+        self._parallelism = parallelism
+        self._cache = cache
+        self.file_count = 0
+        self.dir_count = 0
+        self.total_bytes = 0
+
+    def expand(self, pattern: str) -> Iterator[ITEM_T]:
+        """
+        Yield the items matching a pattern, as listed, with a ``path`` for each.
+        Nothing is yielded if the pattern's start directory does not exist.
+        """
+        dirs_only = pattern.endswith("/") and pattern.rstrip("/") != ""
+        start, segments = split_pattern(pattern.rstrip("/") if dirs_only else pattern)
+        if not segments:
+            return
+        regexes = [compile_segment(segment) for segment in segments]
+
+        def descend(item: Dict[str, Any], depth: int) -> bool:
+            name = item["name"].rsplit("/", 1)[-1]
+            return depth < len(regexes) and bool(regexes[depth - 1].match(name))
+
+        ls_params: Dict[str, Any] = {"show_hidden": 1}
+        if start is not None:
+            ls_params["path"] = start.rstrip("/") or "/"
+        try:
+            res: RecursiveLsResponse = self._client.recursive_operation_ls(
+                self._endpoint_id,
+                ls_params,
+                depth=sys.maxsize,
+                parallelism=self._parallelism,
+                descend=descend,
+                cache=self._cache,
+            )
+        except globus_sdk.TransferAPIError as err:
+            if err.http_status != 404:
+                raise
+            log.debug("no matches for %s, %s does not exist", pattern, start)
+            return
+
+        for item in res:
+            names = item["name"].split("/")
+            # the directories above the item were matched by `descend`
+            if len(names) != len(regexes) or not regexes[-1].match(names[-1]):
+                continue
+            if dirs_only and item["type"] != "dir":
+                continue
+            if item["type"] == "dir":
+                self.dir_count += 1
+            else:
+                self.file_count += 1
+                self.total_bytes += item.get("size") or 0
+            item["path"] = (start or "") + item["name"]
+            yield item
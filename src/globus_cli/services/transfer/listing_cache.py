@@ -0,0 +1,208 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple, Union, cast
+
+from globus_sdk import TransferClient
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TTL = 300
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class ListingCache:
+    """
+    A persistent cache of ``operation_ls`` results, stored in a SQLite database.
+
+    Listings are keyed by namespace, endpoint, path, and the other query params of
+    the listing. Each listing is also stored with the modification time of the
+    directory, when that is known from the listing of its parent. A cached listing
+    is used if it is younger than ``ttl`` seconds and, when both are known, the
+    directory's modification time has not changed since it was cached.
+
+    When the stored listings grow past ``max_bytes``, expired listings are evicted,
+    followed by the oldest listings if that is not enough.
+
+    The cache may be used from multiple threads.
+
+    :param filename: The database file
+    :param namespace: A namespace for the cached listings, so that listings made
+        under different logins are not mixed up
+    :param ttl: The maximum age in seconds of a cached listing which will be used
+    :param max_bytes: The maximum total size of the stored (compressed) listings
+    :param refresh: If True, never read listings from the cache, but store new
+        listings in it
+    :param clock: A wall clock, used for testing
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        *,
+        namespace: str = "",
+        ttl: float = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        refresh: bool = False,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.filename = filename
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._db = sqlite3.connect(filename, check_same_thread=False, timeout=10)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS listing ("
+                "namespace TEXT, endpoint_id TEXT, path TEXT, params TEXT, "
+                "mtime TEXT, fetched_at REAL, size INTEGER, data BLOB, "
+                "PRIMARY KEY (namespace, endpoint_id, path, params))"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS listing_age ON listing (fetched_at)"
+            )
+        (total,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM listing"
+        ).fetchone()
+        self._total_bytes: int = total
+
+    def __enter__(self) -> "ListingCache":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _key(
+        self, endpoint_id: Union[str, uuid.UUID], params: Dict[str, Any]
+    ) -> Tuple[str, str, str, str]:
+        other_params = {k: v for k, v in params.items() if k != "path"}
+        return (
+            self.namespace,
+            str(endpoint_id),
+            params.get("path", ""),
+            json.dumps(other_params, sort_keys=True),
+        )
+
+    def get(
+        self,
+        endpoint_id: Union[str, uuid.UUID],
+        params: Dict[str, Any],
+        *,
+        mtime: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached listing, or None if there is no usable cached listing.
+
+        :param endpoint_id: The endpoint which was listed
+        :param params: The query params of the listing, including its path
+        :param mtime: The current modification time of the directory, if known
+        """
+        if self.refresh:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT mtime, fetched_at, data FROM listing "
+                "WHERE namespace = ? AND endpoint_id = ? AND path = ? AND params = ?",
+                self._key(endpoint_id, params),
+            ).fetchone()
+        if row is None:
+            return None
+        cached_mtime, fetched_at, data = row
+        if fetched_at + self.ttl < self._clock():
+            return None
+        if mtime is not None and cached_mtime is not None and mtime != cached_mtime:
+            return None
+        log.debug("listing cache hit for %s:%s", endpoint_id, params.get("path"))
+        return cast(Dict[str, Any], json.loads(zlib.decompress(data)))
+
+    def put(
+        self,
+        endpoint_id: Union[str, uuid.UUID],
+        params: Dict[str, Any],
+        listing: Dict[str, Any],
+        *,
+        mtime: Optional[str] = None,
+    ) -> None:
+        """
+        Store a listing in the cache, evicting old listings as needed.
+
+        :param endpoint_id: The endpoint which was listed
+        :param params: The query params of the listing, including its path
+        :param listing: The listing document
+        :param mtime: The modification time of the directory, if known
+        """
+        data = zlib.compress(json.dumps(listing, separators=(",", ":")).encode())
+        now = self._clock()
+        key = self._key(endpoint_id, params)
+        with self._lock, self._db:
+            old = self._db.execute(
+                "SELECT size FROM listing "
+                "WHERE namespace = ? AND endpoint_id = ? AND path = ? AND params = ?",
+                key,
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO listing VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                key + (mtime, now, len(data), data),
+            )
+            self._total_bytes += len(data) - (old[0] if old else 0)
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        # nothing is evicted until the cache is over its size limit, to keep the
+        # cost of each store low
+        if self._total_bytes <= self.max_bytes:
+            return
+        self._db.execute("DELETE FROM listing WHERE fetched_at < ?", (now - self.ttl,))
+        (self._total_bytes,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM listing"
+        ).fetchone()
+        # evict the oldest listings until the cache is down to 3/4 of its limit, so
+        # that eviction does not happen on every store
+        target = self.max_bytes * 3 // 4
+        if self._total_bytes <= target:
+            return
+        freed = 0
+        cutoff = None
+        for fetched_at, size in self._db.execute(
+            "SELECT fetched_at, size FROM listing ORDER BY fetched_at"
+        ).fetchall():
+            freed += size
+            cutoff = fetched_at
+            if self._total_bytes - freed <= target:
+                break
+        self._db.execute("DELETE FROM listing WHERE fetched_at <= ?", (cutoff,))
+        (self._total_bytes,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM listing"
+        ).fetchone()
+        log.debug("evicted listings from cache, now %d bytes", self._total_bytes)
+
+    def operation_ls(
+        self,
+        client: TransferClient,
+        endpoint_id: Union[str, uuid.UUID],
+        params: Dict[str, Any],
+        *,
+        mtime: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get a listing from the cache if possible, and otherwise do an
+        ``operation_ls`` call and cache the result.
+        """
+        cached = self.get(endpoint_id, params, mtime=mtime)
+        if cached is not None:
+            return cached
+        res = client.operation_ls(endpoint_id, **params)
+        listing: Dict[str, Any] = res.data
+        self.put(endpoint_id, params, listing, mtime=mtime)
+        return listing
@@ -1,35 +1,76 @@
 # TDOD: Remove this file when endpoints natively support recursive ls
 
 import logging
-import time
-from collections import deque
-from typing import Any, Deque, Dict, Iterator, Optional, Tuple, cast
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
 
-from globus_sdk import TransferClient
+from globus_sdk import GlobusHTTPResponse, TransferClient
+
+from .recursive_ls_frontier import (
+    DEFAULT_MEMORY_LIMIT,
+    QUEUE_ENTRY_T,
+    SpillingFrontier,
+    SpillingQueue,
+)
+
+if TYPE_CHECKING:
+    from .listing_cache import ListingCache
+    from .recursive_ls_checkpoint import RecursiveLsCheckpoint
 
 log = logging.getLogger(__name__)
 
 ITEM_T = Dict[str, Any]
-QUEUE_T = Deque[Tuple[Optional[str], str, int]]
-
-# constants for controlling client-side rate limiting
-SLEEP_FREQUENCY = 25
-SLEEP_LEN = 1
-
-
-def _client_side_limiter() -> Iterator[None]:
-    counter = 0
-    while True:
-        counter += 1
-        # rate limit based on number of ls calls we have made
-        if counter % SLEEP_FREQUENCY == 0:
-            log.debug(
-                "recursive_operation_ls sleeping %s seconds to rate limit itself.",
-                SLEEP_LEN,
-            )
-            time.sleep(SLEEP_LEN)
+# an operation_ls response, or a cached listing document
+LS_RESPONSE_T = Union[GlobusHTTPResponse, Dict[str, Any]]
+# (relative_path, items, queued_subdirectories)
+LISTING_T = Tuple[str, List[ITEM_T], List[QUEUE_ENTRY_T]]
+# either kind of frontier
+FRONTIER_T = Union[SpillingFrontier[QUEUE_ENTRY_T], SpillingQueue[QUEUE_ENTRY_T]]
+
+TRAVERSALS = ("dfs", "bfs", "iddfs")
+
+_E = TypeVar("_E", bound=Tuple[Any, ...])
+_R = TypeVar("_R")
 
-        yield
+
+def concurrent_listings(
+    dir_queue: Union[SpillingFrontier[_E], SpillingQueue[_E]],
+    list_dir: Callable[[_E], _R],
+    parallelism: int,
+) -> Iterator[Tuple[_E, _R]]:
+    """
+    Pop directories from a frontier and list them in a pool of worker threads,
+    keeping up to ``parallelism`` listings in flight at all times. Each entry is
+    yielded with its listing as soon as the listing completes.
+
+    The consumer may add entries to the frontier between listings. Iteration stops
+    once the frontier is empty and every listing has been yielded.
+    """
+    in_flight: Dict["Future[_R]", _E] = {}
+
+    with ThreadPoolExecutor(max_workers=parallelism) as executor:
+        while dir_queue or in_flight:
+            while dir_queue and len(in_flight) < parallelism:
+                entry = dir_queue.pop()
+                in_flight[executor.submit(list_dir, entry)] = entry
+
+            log.debug("waiting on %d listings", len(in_flight))
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                entry = in_flight.pop(future)
+                yield entry, future.result()
 
 
 class RecursiveLsResponse:
@@ -39,9 +80,45 @@ class RecursiveLsResponse:
     Used for iterating over potentially very large file systems without keeping the
     whole filesystem tree in memory.
 
-    Uses an internal queue for BFS of the filesystem.
+    Uses an internal frontier of directories waiting to be listed for traversal of
+    the filesystem. Once the frontier holds more than ``frontier_memory_limit``
+    directories, the excess is spilled to a temporary file, so that very wide trees
+    can be listed in bounded memory.
+
+    The ``traversal`` decides the order in which directories are listed:
+
+    - "dfs" (depth-first) keeps the frontier as a stack. Each subtree is finished
+      before its next sibling is started, and the frontier stays small, holding
+      only the unlisted siblings of the directories on the current path.
+    - "bfs" (breadth-first) keeps the frontier as a queue. The tree is listed one
+      level at a time, so shallow results come first, but the frontier holds a
+      whole level of the tree.
+    - "iddfs" (iterative deepening) does a depth-first pass for each level of the
+      tree, yielding only the listings of that level. This gives breadth-first
+      order with the frontier of a depth-first traversal, at the cost of listing
+      the upper levels of the tree again on each pass. A ``cache`` makes the
+      repeated listings cheap. It cannot be used with a ``checkpoint``.
+
+    Calls are rate limited by the ``rate_limiter`` of the client, if it has one.
+
+    When ``parallelism`` is greater than 1, up to that many ``operation_ls`` calls
+    are run concurrently in a pool of worker threads. Items are still yielded one
+    directory listing at a time, but by default listings are yielded in the order in
+    which they complete. Set ``ordered=True`` to get exactly the same ordering as a
+    serial traversal, at the cost of some throughput.
+
+    When a ``checkpoint`` is given, progress is recorded to it after all of the
+    items from each directory have been consumed. If the checkpoint was loaded from
+    a previous, interrupted listing, the traversal resumes from there.
+
+    When ``descend`` is given, it is called with each subdirectory item and the
+    depth the subdirectory would be listed at (1 for subdirectories of the start
+    path), and the subdirectory is only listed if it returns True. This can be used
+    to prune the traversal.
 
-    Rate limits calls to reduce the changes of connection errors.
+    When a ``cache`` is given, listings are read from it when possible, and stored in
+    it otherwise. Each subdirectory's modification time, from the listing of its
+    parent, is used to check that a cached listing is still current.
 
     :param client: `TransferClient`` used for making the operation_ls calls.
     :param endpoint_id: The endpoint that will be recursively ls'ed.
@@ -49,6 +126,15 @@ class RecursiveLsResponse:
     :param max_depth: The maximum depth the recursive ls will go into the filesys
     :param filter_after_first: If True, any filter in ``ls_params`` will be applied
         to all calls. If False, any filter will be removed after the first ls.
+    :param parallelism: The maximum number of concurrent operation_ls calls
+    :param ordered: If True, yield listings in serial traversal order even when
+        ``parallelism`` is greater than 1
+    :param traversal: The order of traversal, one of "dfs", "bfs", or "iddfs"
+    :param checkpoint: A checkpoint to record progress to, and possibly resume from
+    :param descend: A function which decides whether or not to list a subdirectory
+    :param cache: A listing cache to read listings from and store them in
+    :param frontier_memory_limit: The number of pending directories to hold in
+        memory before spilling to disk
     """
 
     def __init__(
@@ -59,12 +145,33 @@ class RecursiveLsResponse:
         *,
         max_depth: int = 3,
         filter_after_first: bool = True,
+        parallelism: int = 1,
+        ordered: bool = False,
+        traversal: str = "dfs",
+        checkpoint: Optional["RecursiveLsCheckpoint"] = None,
+        descend: Optional[Callable[[ITEM_T, int], bool]] = None,
+        cache: Optional["ListingCache"] = None,
+        frontier_memory_limit: int = DEFAULT_MEMORY_LIMIT,
     ) -> None:
+        if parallelism < 1:
+            raise ValueError("parallelism must be at least 1")
+        if traversal not in TRAVERSALS:
+            raise ValueError(f"traversal must be one of {TRAVERSALS}")
+        if traversal == "iddfs" and checkpoint is not None:
+            raise ValueError("an iddfs traversal cannot be checkpointed")
+
         self._client = client
         self._endpoint_id = endpoint_id
         self._ls_params = ls_params
         self._max_depth = max_depth
         self._filter_after_first = filter_after_first
+        self._parallelism = parallelism
+        self._ordered = ordered
+        self._traversal = traversal
+        self._checkpoint = checkpoint
+        self._descend = descend
+        self._cache = cache
+        self._frontier_memory_limit = frontier_memory_limit
 
         start_path = cast(Optional[str], ls_params.get("path"))
         log.info(
@@ -76,82 +183,256 @@ class RecursiveLsResponse:
         # call the iterable_func method to convert it to a generator expression
         self._generator = self._iterable_func(start_path)
 
-        # grab the first element out of the internal iteration function
+        # grab the first listing out of the internal iteration function, so that
+        # errors from the first call are raised here
         # because this could raise a StopIteration exception, we need to be
         # careful and make sure that such a condition is respected (and
         # replicated as an iterable of length 0)
         try:
-            self._first_elem: Optional[ITEM_T] = next(self._generator)
+            self._first_listing: Optional[LISTING_T] = next(self._generator)
         except StopIteration:
-            # express this internally as "first_elem is null" -- just need some
+            # express this internally as "first_listing is null" -- just need some
             # way of making sure that it's clear
-            self._first_elem = None
+            self._first_listing = None
 
     def __iter__(self) -> Iterator[ITEM_T]:
-        if self._first_elem is not None:
-            yield self._first_elem
+        for _, items, _ in self.listings():
+            yield from items
+
+    def listings(self) -> Iterator[LISTING_T]:
+        """
+        Iterate over whole directory listings, rather than over the items in them.
+
+        Each listing is a tuple of the path of the directory relative to the start
+        path, the items in the directory (with names relative to the start path), and
+        the queue entries for the subdirectories which will be listed.
+
+        A response may only be iterated over once, either with this method or by
+        iterating over its items.
+        """
+        if self._first_listing is not None:
+            yield self._first_listing
             yield from self._generator
 
-    def _iterable_func(self, start_path: Optional[str]) -> Iterator[ITEM_T]:
+    def _iterable_func(self, start_path: Optional[str]) -> Iterator[LISTING_T]:
         """
         An internal function which has generator semantics. Defined using the
         `yield` syntax.
-        Used to grab the first element during class initialization, and
-        subsequently on calls to `next()` to get the remaining elements.
+        Used to grab the first listing during class initialization, and
+        subsequently on calls to `next()` to get the remaining listings.
         We rely on the implicit StopIteration built into this type of function
         to propagate through the final `next()` call.
         """
-        # iterator used for client-side limiting
-        limiter = _client_side_limiter()
-
-        # queue of (absolute_path, relative_path, depth) tuples.
-        dir_queue: QUEUE_T = deque()
         # initialized with the start path (if any) and a depth of 0
-        dir_queue.append((start_path, "", 0))
+        root: QUEUE_ENTRY_T = (start_path, "", 0, None)
+        if self._traversal == "iddfs":
+            listings = self._iterative_deepening_listings(root)
+        else:
+            listings = self._frontier_listings(root)
 
-        # BFS is not done until the queue is empty
-        while dir_queue:
-            next(limiter)
-            log.debug(
-                "recursive_operation_ls BFS queue not empty, getting next path now."
+        # for each item in the listing data update the item's name with
+        # the relative path of the listed directory, and yield the listing
+        for rel_path, res_data, subdirs in listings:
+            for item in res_data:
+                item["name"] = (rel_path + "/" if rel_path else "") + item["name"]
+            yield rel_path, res_data, subdirs
+            # the consumer has asked for the next listing, so it is done with
+            # this directory
+            if self._checkpoint is not None:
+                self._checkpoint.record_done(rel_path, subdirs)
+
+        if self._checkpoint is not None:
+            self._checkpoint.record_complete()
+
+    def _new_frontier(self) -> FRONTIER_T:
+        if self._traversal == "bfs":
+            return SpillingQueue[QUEUE_ENTRY_T](self._frontier_memory_limit)
+        return SpillingFrontier[QUEUE_ENTRY_T](self._frontier_memory_limit)
+
+    def _frontier_listings(self, root: QUEUE_ENTRY_T) -> Iterator[LISTING_T]:
+        """
+        Traverse the whole tree with a single frontier.
+        """
+        with self._new_frontier() as dir_queue:
+            if self._checkpoint is not None:
+                dir_queue.extend(self._checkpoint.start(self._settings(), root))
+            else:
+                dir_queue.extend([root])
+
+            if self._parallelism == 1:
+                yield from self._serial_listings(dir_queue)
+            elif self._ordered:
+                yield from self._ordered_concurrent_listings(dir_queue)
+            else:
+                yield from self._concurrent_listings(dir_queue)
+
+    def _iterative_deepening_listings(self, root: QUEUE_ENTRY_T) -> Iterator[LISTING_T]:
+        """
+        Do a depth-first pass down to each level of the tree in turn, yielding only
+        the listings of the directories at that level.
+
+        The directories above the current level are only listed to find their
+        subdirectories, so their listings are not yielded. The listings at the
+        current level are yielded with their subdirectories, as in any other
+        traversal, but those are left for the next pass. Passes stop once a level
+        has no subdirectories to list.
+
+        Directories are listed in the same order as a serial depth-first pass, with
+        up to ``parallelism`` of the next directories prefetched.
+        """
+        level = 0
+        deeper = True
+        with ThreadPoolExecutor(max_workers=self._parallelism) as executor:
+            while deeper:
+                deeper = False
+                log.debug("recursive_operation_ls starting pass for depth %d", level)
+                with SpillingFrontier[QUEUE_ENTRY_T](
+                    self._frontier_memory_limit
+                ) as dir_queue:
+                    dir_queue.extend([root])
+                    prefetched: Dict[QUEUE_ENTRY_T, "Future[LS_RESPONSE_T]"] = {}
+                    while dir_queue:
+                        self._prefetch(executor, dir_queue, prefetched)
+                        entry = dir_queue.pop()
+                        _, rel_path, depth, _ = entry
+                        res = prefetched.pop(entry).result()
+                        subdirs = self._subdirectories(res, rel_path, depth)
+                        if depth < level:
+                            dir_queue.extend(subdirs)
+                        else:
+                            deeper = deeper or bool(subdirs)
+                            yield rel_path, res["DATA"], subdirs
+                level += 1
+
+    def _settings(self) -> Dict[str, Any]:
+        """
+        The settings which must match for a checkpoint to be resumed
+        """
+        return {
+            "endpoint_id": self._endpoint_id,
+            "ls_params": self._ls_params,
+            "max_depth": self._max_depth,
+            "filter_after_first": self._filter_after_first,
+        }
+
+    def _operation_ls(self, entry: QUEUE_ENTRY_T) -> LS_RESPONSE_T:
+        """
+        Do a single operation_ls call on a directory from the queue, or get its
+        listing from the cache.
+
+        The query params are copied for each call, so that this is safe to run from
+        multiple worker threads at once.
+        """
+        abs_path, _, depth, mtime = entry
+        params = dict(self._ls_params)
+        # set the target path to the absolute path if it exists
+        if abs_path is not None:
+            params["path"] = abs_path
+        # if filter_after_first is False, stop filtering after the first
+        # ls call has been made
+        if depth > 0 and not self._filter_after_first:
+            params.pop("filter", None)
+        if self._cache is not None:
+            return self._cache.operation_ls(
+                self._client, self._endpoint_id, params, mtime=mtime
+            )
+        return self._client.operation_ls(self._endpoint_id, **params)
+
+    def _subdirectories(
+        self, res: LS_RESPONSE_T, rel_path: str, depth: int
+    ) -> List[QUEUE_ENTRY_T]:
+        """
+        Get the queue entries for the subdirectories of a listing, if there are
+        additional listings to do and we are not at the depth limit
+        """
+        if depth >= self._max_depth:
+            return []
+        # queue data includes the dir's name in the absolute and relative paths,
+        # increases the depth by one, and records the dir's modification time.
+        # data is reversed for a stack, to maintain any "orderby" ordering
+        data = res["DATA"] if self._traversal == "bfs" else reversed(res["DATA"])
+        return [
+            (
+                res["path"] + item["name"],
+                (rel_path + "/" if rel_path else "") + item["name"],
+                depth + 1,
+                item.get("last_modified"),
             )
+            for item in data
+            if item["type"] == "dir"
+            and (self._descend is None or self._descend(item, depth + 1))
+        ]
+
+    def _serial_listings(self, dir_queue: FRONTIER_T) -> Iterator[LISTING_T]:
+        # traversal is not done until the queue is empty
+        while dir_queue:
+            log.debug("recursive_operation_ls queue not empty, getting next path now.")
 
             # get path and current depth from the queue
-            abs_path, rel_path, depth = dir_queue.pop()
-
-            # set the target path to the popped absolute path if it exists
-            if abs_path is not None:
-                self._ls_params["path"] = abs_path
-
-            # do the operation_ls with the updated params
-            res = self._client.operation_ls(self._endpoint_id, **self._ls_params)
-            res_data = res["DATA"]
-
-            # add to the queue if there are additional listings to do
-            # and we are not at the depth limit
-            if depth < self._max_depth:
-                # queue data includes the dir's name in the absolute and relative paths
-                # and increases the depth by one.
-                dir_queue.extend(
-                    [
-                        (
-                            res["path"] + item["name"],
-                            (rel_path + "/" if rel_path else "") + item["name"],
-                            depth + 1,
-                        )
-                        # data is reversed to maintain any "orderby" ordering
-                        for item in reversed(res_data)
-                        if item["type"] == "dir"
-                    ]
-                )
-
-            # if filter_after_first is False, stop filtering after the first
-            # ls call has been made
-            if not self._filter_after_first:
-                self._ls_params.pop("filter", None)
-
-            # for each item in the response data update the item's name with
-            # the relative path popped from the queue, and yield the item
-            for item in res_data:
-                item["name"] = (rel_path + "/" if rel_path else "") + item["name"]
-                yield cast(ITEM_T, item)
+            entry = dir_queue.pop()
+            _, rel_path, depth, _ = entry
+
+            res = self._operation_ls(entry)
+            subdirs = self._subdirectories(res, rel_path, depth)
+            dir_queue.extend(subdirs)
+            yield rel_path, res["DATA"], subdirs
+
+    def _concurrent_listings(self, dir_queue: FRONTIER_T) -> Iterator[LISTING_T]:
+        """
+        Keep up to ``parallelism`` listings in flight at all times, and yield each
+        listing as soon as it completes.
+        """
+        for (_, rel_path, depth, _), res in concurrent_listings(
+            dir_queue, self._operation_ls, self._parallelism
+        ):
+            subdirs = self._subdirectories(res, rel_path, depth)
+            dir_queue.extend(subdirs)
+            yield rel_path, res["DATA"], subdirs
+
+    def _prefetch(
+        self,
+        executor: ThreadPoolExecutor,
+        dir_queue: FRONTIER_T,
+        prefetched: Dict[QUEUE_ENTRY_T, "Future[LS_RESPONSE_T]"],
+    ) -> None:
+        """
+        Start listing the next ``parallelism`` directories which will be popped
+        from the queue, if they are not already prefetched.
+
+        On a stack, the subdirectories of each listing are pushed on top of entries
+        which were already prefetched. Up to ``parallelism`` of those are kept, the
+        ones nearest the top first, and the rest are cancelled or dropped, so that
+        at most twice ``parallelism`` listings are held at any depth. A dropped
+        directory is listed again when it reaches the top.
+        """
+        # the next entries to be popped are at the right end of the queue
+        upcoming = dir_queue.peek(self._parallelism)
+        # entries were prefetched in order, so the oldest are deepest in the stack
+        pushed_down = [entry for entry in prefetched if entry not in upcoming]
+        for entry in pushed_down[: max(len(pushed_down) - self._parallelism, 0)]:
+            log.debug("dropping prefetched listing of %s", entry[0])
+            prefetched.pop(entry).cancel()
+
+        for entry in upcoming:
+            if entry not in prefetched:
+                prefetched[entry] = executor.submit(self._operation_ls, entry)
+
+    def _ordered_concurrent_listings(
+        self, dir_queue: FRONTIER_T
+    ) -> Iterator[LISTING_T]:
+        """
+        Walk the queue in exactly the same order as the serial traversal, but
+        prefetch the listings of the next ``parallelism`` directories which will be
+        popped from the queue.
+        """
+        prefetched: Dict[QUEUE_ENTRY_T, "Future[LS_RESPONSE_T]"] = {}
+
+        with ThreadPoolExecutor(max_workers=self._parallelism) as executor:
+            while dir_queue:
+                self._prefetch(executor, dir_queue, prefetched)
+                entry = dir_queue.pop()
+                _, rel_path, depth, _ = entry
+                res = prefetched.pop(entry).result()
+                subdirs = self._subdirectories(res, rel_path, depth)
+                dir_queue.extend(subdirs)
+                yield rel_path, res["DATA"], subdirs
@@ -0,0 +1,199 @@
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+from typing import IO, Any, Dict, Iterator, Optional, Sequence
+
+from .recursive_ls import QUEUE_ENTRY_T
+
+log = logging.getLogger(__name__)
+
+
+class CheckpointMismatchError(ValueError):
+    """
+    A checkpoint file was written by a listing with different settings from the
+    one trying to resume from it.
+    """
+
+
+class RecursiveLsCheckpoint:
+    """
+    An on-disk record of the progress of a recursive listing, which allows an
+    interrupted listing to be resumed.
+
+    The file is an append-only log of JSON lines. The first line holds the settings
+    of the listing. After that, there is one line for each directory whose items
+    have all been emitted, which also holds the queue entries for the subdirectories
+    found in that directory. A final line marks the listing as complete.
+
+    Replaying the log gives back the queue of directories which were pending when
+    the listing stopped. Directories which were being listed when it stopped are
+    listed again on resume, so their items may be emitted twice. The log is
+    replayed into a temporary SQLite database rather than into memory, so that
+    resuming the listing of a wide tree takes no more memory than starting it.
+
+    Each record is synced to disk as it is written, so that a crash loses at most
+    the record being written.
+
+    :param filename: The checkpoint file to write
+    :param resume: If True and the file exists, load the pending queue from it and
+        append to it. Otherwise, start a new checkpoint file.
+    """
+
+    # version 2 added the modification time to the queue entries
+    VERSION = 2
+
+    def __init__(self, filename: str, *, resume: bool = False) -> None:
+        self.filename = filename
+        self.resume = resume
+        self.completed = False
+        self._settings: Dict[str, Any] = {}
+        self._file: Optional[IO[str]] = None
+
+    def __enter__(self) -> "RecursiveLsCheckpoint":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def start(
+        self, settings: Dict[str, Any], root: QUEUE_ENTRY_T
+    ) -> Iterator[QUEUE_ENTRY_T]:
+        """
+        Start recording a listing, and get the queue which it should start from,
+        in the order in which the entries were queued.
+
+        :param settings: The settings of the listing (endpoint, params, etc). When
+            resuming, these must match the settings stored in the file.
+        :param root: The queue entry for the start of the listing
+        """
+        # round-trip through JSON so that the settings compare equal to loaded ones
+        self._settings = json.loads(json.dumps(settings))
+        if self.resume and os.path.exists(self.filename):
+            pending = self._load(root)
+            self._file = open(self.filename, "a", encoding="utf-8")
+            return pending
+
+        self._file = open(self.filename, "w", encoding="utf-8")
+        self._write({"version": self.VERSION, "settings": self._settings})
+        return iter([root])
+
+    def _load(self, root: QUEUE_ENTRY_T) -> Iterator[QUEUE_ENTRY_T]:
+        fd, db_filename = tempfile.mkstemp(prefix="globus-ls-", suffix=".db")
+        os.close(fd)
+        # the database is scratch space which is deleted after the replay
+        db = sqlite3.connect(db_filename)
+        try:
+            db.execute("PRAGMA journal_mode=OFF")
+            db.execute("PRAGMA synchronous=OFF")
+            # entries are ordered by when their directory was first queued
+            db.execute(
+                "CREATE TABLE pending (seq INTEGER PRIMARY KEY, "
+                "rel_path TEXT UNIQUE, entry TEXT)"
+            )
+            with db:
+                self._replay(db, root)
+            (count,) = db.execute("SELECT COUNT(*) FROM pending").fetchone()
+        except BaseException:
+            db.close()
+            os.remove(db_filename)
+            raise
+
+        log.info(
+            "loaded checkpoint from %s with %d pending directories",
+            self.filename,
+            count,
+        )
+        return self._pending(db, db_filename)
+
+    @staticmethod
+    def _pending(db: sqlite3.Connection, db_filename: str) -> Iterator[QUEUE_ENTRY_T]:
+        try:
+            for (entry,) in db.execute("SELECT entry FROM pending ORDER BY seq"):
+                abs_path, rel_path, depth, mtime = json.loads(entry)
+                yield abs_path, rel_path, depth, mtime
+        finally:
+            db.close()
+            os.remove(db_filename)
+
+    def _replay(self, db: sqlite3.Connection, root: QUEUE_ENTRY_T) -> None:
+        def queue(entry: Sequence[Any]) -> None:
+            rel_path, encoded = entry[1], json.dumps(list(entry))
+            updated = db.execute(
+                "UPDATE pending SET entry = ? WHERE rel_path = ?", (encoded, rel_path)
+            )
+            if not updated.rowcount:
+                db.execute(
+                    "INSERT INTO pending (rel_path, entry) VALUES (?, ?)",
+                    (rel_path, encoded),
+                )
+
+        good_offset = 0
+        with open(self.filename, "rb") as fp:
+            for lineno, line in enumerate(fp):
+                # a torn final line is left behind if we died while writing it
+                # ignore it, and truncate it away below
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete line")
+                    record = json.loads(line)
+                except ValueError:
+                    log.warning("ignoring torn checkpoint record at line %d", lineno)
+                    break
+                good_offset += len(line)
+
+                if lineno == 0:
+                    self._check_header(record)
+                    queue(root)
+                elif "done" in record:
+                    db.execute(
+                        "DELETE FROM pending WHERE rel_path = ?", (record["done"],)
+                    )
+                    for entry in record["queued"]:
+                        queue(entry)
+                elif record.get("complete"):
+                    self.completed = True
+                    db.execute("DELETE FROM pending")
+
+        if good_offset == 0:
+            raise CheckpointMismatchError(
+                f"{self.filename} is not a recursive listing checkpoint"
+            )
+        with open(self.filename, "r+b") as log_file:
+            log_file.truncate(good_offset)
+
+    def _check_header(self, record: Dict[str, Any]) -> None:
+        if record.get("version") != self.VERSION:
+            raise CheckpointMismatchError(
+                f"{self.filename} has unsupported version {record.get('version')}"
+            )
+        if record.get("settings") != self._settings:
+            raise CheckpointMismatchError(
+                f"{self.filename} was written by a listing with different settings"
+            )
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        if self._file is None:
+            raise ValueError("checkpoint has not been started")
+        # each record is written as one line, so that a crash can tear at most the
+        # final line, and synced, so that it survives a crash
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def record_done(self, rel_path: str, queued: Sequence[QUEUE_ENTRY_T]) -> None:
+        """
+        Record that all of the items in a directory have been emitted, along with
+        the subdirectories which were queued from its listing.
+        """
+        self._write({"done": rel_path, "queued": queued})
+
+    def record_complete(self) -> None:
+        self.completed = True
+        self._write({"complete": True})
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,260 @@
+import abc
+import collections
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+from typing import (
+    Any,
+    Deque,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+log = logging.getLogger(__name__)
+
+# (absolute_path, relative_path, depth, last_modified)
+QUEUE_ENTRY_T = Tuple[Optional[str], str, int, Optional[str]]
+
+DEFAULT_MEMORY_LIMIT = 10000
+
+# the entries of a frontier, which are tuples of JSON values
+_E = TypeVar("_E", bound=Tuple[Any, ...])
+_T = TypeVar("_T", bound="_SpillingEntries[Any]")
+
+
+def _chunks(entries: Iterable[_E], size: int) -> Iterator[List[_E]]:
+    """Split entries into lists of at most ``size``, so they are never all held."""
+    iterator = iter(entries)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class _SpillingEntries(abc.ABC, Generic[_E]):
+    """
+    The parts of a spilling frontier which do not depend on its order: the
+    temporary SQLite database which entries are spilled to, and its cleanup.
+
+    Entries may be any tuples of JSON values, such as ``QUEUE_ENTRY_T``.
+    """
+
+    def __init__(
+        self,
+        memory_limit: int = DEFAULT_MEMORY_LIMIT,
+        *,
+        spill_dir: Optional[str] = None,
+    ) -> None:
+        if memory_limit < 2:
+            raise ValueError("memory_limit must be at least 2")
+        self.memory_limit = memory_limit
+        self._spill_dir = spill_dir
+        self._spilled = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_filename: Optional[str] = None
+
+    def __len__(self) -> int:
+        return self._in_memory() + self._spilled
+
+    def __enter__(self: _T) -> _T:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    @abc.abstractmethod
+    def _in_memory(self) -> int:
+        """The number of entries held in memory."""
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        if self._db_filename is not None:
+            os.remove(self._db_filename)
+            self._db_filename = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            fd, self._db_filename = tempfile.mkstemp(
+                prefix="globus-ls-", suffix=".db", dir=self._spill_dir
+            )
+            os.close(fd)
+            log.debug("spilling recursive ls frontier to %s", self._db_filename)
+            # the database is scratch space which is deleted on close, so there is
+            # no need to pay for durability
+            self._db = sqlite3.connect(self._db_filename, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=OFF")
+            self._db.execute("PRAGMA synchronous=OFF")
+            self._db.execute(
+                "CREATE TABLE frontier (id INTEGER PRIMARY KEY, entry TEXT)"
+            )
+        return self._db
+
+    def _write(self, entries: Iterable[_E]) -> None:
+        db = self._connect()
+        with db:
+            db.executemany(
+                "INSERT INTO frontier (entry) VALUES (?)",
+                ((json.dumps(entry),) for entry in entries),
+            )
+
+    def _read(self, count: int, newest: bool) -> List[_E]:
+        """
+        Remove up to ``count`` entries from the database, either the newest or the
+        oldest, and return them in the order in which they were written.
+        """
+        if not self._spilled or self._db is None:
+            return []
+        with self._db:
+            rows = self._db.execute(
+                "SELECT id, entry FROM frontier "
+                f"ORDER BY id {'DESC' if newest else 'ASC'} LIMIT ?",
+                (count,),
+            ).fetchall()
+            if newest:
+                self._db.execute("DELETE FROM frontier WHERE id >= ?", (rows[-1][0],))
+                rows.reverse()
+            else:
+                self._db.execute("DELETE FROM frontier WHERE id <= ?", (rows[-1][0],))
+        self._spilled -= len(rows)
+        return [cast(_E, tuple(json.loads(entry))) for _, entry in rows]
+
+
+class SpillingFrontier(_SpillingEntries[_E]):
+    """
+    A stack of directories waiting to be listed, which moves entries out to a
+    temporary SQLite database when it grows past ``memory_limit`` entries. Popping
+    from a stack gives a depth-first traversal.
+
+    The top of the stack (the entries which will be popped next) is always kept in
+    memory. When the in-memory part overflows, its bottom half is written to disk.
+    When it runs dry, the top of the on-disk part is read back in. This keeps the
+    memory used by a traversal bounded no matter how wide the tree is, while a tree
+    which never overflows never touches the disk.
+
+    :param memory_limit: The number of entries to keep in memory before spilling
+    :param spill_dir: The directory to create the temporary database in. Defaults
+        to the system temporary directory.
+    """
+
+    def __init__(
+        self,
+        memory_limit: int = DEFAULT_MEMORY_LIMIT,
+        *,
+        spill_dir: Optional[str] = None,
+    ) -> None:
+        super().__init__(memory_limit, spill_dir=spill_dir)
+        # ordered from the bottom of the stack to the top
+        self._memory: List[_E] = []
+
+    def _in_memory(self) -> int:
+        return len(self._memory)
+
+    def extend(self, entries: Iterable[_E]) -> None:
+        """Push entries onto the stack, in order, so the last is popped first."""
+        for chunk in _chunks(entries, self.memory_limit):
+            self._memory.extend(chunk)
+            if len(self._memory) > self.memory_limit:
+                self._spill()
+
+    def pop(self) -> _E:
+        """Pop the top entry of the stack."""
+        if not self._memory:
+            self._unspill(self.memory_limit // 2)
+        return self._memory.pop()
+
+    def peek(self, count: int) -> List[_E]:
+        """Get (up to) the next ``count`` entries to be popped, in pop order."""
+        if len(self._memory) < count:
+            self._unspill(count - len(self._memory))
+        return self._memory[: -count - 1 : -1]
+
+    def _spill(self) -> None:
+        # everything on disk is below everything in memory, so the bottom of the
+        # in-memory part goes on top of the on-disk part
+        count = len(self._memory) - self.memory_limit // 2
+        self._write(self._memory[:count])
+        del self._memory[:count]
+        self._spilled += count
+        log.debug("spilled %d frontier entries (%d on disk)", count, self._spilled)
+
+    def _unspill(self, count: int) -> None:
+        self._memory[:0] = self._read(count, newest=True)
+
+
+class SpillingQueue(_SpillingEntries[_E]):
+    """
+    A first-in first-out queue of directories waiting to be listed, which moves
+    entries out to a temporary SQLite database when it grows past
+    ``memory_limit`` entries. Popping from a queue gives a breadth-first
+    traversal.
+
+    The head of the queue (the entries which will be popped next) is always kept
+    in memory. When the in-memory part overflows, its newer half is written to
+    disk, and new entries go straight to disk until the in-memory part runs dry
+    and the oldest entries on disk are read back in.
+
+    :param memory_limit: The number of entries to keep in memory before spilling
+    :param spill_dir: The directory to create the temporary database in. Defaults
+        to the system temporary directory.
+    """
+
+    def __init__(
+        self,
+        memory_limit: int = DEFAULT_MEMORY_LIMIT,
+        *,
+        spill_dir: Optional[str] = None,
+    ) -> None:
+        super().__init__(memory_limit, spill_dir=spill_dir)
+        # ordered from the head of the queue to the tail
+        self._memory: Deque[_E] = collections.deque()
+
+    def _in_memory(self) -> int:
+        return len(self._memory)
+
+    def extend(self, entries: Iterable[_E]) -> None:
+        """Add entries to the tail of the queue, so the first is popped first."""
+        for chunk in _chunks(entries, self.memory_limit):
+            if self._spilled:
+                # everything on disk is newer than everything in memory, so new
+                # entries must follow them to disk
+                self._write(chunk)
+                self._spilled += len(chunk)
+                continue
+            self._memory.extend(chunk)
+            if len(self._memory) > self.memory_limit:
+                self._spill()
+
+    def pop(self) -> _E:
+        """Pop the entry at the head of the queue."""
+        if not self._memory:
+            self._unspill(self.memory_limit // 2)
+        return self._memory.popleft()
+
+    def peek(self, count: int) -> List[_E]:
+        """Get (up to) the next ``count`` entries to be popped, in pop order."""
+        if len(self._memory) < count:
+            self._unspill(count - len(self._memory))
+        return list(itertools.islice(self._memory, count))
+
+    def _spill(self) -> None:
+        count = len(self._memory) - self.memory_limit // 2
+        tail = [self._memory.pop() for _ in range(count)]
+        tail.reverse()
+        self._write(tail)
+        self._spilled += count
+        log.debug("spilled %d frontier entries (%d on disk)", count, self._spilled)
+
+    def _unspill(self, count: int) -> None:
+        self._memory.extend(self._read(count, newest=False))
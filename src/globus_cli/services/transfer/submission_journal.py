@@ -0,0 +1,194 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import IO, Any, Dict, Iterable, Optional
+
+log = logging.getLogger(__name__)
+
+
+class JournalMismatchError(ValueError):
+    """
+    A submission journal was written by a submission with different settings or
+    items from the one trying to resume from it.
+    """
+
+
+def digest_items(items: Iterable[Dict[str, Any]]) -> str:
+    """Get a digest of the items of a task, to check that they match on resume."""
+    digest = hashlib.sha256()
+    for item in items:
+        digest.update(json.dumps(item, sort_keys=True).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+class SubmissionJournal:
+    """
+    An on-disk record of the tasks submitted for a sharded batch, which allows a
+    submission which was interrupted (even by a crash) to be resumed without
+    submitting any task twice.
+
+    The file is an append-only log of JSON lines. The first line holds the settings
+    of the submission. Before each task is submitted, a line records its shard
+    number, its submission ID, the range of batch items which it holds, and a
+    digest of those items. Once the task is accepted, a line records its task ID.
+    Lines are synced to disk as they are written, so that a task is never
+    submitted before its submission ID is on disk.
+
+    On resume, shards which were accepted are not submitted again, and shards
+    which were recorded but not accepted are submitted again with the same
+    submission ID. Transfer will not run a submission ID twice, so if such a shard
+    was in fact accepted before the interruption, the resubmission gets back the
+    task which was created.
+
+    :param filename: The journal file to write
+    :param resume: If True and the file exists, load the shards from it and append
+        to it. Otherwise, start a new journal file.
+    """
+
+    VERSION = 1
+
+    def __init__(self, filename: str, *, resume: bool = False) -> None:
+        self.filename = filename
+        self.resume = resume
+        self._settings: Dict[str, Any] = {}
+        # shard number -> the record of that shard, with its task ID once accepted
+        self._shards: Dict[int, Dict[str, Any]] = {}
+        self._file: Optional[IO[str]] = None
+        # acknowledgements are written from the submission threads
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "SubmissionJournal":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def start(self, settings: Dict[str, Any]) -> None:
+        """
+        Start recording a submission.
+
+        :param settings: The settings of the submission (endpoints, shard size,
+            etc). When resuming, these must match the settings stored in the file.
+        """
+        # round-trip through JSON so that the settings compare equal to loaded ones
+        self._settings = json.loads(json.dumps(settings))
+        if self.resume and os.path.exists(self.filename):
+            self._load()
+            self._file = open(self.filename, "a", encoding="utf-8")
+            return
+
+        self._file = open(self.filename, "w", encoding="utf-8")
+        self._write({"version": self.VERSION, "settings": self._settings})
+
+    def _load(self) -> None:
+        good_offset = 0
+        with open(self.filename, "rb") as fp:
+            for lineno, line in enumerate(fp):
+                # a torn final line is left behind if we died while writing it
+                # ignore it, and truncate it away below
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete line")
+                    record = json.loads(line)
+                except ValueError:
+                    log.warning("ignoring torn journal record at line %d", lineno)
+                    break
+                good_offset += len(line)
+
+                if lineno == 0:
+                    self._check_header(record)
+                elif "shard" in record:
+                    self._shards[record["shard"]] = record
+                elif "ack" in record and record["ack"] in self._shards:
+                    self._shards[record["ack"]]["task_id"] = record["task_id"]
+
+        if good_offset == 0:
+            raise JournalMismatchError(f"{self.filename} is not a submission journal")
+        with open(self.filename, "r+b") as fp:
+            fp.truncate(good_offset)
+
+        log.info(
+            "loaded journal from %s with %d shards, %d accepted",
+            self.filename,
+            len(self._shards),
+            sum(1 for record in self._shards.values() if "task_id" in record),
+        )
+
+    def _check_header(self, record: Dict[str, Any]) -> None:
+        if record.get("version") != self.VERSION:
+            raise JournalMismatchError(
+                f"{self.filename} has unsupported version {record.get('version')}"
+            )
+        if record.get("settings") != self._settings:
+            raise JournalMismatchError(
+                f"{self.filename} was written by a submission with different settings"
+            )
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._file is None:
+                raise ValueError("journal has not been started")
+            # each record is written as one line, so that a crash can tear at most
+            # the final line, and synced, so that it survives a crash
+            self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def get_shard(self, shard: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the record of a shard which was loaded from the journal, holding its
+        ``submission_id``, ``first_item``, ``items``, ``digest``, and (if it was
+        accepted) ``task_id``.
+        """
+        return self._shards.get(shard)
+
+    def check_shard(self, shard: int, first_item: int, items: int, digest: str) -> None:
+        """
+        Check that a shard holds the same items as the shard loaded from the
+        journal, if there is one.
+        """
+        record = self._shards.get(shard)
+        if record is None:
+            return
+        if (record["first_item"], record["items"], record["digest"]) != (
+            first_item,
+            items,
+            digest,
+        ):
+            raise JournalMismatchError(
+                f"the items of task {shard} (batch items {first_item + 1} to "
+                f"{first_item + items}) do not match {self.filename}"
+            )
+
+    def record_shard(
+        self,
+        shard: int,
+        submission_id: str,
+        first_item: int,
+        items: int,
+        digest: str,
+    ) -> None:
+        """Record a shard which is about to be submitted."""
+        record = {
+            "shard": shard,
+            "submission_id": submission_id,
+            "first_item": first_item,
+            "items": items,
+            "digest": digest,
+        }
+        self._write(record)
+        self._shards[shard] = record
+
+    def record_ack(self, shard: int, task_id: str) -> None:
+        """Record that a shard was accepted as a task."""
+        self._write({"ack": shard, "task_id": task_id})
+        self._shards[shard]["task_id"] = task_id
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,155 @@
+import collections
+import logging
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import globus_sdk
+from globus_sdk import TransferClient
+
+from .recursive_ls import ITEM_T
+from .tree_diff import LS_RESPONSE_T, SYNC_LEVELS, is_changed
+
+if TYPE_CHECKING:
+    from .listing_cache import ListingCache
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_LISTINGS = 128
+
+# the entries of a directory listing, by name, or None if the directory is missing
+ENTRIES_T = Optional[Dict[str, ITEM_T]]
+# (endpoint_id, directory)
+LISTING_KEY_T = Tuple[str, Optional[str]]
+
+
+def _split_path(path: str) -> Tuple[Optional[str], str]:
+    """
+    Split a path into its directory and its name. A path with no directory is in
+    the endpoint's default directory, which is listed without a path.
+    """
+    directory, slash, name = path.rpartition("/")
+    if not slash:
+        return None, name
+    return directory + "/", name
+
+
+class SyncPrefilter:
+    """
+    Leave out the items of a transfer which are already up to date on the
+    destination, so that they are never submitted.
+
+    For each file, the directories holding it on the source and the destination
+    are listed, and the two entries for the file are compared as a transfer with
+    the given ``sync_level`` would compare them. The listings of recently used
+    directories are kept, so that the files of a directory only cost one listing
+    on each endpoint when they are together in the batch. With a listing cache,
+    listings are also read from and stored in the cache.
+
+    Recursive items, items with an external checksum, and directories are always
+    kept, as are files whose directories cannot be found.
+
+    :param client: ``TransferClient`` used for making the operation_ls calls
+    :param source_endpoint_id: The source endpoint
+    :param dest_endpoint_id: The destination endpoint
+    :param sync_level: How files are compared: "exists", "size", or "mtime"
+    :param cache: A listing cache to read listings from and store them in
+    :param max_listings: The number of recent listings to keep in memory
+    """
+
+    def __init__(
+        self,
+        client: TransferClient,
+        source_endpoint_id: str,
+        dest_endpoint_id: str,
+        *,
+        sync_level: str,
+        cache: Optional["ListingCache"] = None,
+        max_listings: int = DEFAULT_MAX_LISTINGS,
+    ) -> None:
+        if sync_level not in SYNC_LEVELS:
+            raise ValueError(f"sync_level must be one of {SYNC_LEVELS}")
+        self._client = client
+        self._source_endpoint_id = source_endpoint_id
+        self._dest_endpoint_id = dest_endpoint_id
+        self._sync_level = sync_level
+        self._cache = cache
+        self._max_listings = max_listings
+        # least recently used first
+        self._listings: "collections.OrderedDict[LISTING_KEY_T, ENTRIES_T]" = (
+            collections.OrderedDict()
+        )
+
+        self.skipped_count = 0
+        self.skipped_bytes = 0
+
+    def _operation_ls(
+        self, endpoint_id: str, directory: Optional[str]
+    ) -> LS_RESPONSE_T:
+        params: Dict[str, Any] = {"show_hidden": 1}
+        if directory is not None:
+            params["path"] = directory
+        if self._cache is not None:
+            return self._cache.operation_ls(self._client, endpoint_id, params)
+        return self._client.operation_ls(endpoint_id, **params)
+
+    def _entries(self, endpoint_id: str, directory: Optional[str]) -> ENTRIES_T:
+        key = (endpoint_id, directory)
+        if key in self._listings:
+            self._listings.move_to_end(key)
+            return self._listings[key]
+
+        entries: ENTRIES_T
+        try:
+            listing = self._operation_ls(endpoint_id, directory)
+        except globus_sdk.TransferAPIError as err:
+            if err.http_status != 404:
+                raise
+            log.debug("%s:%s does not exist", endpoint_id, directory)
+            entries = None
+        else:
+            entries = {item["name"]: item for item in listing["DATA"]}
+
+        self._listings[key] = entries
+        if len(self._listings) > self._max_listings:
+            self._listings.popitem(last=False)
+        return entries
+
+    def _unchanged_dest_item(
+        self, source_path: str, dest_path: str
+    ) -> Optional[ITEM_T]:
+        """Get the destination entry for a file if it is already up to date."""
+        if source_path.endswith("/") or dest_path.endswith("/"):
+            return None
+        source_dir, source_name = _split_path(source_path)
+        dest_dir, dest_name = _split_path(dest_path)
+
+        dest_entries = self._entries(self._dest_endpoint_id, dest_dir)
+        dest_item = dest_entries.get(dest_name) if dest_entries else None
+        if dest_item is None or dest_item["type"] == "dir":
+            return None
+        source_entries = self._entries(self._source_endpoint_id, source_dir)
+        source_item = source_entries.get(source_name) if source_entries else None
+        if source_item is None or is_changed(source_item, dest_item, self._sync_level):
+            return None
+        return dest_item
+
+    def is_up_to_date(self, source_path: str, dest_path: str) -> bool:
+        """Check if a file is already up to date on the destination."""
+        return self._unchanged_dest_item(source_path, dest_path) is not None
+
+    def filter(self, items: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the items of a transfer, as keyword arguments for
+        ``TransferData.add_item``, leaving out the files which are up to date.
+        """
+        for item in items:
+            if item.get("recursive") or item.get("external_checksum") is not None:
+                yield item
+                continue
+            dest_item = self._unchanged_dest_item(
+                item["source_path"], item["destination_path"]
+            )
+            if dest_item is None:
+                yield item
+                continue
+            self.skipped_count += 1
+            self.skipped_bytes += dest_item.get("size") or 0
@@ -0,0 +1,320 @@
+import datetime
+import json
+import logging
+import sqlite3
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from globus_sdk import TransferClient
+
+log = logging.getLogger(__name__)
+
+# task_list cannot page past its first 1000 results, so the tasks are fetched in
+# windows of at most this many, ordered by time
+SYNC_PAGE_SIZE = 1000
+# statuses of tasks which have not finished, and may still change
+OPEN_STATUSES = ("ACTIVE", "INACTIVE")
+# the format of times in task_list filters
+FILTER_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SUMMARY_KEYS = {
+    "status": "status",
+    "day": "substr(COALESCE(completion_time, request_time), 1, 10)",
+}
+
+
+def normalize_time(value: Optional[str]) -> Optional[str]:
+    """
+    Convert a time from a task document, such as "2021-09-02T18:04:47+00:00", to
+    the format of task_list filters, so that times compare as strings.
+    """
+    if not value:
+        return None
+    return value[:19].replace("T", " ")
+
+
+def _format_filter_time(value: datetime.datetime) -> str:
+    return value.strftime(FILTER_TIME_FORMAT)
+
+
+def _label_like(pattern: str) -> str:
+    """Convert a label pattern with '*' wildcards to a LIKE pattern."""
+    escaped = pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped.replace("*", "%")
+
+
+class TaskHistory:
+    """
+    A local history of the tasks of the current user, stored in a SQLite database,
+    which can be queried without calling the Transfer API.
+
+    The history is brought up to date with ``sync``, which only fetches tasks that
+    are new or may have changed since the last sync:
+
+    - tasks requested since the latest ``request_time`` in the history
+    - tasks which are still active, as of the oldest active task in the history
+    - tasks completed since the latest ``completion_time`` in the history, if any
+      task in the history was still active, so that their final states are kept
+
+    Each of these is fetched with a ``task_list`` filter, in order of time, moving
+    the start of the filter forward after each page.
+
+    :param filename: The database file
+    :param namespace: A namespace for the tasks, so that tasks seen under
+        different logins are not mixed up
+    """
+
+    def __init__(self, filename: str, *, namespace: str = "") -> None:
+        self.filename = filename
+        self.namespace = namespace
+        self.api_calls = 0
+        self._db = sqlite3.connect(filename, timeout=10)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS task ("
+                "namespace TEXT, task_id TEXT, type TEXT, status TEXT, label TEXT, "
+                "request_time TEXT, completion_time TEXT, bytes_transferred INTEGER, "
+                "files_transferred INTEGER, data TEXT, "
+                "PRIMARY KEY (namespace, task_id))"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS task_request_time "
+                "ON task (namespace, request_time)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS task_completion_time "
+                "ON task (namespace, completion_time)"
+            )
+
+    def __enter__(self) -> "TaskHistory":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __len__(self) -> int:
+        (count,) = self._db.execute(
+            "SELECT COUNT(*) FROM task WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        return int(count)
+
+    def _scalar(self, sql: str, params: Sequence[Any] = ()) -> Any:
+        return self._db.execute(sql, (self.namespace, *params)).fetchone()[0]
+
+    def _store(self, tasks: Iterable[Mapping[str, Any]]) -> Tuple[int, int]:
+        """
+        Store tasks, replacing older copies. Returns the counts of new tasks, and
+        of tasks which had changed since they were stored.
+        """
+        new = updated = 0
+        with self._db:
+            for task in tasks:
+                data = json.dumps(dict(task), separators=(",", ":"), sort_keys=True)
+                old = self._db.execute(
+                    "SELECT data FROM task WHERE namespace = ? AND task_id = ?",
+                    (self.namespace, task["task_id"]),
+                ).fetchone()
+                if old is not None and old[0] == data:
+                    continue
+                self._db.execute(
+                    "INSERT OR REPLACE INTO task VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        self.namespace,
+                        task["task_id"],
+                        task.get("type"),
+                        task.get("status"),
+                        task.get("label"),
+                        normalize_time(task.get("request_time")),
+                        normalize_time(task.get("completion_time")),
+                        task.get("bytes_transferred") or 0,
+                        task.get("files_transferred") or 0,
+                        data,
+                    ),
+                )
+                if old is not None:
+                    updated += 1
+                else:
+                    new += 1
+        return new, updated
+
+    def _fetch(
+        self,
+        client: TransferClient,
+        filters: Dict[str, Any],
+        time_field: str,
+        start: Optional[str],
+    ) -> Iterator[Mapping[str, Any]]:
+        """
+        Fetch the tasks matching some filters, with ``time_field`` at or after
+        ``start``, in order of ``time_field``.
+        """
+        while True:
+            page_filter = dict(filters)
+            if start is not None:
+                page_filter[time_field] = f"{start},"
+            page = client.task_list(
+                limit=SYNC_PAGE_SIZE,
+                filter=page_filter,
+                query_params={"orderby": f"{time_field} ASC"},
+            )
+            self.api_calls += 1
+            tasks = list(page)
+            yield from tasks
+            if len(tasks) < SYNC_PAGE_SIZE:
+                return
+
+            # the filter is inclusive, so the tasks at the last time of this page
+            # are fetched again as the first of the next page
+            last = normalize_time(tasks[-1][time_field])
+            if last == start:
+                assert last is not None
+                # a whole page at the same second cannot be paged through
+                log.warning(
+                    "over %d tasks have %s %s", SYNC_PAGE_SIZE, time_field, last
+                )
+                last = _format_filter_time(
+                    datetime.datetime.strptime(last, FILTER_TIME_FORMAT)
+                    + datetime.timedelta(seconds=1)
+                )
+            start = last
+
+    def sync(self, client: TransferClient) -> Dict[str, int]:
+        """
+        Fetch the tasks which are new or may have changed since the last sync,
+        and store them in the history.
+
+        Returns the numbers of new and updated tasks, and of API calls made.
+        """
+        self.api_calls = 0
+        latest_request = self._scalar(
+            "SELECT MAX(request_time) FROM task WHERE namespace = ?"
+        )
+        latest_completion = self._scalar(
+            "SELECT MAX(completion_time) FROM task WHERE namespace = ?"
+        )
+        oldest_open = self._scalar(
+            "SELECT MIN(request_time) FROM task WHERE namespace = ? "
+            f"AND status IN ({', '.join('?' * len(OPEN_STATUSES))})",
+            OPEN_STATUSES,
+        )
+        log.debug(
+            "syncing task history after request_time=%s, completion_time=%s, "
+            "with active tasks since %s",
+            latest_request,
+            latest_completion,
+            oldest_open,
+        )
+
+        type_filter = {"type": "TRANSFER,DELETE"}
+        new, updated = self._store(
+            self._fetch(client, type_filter, "request_time", latest_request)
+        )
+        if oldest_open is not None:
+            for filters, time_field, start in (
+                (
+                    dict(type_filter, status=",".join(OPEN_STATUSES)),
+                    "request_time",
+                    oldest_open,
+                ),
+                (type_filter, "completion_time", latest_completion or oldest_open),
+            ):
+                more_new, more_updated = self._store(
+                    self._fetch(client, filters, time_field, start)
+                )
+                new += more_new
+                updated += more_updated
+
+        return {"new": new, "updated": updated, "api_calls": self.api_calls}
+
+    def _where(
+        self,
+        *,
+        statuses: Sequence[str] = (),
+        types: Sequence[str] = (),
+        labels: Sequence[str] = (),
+        not_labels: Sequence[str] = (),
+        exact: bool = False,
+        requested_after: Optional[datetime.datetime] = None,
+        requested_before: Optional[datetime.datetime] = None,
+        completed_after: Optional[datetime.datetime] = None,
+        completed_before: Optional[datetime.datetime] = None,
+    ) -> Tuple[str, List[Any]]:
+        clauses = ["namespace = ?"]
+        params: List[Any] = [self.namespace]
+
+        for column, values in (("status", statuses), ("type", types)):
+            if values:
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+
+        # labels match as in task_list: exactly, or with '*' wildcards, ignoring case
+        label_match = "label = ?" if exact else "label LIKE ? ESCAPE '\\'"
+        label_params = list(labels) if exact else [_label_like(p) for p in labels]
+        if labels:
+            clauses.append("(" + " OR ".join([label_match] * len(labels)) + ")")
+            params.extend(label_params)
+        for pattern in not_labels:
+            clauses.append(f"(label IS NULL OR NOT {label_match})")
+            params.append(pattern if exact else _label_like(pattern))
+
+        for column, op, value in (
+            ("request_time", ">=", requested_after),
+            ("request_time", "<=", requested_before),
+            ("completion_time", ">=", completed_after),
+            ("completion_time", "<=", completed_before),
+        ):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(_format_filter_time(value))
+
+        return " AND ".join(clauses), params
+
+    def tasks(
+        self, *, limit: Optional[int] = None, **filters: Any
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the stored task documents matching some filters, most recently
+        requested first.
+        """
+        where, params = self._where(**filters)
+        sql = f"SELECT data FROM task WHERE {where} ORDER BY request_time DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [json.loads(data) for (data,) in self._db.execute(sql, params)]
+
+    def summarize(self, by: str, **filters: Any) -> List[Dict[str, Any]]:
+        """
+        Count the stored tasks matching some filters, and the bytes and files they
+        transferred, grouped ``by`` "status" or by "day". The day of a task is the
+        day it completed, or for an active task, the day it was requested.
+        """
+        key = SUMMARY_KEYS[by]
+        where, params = self._where(**filters)
+        rows = self._db.execute(
+            f"SELECT {key} AS key, COUNT(*), SUM(bytes_transferred), "
+            f"SUM(files_transferred) FROM task WHERE {where} "
+            "GROUP BY key ORDER BY key",
+            params,
+        )
+        return [
+            {
+                by: key,
+                "tasks": tasks,
+                "bytes_transferred": bytes_transferred,
+                "files_transferred": files_transferred,
+            }
+            for key, tasks, bytes_transferred, files_transferred in rows
+        ]
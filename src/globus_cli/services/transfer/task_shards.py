@@ -0,0 +1,268 @@
+import collections
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, List, Optional, Union
+
+import globus_sdk
+from globus_sdk import DeleteData, GlobusHTTPResponse, TransferData
+from globus_sdk.transport import RequestsTransport
+
+from .submission_journal import digest_items
+
+if TYPE_CHECKING:
+    from .submission_journal import SubmissionJournal
+
+log = logging.getLogger(__name__)
+
+TASK_DATA_T = Union[TransferData, DeleteData]
+MANIFEST_ENTRY_T = Dict[str, Any]
+
+DEFAULT_MAX_RETRIES = 2
+
+
+def _is_retryable(err: Exception) -> bool:
+    # the transport already retries network errors and transient server errors, so
+    # retrying those here as well would only multiply its retries
+    return (
+        isinstance(err, globus_sdk.GlobusAPIError)
+        and err.http_status >= 500
+        and err.http_status not in RequestsTransport.TRANSIENT_ERROR_STATUS_CODES
+    )
+
+
+class TaskShards:
+    """
+    Split the items of a task submission into several tasks of at most
+    ``max_items`` items each, submitting each task as soon as it is full.
+
+    Submissions run in a pool of ``parallelism`` worker threads, so that several
+    tasks can be in flight at once while the next one is filled. Once a task is
+    full, the submission ID for the next task is fetched in the background while
+    the full task is submitted. Only the task being filled and the tasks in flight
+    are held in memory, so a batch with any number of items can be submitted as it
+    is read.
+
+    A submission which fails with a server error that the SDK transport does not
+    retry itself is retried up to ``max_retries`` times. This is safe because the
+    task keeps its submission ID: if the failed attempt actually created the task,
+    the retry is reported as a duplicate of it, with the same task ID.
+
+    A manifest entry is returned for each task once it is submitted, in the order
+    the tasks were filled. It holds the shard number (counting from 1), the task
+    and submission IDs, and the number of items.
+
+    With a ``journal``, each task is recorded before it is submitted and once it is
+    accepted. If the journal was loaded from an earlier submission of the same
+    batch, tasks which it records as accepted are not submitted again, and tasks
+    which it records without a task ID are submitted again with the same
+    submission ID.
+
+    :param new_task: A function which makes a new, empty task document with a
+        given submission ID
+    :param submit: A function which submits a task document
+    :param max_items: The maximum number of items in each task
+    :param get_submission_id: A function which gets a new submission ID
+    :param parallelism: The maximum number of submissions in flight at once
+    :param max_retries: The number of times to retry a failed submission
+    :param retry_delay: The number of seconds to wait before the first retry,
+        doubling for each retry after that
+    :param journal: A started journal to record the submission in
+    """
+
+    def __init__(
+        self,
+        new_task: Callable[[str], TASK_DATA_T],
+        submit: Callable[[Any], Union[GlobusHTTPResponse, Dict[str, Any]]],
+        max_items: int,
+        *,
+        get_submission_id: Callable[[], str],
+        parallelism: int = 1,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        retry_delay: float = 1.0,
+        journal: Optional["SubmissionJournal"] = None,
+    ) -> None:
+        if max_items < 1:
+            raise ValueError("max_items must be at least 1")
+        if parallelism < 1:
+            raise ValueError("parallelism must be at least 1")
+        self._new_task = new_task
+        self._submit = submit
+        self._get_submission_id = get_submission_id
+        self.max_items = max_items
+        self.parallelism = parallelism
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.journal = journal
+
+        # one extra worker, for fetching submission IDs ahead of time
+        self._executor = ThreadPoolExecutor(max_workers=parallelism + 1)
+        self._next_submission_id: Optional["Future[str]"] = None
+        self._in_flight: Deque["Future[MANIFEST_ENTRY_T]"] = collections.deque()
+        self._current: Optional[TASK_DATA_T] = None
+        self.shard_count = 0
+        self.item_count = 0
+
+    def add_item(self, *args: Any, **kwargs: Any) -> List[MANIFEST_ENTRY_T]:
+        """
+        Add an item to the current task, with the same arguments as the
+        ``add_item`` method of the task document. If this fills the task, it is
+        submitted.
+
+        Returns the manifest entries of any tasks whose submissions have completed.
+        """
+        if self._current is None:
+            self._current = self._new_task(self._next_task_submission_id())
+        self._current.add_item(*args, **kwargs)
+        self.item_count += 1
+        if len(self._current["DATA"]) < self.max_items:
+            return self._completed(block=False)
+        # wait for room in the pipeline before submitting another task
+        entries = self._completed(block=len(self._in_flight) >= self.parallelism)
+        self._start_submission()
+        # a full task is usually followed by more items, so fetch the ID for the next
+        # task now, rather than for the last task, which nothing follows
+        self._prefetch_submission_id()
+        return entries + self._completed(block=False)
+
+    def flush(self) -> List[MANIFEST_ENTRY_T]:
+        """
+        Submit the current task if it has any items, and wait for all submissions
+        to complete, returning their manifest entries.
+        """
+        self._start_submission()
+        entries = []
+        while self._in_flight:
+            entries.extend(self._completed(block=True))
+        self.close()
+        return entries
+
+    def close(self) -> List[MANIFEST_ENTRY_T]:
+        """
+        Stop submitting tasks, and wait for any submissions already in flight.
+
+        Returns the manifest entries of the in-flight submissions which succeeded,
+        so that none are lost when the submission is stopped by an error.
+        """
+        entries = []
+        for future in self._in_flight:
+            try:
+                entries.append(future.result())
+            except Exception:
+                log.debug("in-flight submission failed during close", exc_info=True)
+        self._in_flight.clear()
+        self._executor.shutdown(wait=True)
+        return entries
+
+    def _next_task_submission_id(self) -> str:
+        # a shard from the journal keeps the submission ID it was recorded with
+        if self.journal is not None:
+            record = self.journal.get_shard(self.shard_count + 1)
+            if record is not None:
+                return str(record["submission_id"])
+        return self._take_submission_id()
+
+    def _take_submission_id(self) -> str:
+        future, self._next_submission_id = self._next_submission_id, None
+        if future is None:
+            return self._get_submission_id()
+        return future.result()
+
+    def _prefetch_submission_id(self) -> None:
+        if self._next_submission_id is not None:
+            return
+        # a shard from the journal does not need a new ID
+        if (
+            self.journal is not None
+            and self.journal.get_shard(self.shard_count + 1) is not None
+        ):
+            return
+        self._next_submission_id = self._executor.submit(self._get_submission_id)
+
+    def _start_submission(self) -> None:
+        task, self._current = self._current, None
+        if task is None or not task["DATA"]:
+            return
+        self.shard_count += 1
+        if self.journal is not None:
+            accepted = self._journal_shard(self.shard_count, task)
+            if accepted is not None:
+                self._in_flight.append(accepted)
+                return
+        self._in_flight.append(
+            self._executor.submit(self._submit_with_retries, self.shard_count, task)
+        )
+
+    def _journal_shard(
+        self, shard: int, task: TASK_DATA_T
+    ) -> Optional["Future[MANIFEST_ENTRY_T]"]:
+        """
+        Check a shard against the journal, or record it there if it is new. If the
+        journal records that the shard was already accepted, get its entry.
+        """
+        assert self.journal is not None
+        item_count = len(task["DATA"])
+        # a shard is submitted as soon as its last item is added
+        first_item = self.item_count - item_count
+        digest = digest_items(task["DATA"])
+        record = self.journal.get_shard(shard)
+        if record is None:
+            self.journal.record_shard(
+                shard, task["submission_id"], first_item, item_count, digest
+            )
+            return None
+
+        self.journal.check_shard(shard, first_item, item_count, digest)
+        if "task_id" not in record:
+            return None
+        log.debug("shard %d was accepted before, as task %s", shard, record["task_id"])
+        accepted: "Future[MANIFEST_ENTRY_T]" = Future()
+        accepted.set_result(
+            {
+                "shard": shard,
+                "task_id": record["task_id"],
+                "submission_id": task["submission_id"],
+                "items": item_count,
+            }
+        )
+        return accepted
+
+    def _completed(self, block: bool) -> List[MANIFEST_ENTRY_T]:
+        """
+        Get the entries of completed submissions, in shard order. If ``block`` is
+        True, wait for at least the oldest submission to complete.
+        """
+        entries = []
+        while self._in_flight and (block or self._in_flight[0].done()):
+            entries.append(self._in_flight.popleft().result())
+            block = False
+        return entries
+
+    def _submit_with_retries(self, shard: int, task: TASK_DATA_T) -> MANIFEST_ENTRY_T:
+        log.debug("submitting shard %d with %d items", shard, len(task["DATA"]))
+        attempt = 0
+        while True:
+            try:
+                res = self._submit(task)
+                break
+            except Exception as err:
+                if attempt >= self.max_retries or not _is_retryable(err):
+                    raise
+                delay = self.retry_delay * 2**attempt
+                attempt += 1
+                log.debug(
+                    "retrying shard %d (submission ID %s) in %.1fs after error: %s",
+                    shard,
+                    task["submission_id"],
+                    delay,
+                    err,
+                )
+                time.sleep(delay)
+        if self.journal is not None:
+            self.journal.record_ack(shard, res["task_id"])
+        return {
+            "shard": shard,
+            "task_id": res["task_id"],
+            "submission_id": task["submission_id"],
+            "items": len(task["DATA"]),
+        }
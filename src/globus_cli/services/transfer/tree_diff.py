@@ -0,0 +1,236 @@
+import logging
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+import globus_sdk
+from globus_sdk import TransferClient
+
+from .find import parse_last_modified
+from .recursive_ls import ITEM_T, LS_RESPONSE_T, concurrent_listings
+from .recursive_ls_frontier import DEFAULT_MEMORY_LIMIT, SpillingFrontier
+
+if TYPE_CHECKING:
+    from .listing_cache import ListingCache
+
+log = logging.getLogger(__name__)
+
+# the frontier entry for a directory to compare:
+# (source_path, relative_path, depth, dest_path)
+# dest_path is None for a directory which does not exist on the destination
+DIFF_ENTRY_T = Tuple[Optional[str], str, int, Optional[str]]
+# the source and destination listings of one directory
+PAIR_T = Tuple[LS_RESPONSE_T, Optional[LS_RESPONSE_T]]
+
+SYNC_LEVELS = ("exists", "size", "mtime")
+STATUSES = ("added", "changed", "missing", "conflict")
+
+
+def is_changed(source_item: ITEM_T, dest_item: ITEM_T, sync_level: str) -> bool:
+    """
+    Check if an item on the source differs from the item with the same name on the
+    destination, according to a sync level, as a transfer with that sync level
+    would.
+
+    At the "mtime" level, an item without a modification time on either endpoint
+    is changed, since it cannot be shown to be up to date.
+    """
+    if source_item["type"] != dest_item["type"]:
+        return True
+    if sync_level == "exists":
+        return False
+    if source_item.get("size") != dest_item.get("size"):
+        return True
+    if sync_level == "size":
+        return False
+    source_mtime = source_item.get("last_modified")
+    dest_mtime = dest_item.get("last_modified")
+    if source_mtime is None or dest_mtime is None:
+        return True
+    return parse_last_modified(source_mtime) > parse_last_modified(dest_mtime)
+
+
+class TreeDiff:
+    """
+    Compare a directory tree on a source endpoint with a directory tree on a
+    destination endpoint, yielding a document for each difference.
+
+    The two trees are walked together, one directory at a time: each directory is
+    listed on both endpoints, and the entries of the two listings are joined by
+    name. Only the directories which exist on the source are walked. Directories
+    which only exist on the source are listed on the source alone, and directories
+    which only exist on the destination are reported without being listed.
+
+    Each difference is a dict with a ``status``, the ``path`` relative to the start
+    of the trees, the ``type`` of the item, and its ``size``. The status is one of
+
+    - ``added``: the item is on the source but not on the destination
+    - ``changed``: the item is on both, but differs according to ``sync_level``
+    - ``missing``: the item is on the destination but missing from the source
+    - ``conflict``: the item is on both, but is a directory on one and not on the
+      other. The type and size are those of the source item.
+
+    Differences are yielded as the listings arrive, and ``summary`` holds running
+    totals of the number of files and bytes for each status.
+
+    :param client: ``TransferClient`` used for making the operation_ls calls
+    :param source_endpoint_id: The source endpoint
+    :param source_params: Query params sent to operation_ls on the source
+    :param dest_endpoint_id: The destination endpoint
+    :param dest_params: Query params sent to operation_ls on the destination
+    :param sync_level: How files on both endpoints are compared, as with the
+        ``sync_level`` of a transfer. "exists" never reports changed files, "size"
+        reports files whose sizes differ, and "mtime" also reports files which are
+        newer on the source.
+    :param parallelism: The maximum number of directories to list at a time
+    :param cache: A listing cache to read listings from and store them in
+    :param frontier_memory_limit: The number of pending directories to hold in
+        memory before spilling to disk
+    """
+
+    def __init__(
+        self,
+        client: TransferClient,
+        source_endpoint_id: str,
+        source_params: Dict[str, Any],
+        dest_endpoint_id: str,
+        dest_params: Dict[str, Any],
+        *,
+        sync_level: str = "mtime",
+        parallelism: int = 1,
+        cache: Optional["ListingCache"] = None,
+        frontier_memory_limit: int = DEFAULT_MEMORY_LIMIT,
+    ) -> None:
+        if sync_level not in SYNC_LEVELS:
+            raise ValueError(f"sync_level must be one of {SYNC_LEVELS}")
+        if parallelism < 1:
+            raise ValueError("parallelism must be at least 1")
+
+        self._client = client
+        self._source_endpoint_id = source_endpoint_id
+        self._source_params = source_params
+        self._dest_endpoint_id = dest_endpoint_id
+        self._dest_params = dest_params
+        self._sync_level = sync_level
+        self._parallelism = parallelism
+        self._cache = cache
+        self._frontier_memory_limit = frontier_memory_limit
+
+        self.summary: Dict[str, Dict[str, int]] = {
+            status: {"files": 0, "bytes": 0} for status in STATUSES
+        }
+
+        # list the start directory now, so that errors from the first calls (such
+        # as a source path which does not exist) are raised here
+        self._root = self._list_pair(
+            source_params.get("path"), dest_params.get("path"), root=True
+        )
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        with SpillingFrontier[DIFF_ENTRY_T](self._frontier_memory_limit) as dir_queue:
+            yield from self._compare("", 0, self._root, dir_queue)
+            for (_, rel_path, depth, _), pair in concurrent_listings(
+                dir_queue, self._list_entry, self._parallelism
+            ):
+                yield from self._compare(rel_path, depth, pair, dir_queue)
+
+    def _operation_ls(
+        self, endpoint_id: str, base_params: Dict[str, Any], path: Optional[str]
+    ) -> LS_RESPONSE_T:
+        params = dict(base_params)
+        if path is not None:
+            params["path"] = path
+        if self._cache is not None:
+            return self._cache.operation_ls(self._client, endpoint_id, params)
+        return self._client.operation_ls(endpoint_id, **params)
+
+    def _list_entry(self, entry: DIFF_ENTRY_T) -> PAIR_T:
+        source_path, _, _, dest_path = entry
+        return self._list_pair(source_path, dest_path)
+
+    def _list_pair(
+        self, source_path: Optional[str], dest_path: Optional[str], root: bool = False
+    ) -> PAIR_T:
+        """
+        List a directory on the source, and on the destination if it exists there.
+
+        Below the start directory, a ``dest_path`` of None means that the directory
+        is known not to exist on the destination. A destination directory which
+        turns out not to exist is treated as empty.
+        """
+        source_res = self._operation_ls(
+            self._source_endpoint_id, self._source_params, source_path
+        )
+        if dest_path is None and not root:
+            return source_res, None
+        try:
+            dest_res: Optional[LS_RESPONSE_T] = self._operation_ls(
+                self._dest_endpoint_id, self._dest_params, dest_path
+            )
+        except globus_sdk.TransferAPIError as err:
+            if err.http_status != 404:
+                raise
+            log.debug("destination path %s does not exist", dest_path)
+            dest_res = None
+        return source_res, dest_res
+
+    def _difference(self, status: str, rel_path: str, item: ITEM_T) -> Dict[str, Any]:
+        size = item.get("size") or 0
+        if item["type"] != "dir":
+            self.summary[status]["files"] += 1
+            self.summary[status]["bytes"] += size
+        return {
+            "status": status,
+            "path": (rel_path + "/" if rel_path else "") + item["name"],
+            "type": item["type"],
+            "size": size,
+        }
+
+    def _compare(
+        self, rel_path: str, depth: int, pair: PAIR_T, dir_queue: SpillingFrontier
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Join the source and destination listings of a directory by name, yield the
+        differences, and queue the subdirectories to be compared.
+        """
+        source_res, dest_res = pair
+        dest_items: Dict[str, ITEM_T] = (
+            {item["name"]: item for item in dest_res["DATA"]}
+            if dest_res is not None
+            else {}
+        )
+
+        subdirs: List[DIFF_ENTRY_T] = []
+        for item in source_res["DATA"]:
+            dest_item = dest_items.pop(item["name"], None)
+            if dest_item is None:
+                yield self._difference("added", rel_path, item)
+            elif dest_item["type"] != item["type"]:
+                yield self._difference("conflict", rel_path, item)
+            elif item["type"] != "dir" and is_changed(
+                item, dest_item, self._sync_level
+            ):
+                yield self._difference("changed", rel_path, item)
+
+            if item["type"] == "dir":
+                # everything below a directory which is not a directory on the
+                # destination is added
+                dest_path = (
+                    dest_res["path"] + item["name"]
+                    if dest_res is not None
+                    and dest_item is not None
+                    and dest_item["type"] == "dir"
+                    else None
+                )
+                subdirs.append(
+                    (
+                        source_res["path"] + item["name"],
+                        (rel_path + "/" if rel_path else "") + item["name"],
+                        depth + 1,
+                        dest_path,
+                    )
+                )
+
+        for dest_item in dest_items.values():
+            yield self._difference("missing", rel_path, dest_item)
+
+        # reversed, so that subdirectories are compared in listing order
+        dir_queue.extend(reversed(subdirs))
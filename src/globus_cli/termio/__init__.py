@@ -7,6 +7,7 @@ from .context import (
     is_verbose,
     out_is_terminal,
     outformat_is_json,
+    outformat_is_jsonl,
     outformat_is_text,
     outformat_is_unix,
     term_is_interactive,
@@ -49,6 +50,7 @@ __all__ = [
     "err_is_terminal",
     "term_is_interactive",
     "outformat_is_json",
+    "outformat_is_jsonl",
     "outformat_is_text",
     "outformat_is_unix",
     "get_jmespath_expression",
@@ -26,6 +26,15 @@ def outformat_is_unix():
     return state.outformat_is_unix()
 
 
+def outformat_is_jsonl():
+    """
+    Only safe to call within a click context.
+    """
+    ctx = click.get_current_context()
+    state = ctx.ensure_object(CommandState)
+    return state.outformat_is_jsonl()
+
+
 def outformat_is_text():
     """
     Only safe to call within a click context.
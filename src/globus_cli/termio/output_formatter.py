@@ -1,13 +1,20 @@
 import json
+import sys
 import textwrap
 
 import click
 from globus_sdk import GlobusHTTPResponse
+from globus_sdk.response import IterableResponse
 
 from globus_cli.utils import CLIStubResponse
 
 from .awscli_text import unix_formatted_print
-from .context import get_jmespath_expression, outformat_is_json, outformat_is_unix
+from .context import (
+    get_jmespath_expression,
+    outformat_is_json,
+    outformat_is_jsonl,
+    outformat_is_unix,
+)
 
 FORMAT_SILENT = "silent"
 FORMAT_JSON = "json"
@@ -96,6 +103,60 @@ def print_json_response(res):
     click.echo(res)
 
 
+def _is_item_stream(res):
+    """
+    Check if data for printing is a sequence of items, rather than a single document
+    """
+    if isinstance(res, (str, bytes, dict, CLIStubResponse)):
+        return False
+    if isinstance(res, GlobusHTTPResponse):
+        return isinstance(res, IterableResponse)
+    return hasattr(res, "__iter__")
+
+
+def _references_field(node, name):
+    """Check if a parsed JMESPath expression looks up a field with a given name."""
+    if node.get("type") == "field" and node.get("value") == name:
+        return True
+    return any(
+        _references_field(child, name)
+        for child in node.get("children", [])
+        if isinstance(child, dict)
+    )
+
+
+def print_jsonl_response(res):
+    """
+    Print one compact JSON document per line. If the data is a sequence of items,
+    each item is printed as soon as it is available, so that the whole sequence is
+    never held in memory.
+
+    A JMESPath expression is applied to each item of a sequence in turn, since the
+    whole document is never built. An expression which looks up "DATA" is meant
+    for the whole document, and is rejected rather than giving null for each item.
+    """
+    if _is_item_stream(res):
+        items = res
+        jmespath_expr = get_jmespath_expression()
+        if jmespath_expr is not None and _references_field(
+            jmespath_expr.parsed, "DATA"
+        ):
+            raise click.UsageError(
+                "With '--format jsonl', '--jmespath' is applied to each result "
+                "rather than to the whole document, so it cannot use 'DATA'. "
+                "Use '--format json' to query the whole document."
+            )
+    else:
+        items = [res]
+    for item in items:
+        if isinstance(item, GlobusHTTPResponse):
+            item = item.data
+        item = _jmespath_preprocess(item)
+        click.echo(json.dumps(item, separators=(",", ":"), sort_keys=True))
+        # flush each line, so that consumers of a pipe see results as they arrive
+        sys.stdout.flush()
+
+
 def print_unix_response(res):
     res = _jmespath_preprocess(res)
     try:
@@ -251,6 +312,16 @@ def formatted_print(
             json_converter(response_data) if json_converter else response_data
         )
 
+    def _print_as_jsonl():
+        # a sequence of items is streamed without conversion, since converters
+        # collect everything into one document
+        if _is_item_stream(response_data):
+            print_jsonl_response(response_data)
+        else:
+            print_jsonl_response(
+                json_converter(response_data) if json_converter else response_data
+            )
+
     def _print_as_unix():
         print_unix_response(
             json_converter(response_data) if json_converter else response_data
@@ -304,6 +375,8 @@ def formatted_print(
 
     if outformat_is_json():
         _print_as_json()
+    elif outformat_is_jsonl():
+        _print_as_jsonl()
     elif outformat_is_unix():
         _print_as_unix()
     else:
@@ -1,6 +1,5 @@
 import inspect
 import json
-import shlex
 from typing import Callable, Dict, Iterable, Iterator, List, Optional
 
 import click
@@ -55,6 +54,23 @@ def format_plural_str(formatstr: str, pluralizable: Dict[str, str], use_plural:
     return formatstr.format(**argdict)
 
 
+def format_size(num_bytes: float) -> str:
+    """
+    Format a number of bytes with a binary unit suffix, in the style of `du -h`
+
+    >>> format_size(1536)
+    '1.5K'
+    """
+    size = float(num_bytes)
+    for unit in ("", "K", "M", "G", "T", "P"):
+        if abs(size) < 1024 or unit == "P":
+            break
+        size /= 1024
+    if not unit:
+        return str(int(size))
+    return f"{size:.1f}{unit}" if abs(size) < 10 else f"{size:.0f}{unit}"
+
+
 def sorted_json_field(key):
     """Define sorted JSON output for text output containing complex types."""
 
@@ -136,28 +152,3 @@ class PagingWrapper:
             self._step()
             yield cur
             yielded += 1
-
-
-def shlex_process_stream(process_command, stream):
-    """
-    Use shlex to process stdin line-by-line.
-    Also prints help text.
-
-    Requires that @process_command be a Click command object, used for
-    processing single lines of input. helptext is prepended to the standard
-    message printed to interactive sessions.
-    """
-    # use readlines() rather than implicit file read line looping to force
-    # python to properly capture EOF (otherwise, EOF acts as a flush and
-    # things get weird)
-    for line in stream.readlines():
-        # get the argument vector:
-        # do a shlex split to handle quoted paths with spaces in them
-        # also lets us have comments with #
-        argv = shlex.split(line, comments=True)
-        if argv:
-            try:
-                process_command.main(args=argv)
-            except SystemExit as e:
-                if e.code != 0:
-                    raise
@@ -1,6 +1,9 @@
+import json
 from unittest import mock
 
 import pytest
+import responses
+from globus_sdk._testing import load_response_set
 
 
 @pytest.fixture
@@ -19,3 +22,39 @@ def mock_local_server_flow():
 def mock_remote_session():
     with mock.patch("globus_cli.login_manager.manager.is_remote_session") as m:
         yield m
+
+
+@pytest.fixture
+def task_submit_responses():
+    """
+    Load the responses used to submit transfer and delete tasks, and get a
+    function which responds to each of ``count`` submissions to ``path`` with a
+    new task ID. That function returns another, which gets the number of items in
+    each submitted task.
+    """
+    load_response_set("cli.get_submission_id")
+    load_response_set("cli.transfer_activate_success")
+    load_response_set("cli.du_results")
+
+    def add_submit_responses(path, count):
+        url = f"https://transfer.api.globus.org/v0.10/{path}"
+        for i in range(1, count + 1):
+            responses.add(
+                responses.POST,
+                url,
+                json={
+                    "task_id": f"00000000-0000-0000-0000-{i:012d}",
+                    "code": "Accepted",
+                },
+            )
+
+        def submitted():
+            return [
+                len(json.loads(call.request.body)["DATA"])
+                for call in responses.calls
+                if call.request.url == url
+            ]
+
+        return submitted
+
+    return add_submit_responses
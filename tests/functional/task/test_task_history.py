@@ -0,0 +1,119 @@
+import json
+import urllib.parse
+
+import pytest
+import responses
+
+TASK_LIST_URL = "https://transfer.api.globus.org/v0.10/task_list"
+
+
+@pytest.fixture(autouse=True)
+def history_location(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        "globus_cli.login_manager.task_history_location",
+        lambda: (str(tmp_path / "task_history.db"), "test"),
+    )
+
+
+def _task(n, status, label, bytes_transferred):
+    time = f"2021-03-0{n}T12:00:00+00:00"
+    return {
+        "DATA_TYPE": "task",
+        "task_id": f"task-{n}",
+        "type": "TRANSFER",
+        "status": status,
+        "label": label,
+        "request_time": time,
+        "completion_time": None if status == "ACTIVE" else time,
+        "bytes_transferred": bytes_transferred,
+        "files_transferred": 1,
+        "source_endpoint_display_name": "src",
+        "destination_endpoint_display_name": "dst",
+    }
+
+
+TASKS = [
+    _task(1, "SUCCEEDED", "nightly-1", 1024),
+    _task(2, "FAILED", "adhoc", 0),
+    _task(3, "ACTIVE", "nightly-3", 2048),
+]
+
+
+def _add_task_list(*tasks):
+    responses.add(responses.GET, TASK_LIST_URL, json={"DATA": list(tasks)})
+
+
+def _task_list_filters():
+    return [
+        urllib.parse.parse_qs(urllib.parse.urlparse(call.request.url).query)["filter"][
+            0
+        ]
+        for call in responses.calls
+        if call.request.url.startswith(TASK_LIST_URL)
+    ]
+
+
+def test_history_sync(run_line):
+    _add_task_list(*TASKS)
+    result = run_line("globus task history sync -F json")
+    assert json.loads(result.stdout) == {
+        "new": 3,
+        "updated": 0,
+        "api_calls": 1,
+        "total": 3,
+    }
+
+    # the second sync fetches new tasks, and refreshes the active task
+    done = dict(TASKS[2], status="SUCCEEDED", completion_time="2021-03-04T00:00:00")
+    _add_task_list()
+    _add_task_list()
+    _add_task_list(done)
+    result = run_line("globus task history sync")
+    assert "New Tasks:     0" in result.stdout
+    assert "Updated Tasks: 1" in result.stdout
+    assert _task_list_filters()[1:] == [
+        "type:TRANSFER,DELETE/request_time:2021-03-03 12:00:00,",
+        "type:TRANSFER,DELETE/status:ACTIVE,INACTIVE/request_time:2021-03-03 12:00:00,",
+        "type:TRANSFER,DELETE/completion_time:2021-03-02 12:00:00,",
+    ]
+
+
+def test_history_list_is_local(run_line):
+    _add_task_list(*TASKS)
+    run_line("globus task history sync")
+    calls = len(responses.calls)
+
+    result = run_line("globus task history list --filter-label nightly-* -F json")
+    assert [t["task_id"] for t in json.loads(result.stdout)["DATA"]] == [
+        "task-3",
+        "task-1",
+    ]
+    result = run_line("globus task history list --filter-status FAILED")
+    assert "task-2" in result.stdout
+    assert "task-1" not in result.stdout
+    assert len(responses.calls) == calls
+
+
+def test_history_summary(run_line):
+    _add_task_list(*TASKS)
+    result = run_line("globus task history summary --sync -F json")
+    assert [(r["status"], r["tasks"]) for r in json.loads(result.stdout)["DATA"]] == [
+        ("ACTIVE", 1),
+        ("FAILED", 1),
+        ("SUCCEEDED", 1),
+    ]
+
+    result = run_line(
+        "globus task history summary --by day --filter-requested-after 2021-03-02"
+    )
+    lines = result.stdout.splitlines()
+    assert lines[0].split(" | ") == [
+        "Day       ",
+        "Tasks",
+        "Bytes Transferred",
+        "Files Transferred",
+    ]
+    assert [line.split(" | ")[:3] for line in lines[2:]] == [
+        ["2021-03-02", "1    ", "0                "],
+        ["2021-03-03", "1    ", "2048             "],
+    ]
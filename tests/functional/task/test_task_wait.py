@@ -0,0 +1,182 @@
+import json
+import urllib.parse
+import uuid
+
+import pytest
+import responses
+
+TASK_LIST_URL = "https://transfer.api.globus.org/v0.10/task_list"
+TASK_IDS = [str(uuid.UUID(int=i)) for i in range(1, 3)]
+
+
+@pytest.fixture(autouse=True)
+def patch_sleep(monkeypatch):
+    sleep_calls = []
+    monkeypatch.setattr("time.sleep", sleep_calls.append)
+    return sleep_calls
+
+
+def _task(task_id, status):
+    return {"DATA_TYPE": "task", "task_id": task_id, "status": status}
+
+
+def _add_task_list(*statuses):
+    """Add a task_list response with the given status for each task in TASK_IDS."""
+    responses.add(
+        responses.GET,
+        TASK_LIST_URL,
+        json={
+            "DATA": [
+                _task(task_id, status)
+                for task_id, status in zip(TASK_IDS, statuses)
+                if status is not None
+            ]
+        },
+    )
+
+
+def _task_list_filters():
+    return [
+        urllib.parse.parse_qs(urllib.parse.urlparse(call.request.url).query)["filter"][
+            0
+        ]
+        for call in responses.calls
+        if call.request.url.startswith(TASK_LIST_URL)
+    ]
+
+
+def test_task_wait_many(run_line):
+    _add_task_list("SUCCEEDED", "ACTIVE")
+    _add_task_list(None, "SUCCEEDED")
+
+    result = run_line(["globus", "task", "wait", "-F", "json", *TASK_IDS])
+    assert [task["status"] for task in json.loads(result.stdout)["DATA"]] == [
+        "SUCCEEDED",
+        "SUCCEEDED",
+    ]
+    assert f"{TASK_IDS[0]}: SUCCEEDED" in result.stderr
+    assert f"{TASK_IDS[1]}: SUCCEEDED" in result.stderr
+    # finished tasks are not polled again
+    assert _task_list_filters() == [
+        "task_id:" + ",".join(TASK_IDS),
+        "task_id:" + TASK_IDS[1],
+    ]
+
+
+@pytest.mark.parametrize(
+    "statuses, exit_code", [(("SUCCEEDED", "ACTIVE"), 0), (("ACTIVE", "FAILED"), 1)]
+)
+def test_task_wait_any(run_line, statuses, exit_code):
+    _add_task_list(*statuses)
+
+    run_line(["globus", "task", "wait", "--any", *TASK_IDS], assert_exit_code=exit_code)
+    assert len(_task_list_filters()) == 1
+
+
+def test_task_wait_all_reports_failure(run_line):
+    _add_task_list("FAILED", "ACTIVE")
+    _add_task_list(None, "SUCCEEDED")
+
+    result = run_line(["globus", "task", "wait", *TASK_IDS], assert_exit_code=1)
+    assert f"{TASK_IDS[0]}: FAILED" in result.stderr
+    assert len(_task_list_filters()) == 2
+
+
+def test_task_wait_many_timeout(run_line, patch_sleep):
+    _add_task_list("ACTIVE", "ACTIVE")
+
+    result = run_line(
+        ["globus", "task", "wait", "--timeout", "2", "--timeout-exit-code", "50"]
+        + TASK_IDS,
+        assert_exit_code=50,
+    )
+    assert "2 tasks have yet to complete after 2 seconds" in result.stderr
+    assert patch_sleep == [1, 1]
+    assert len(_task_list_filters()) == 3
+
+
+def test_task_wait_ids_from_stdin(run_line):
+    _add_task_list("SUCCEEDED", "SUCCEEDED")
+
+    run_line("globus task wait -", stdin="\n".join(TASK_IDS + TASK_IDS[:1]) + "\n")
+    assert _task_list_filters() == ["task_id:" + ",".join(TASK_IDS)]
+
+
+def test_task_wait_fetches_tasks_missing_from_task_list(run_line):
+    _add_task_list("SUCCEEDED", None)
+    responses.add(
+        responses.GET,
+        f"https://transfer.api.globus.org/v0.10/task/{TASK_IDS[1]}",
+        json=_task(TASK_IDS[1], "SUCCEEDED"),
+    )
+
+    run_line(["globus", "task", "wait", *TASK_IDS])
+
+
+def test_task_wait_batches_task_list_queries(run_line):
+    task_ids = [str(uuid.UUID(int=i)) for i in range(1, 61)]
+    responses.add(
+        responses.GET,
+        TASK_LIST_URL,
+        json={"DATA": [_task(task_id, "SUCCEEDED") for task_id in task_ids[:50]]},
+    )
+    responses.add(
+        responses.GET,
+        TASK_LIST_URL,
+        json={"DATA": [_task(task_id, "SUCCEEDED") for task_id in task_ids[50:]]},
+    )
+
+    run_line(["globus", "task", "wait", *task_ids])
+    filters = _task_list_filters()
+    assert [len(f.split(",")) for f in filters] == [50, 10]
+
+
+def test_task_wait_adaptive_polling(run_line, patch_sleep):
+    for pending in (5, 5, 5, 4, 4):
+        responses.add(
+            responses.GET,
+            TASK_LIST_URL,
+            json={
+                "DATA": [
+                    dict(_task(task_id, "ACTIVE"), subtasks_pending=pending)
+                    for task_id in TASK_IDS
+                ]
+            },
+        )
+    _add_task_list("SUCCEEDED", "SUCCEEDED")
+
+    run_line(["globus", "task", "wait", "--max-polling-interval", "3", *TASK_IDS])
+    # backs off while nothing changes, then starts over when subtasks finish
+    assert patch_sleep == [1, 2, 3, 1, 2]
+
+
+def test_task_wait_adaptive_polling_respects_timeout(run_line, patch_sleep):
+    _add_task_list("ACTIVE", "ACTIVE")
+
+    run_line(
+        ["globus", "task", "wait", "--timeout", "5", "--max-polling-interval", "60"]
+        + TASK_IDS,
+        assert_exit_code=1,
+    )
+    assert patch_sleep == [1, 2, 2]
+
+
+def test_task_wait_rejects_zero_polling_interval(run_line):
+    result = run_line(
+        ["globus", "task", "wait", "--polling-interval", "0", *TASK_IDS],
+        assert_exit_code=2,
+    )
+    assert "--polling-interval=0 was less than minimum of 1" in result.stderr
+
+
+def test_task_wait_single_task_finishing_at_timeout(run_line, patch_sleep):
+    task_url = f"https://transfer.api.globus.org/v0.10/task/{TASK_IDS[0]}"
+    responses.add(responses.GET, task_url, json=_task(TASK_IDS[0], "ACTIVE"))
+    responses.add(responses.GET, task_url, json=_task(TASK_IDS[0], "SUCCEEDED"))
+
+    # the poll at the timeout sees that the task succeeded
+    result = run_line(
+        f"globus task wait -F json --timeout 1 --timeout-exit-code 50 {TASK_IDS[0]}"
+    )
+    assert json.loads(result.stdout)["status"] == "SUCCEEDED"
+    assert len(responses.calls) == 2
@@ -0,0 +1,117 @@
+import json
+import uuid
+
+import pytest
+import responses
+
+TASK_ID = str(uuid.UUID(int=1))
+TASK_URL = f"https://transfer.api.globus.org/v0.10/task/{TASK_ID}"
+
+
+@pytest.fixture(autouse=True)
+def fake_clock(monkeypatch):
+    """Patch sleep to advance a fake monotonic clock, and record the sleeps."""
+    clock = {"now": 0.0, "sleeps": []}
+
+    def sleep(seconds):
+        clock["sleeps"].append(seconds)
+        clock["now"] += seconds
+
+    monkeypatch.setattr("time.sleep", sleep)
+    monkeypatch.setattr("time.monotonic", lambda: clock["now"])
+    return clock
+
+
+def _add_task(status, bytes_transferred):
+    responses.add(
+        responses.GET,
+        TASK_URL,
+        json={
+            "DATA_TYPE": "task",
+            "task_id": TASK_ID,
+            "status": status,
+            "bytes_transferred": bytes_transferred,
+            "files_transferred": 0,
+            "effective_bytes_per_second": 0,
+        },
+    )
+
+
+def test_task_watch_jsonl(run_line, fake_clock):
+    _add_task("ACTIVE", 0)
+    _add_task("ACTIVE", 5000)
+    _add_task("SUCCEEDED", 10000)
+
+    result = run_line(
+        ["globus", "task", "watch", "-F", "jsonl", "--total-bytes", "10000", TASK_ID]
+    )
+    samples = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [s["status"] for s in samples] == ["ACTIVE", "ACTIVE", "SUCCEEDED"]
+    assert [s["instantaneous_bytes_per_second"] for s in samples] == [
+        None,
+        1000,
+        1000,
+    ]
+    assert samples[1]["eta_seconds"] == 5
+    assert samples[2]["eta_seconds"] == 0
+    assert [s["elapsed_seconds"] for s in samples] == [0, 5, 10]
+    assert fake_clock["sleeps"] == [5, 5]
+
+
+def test_task_watch_jsonl_jmespath(run_line):
+    _add_task("ACTIVE", 0)
+    _add_task("SUCCEEDED", 10000)
+
+    result = run_line(
+        ["globus", "task", "watch", "-F", "jsonl", "--jmespath", "status", TASK_ID]
+    )
+    assert result.stdout.splitlines() == ['"ACTIVE"', '"SUCCEEDED"']
+
+
+def test_task_watch_json(run_line):
+    _add_task("ACTIVE", 0)
+    _add_task("SUCCEEDED", 10000)
+
+    result = run_line(["globus", "task", "watch", "-F", "json", TASK_ID])
+    samples = json.loads(result.stdout)["DATA"]
+    assert [s["bytes_transferred"] for s in samples] == [0, 10000]
+
+
+def test_task_watch_text_lines(run_line):
+    _add_task("ACTIVE", 0)
+    _add_task("SUCCEEDED", 10240)
+
+    # stdout is not a terminal, so a line is printed per poll
+    result = run_line(["globus", "task", "watch", TASK_ID])
+    assert result.stdout.splitlines() == [
+        "ACTIVE  0  - (avg -)",
+        "SUCCEEDED  10K  2.0K/s (avg 2.0K/s)  ETA 0:00:00",
+    ]
+
+
+def test_task_watch_failed_task_exits_1(run_line):
+    _add_task("ACTIVE", 0)
+    _add_task("FAILED", 0)
+
+    result = run_line(["globus", "task", "watch", TASK_ID], assert_exit_code=1)
+    assert len(result.stdout.splitlines()) == 2
+
+
+def test_task_watch_live_line(run_line, monkeypatch):
+    monkeypatch.setattr("globus_cli.commands.task.watch.out_is_terminal", lambda: True)
+    _add_task("ACTIVE", 0)
+    _add_task("SUCCEEDED", 10240)
+
+    result = run_line(["globus", "task", "watch", "--total-bytes", "10K", TASK_ID])
+    lines = result.stdout.split("\r")
+    assert lines[0] == ""
+    assert lines[1].rstrip() == "ACTIVE  0 of 10K  - (avg -)"
+    assert lines[2] == "SUCCEEDED  10K of 10K  2.0K/s (avg 2.0K/s)  ETA 0:00:00\n"
+
+
+def test_task_watch_rejects_signed_total(run_line):
+    result = run_line(
+        ["globus", "task", "watch", "--total-bytes", "+1G", TASK_ID],
+        assert_exit_code=2,
+    )
+    assert "+1G is not a size of the form N[KMGTP]" in result.stderr
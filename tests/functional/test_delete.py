@@ -0,0 +1,196 @@
+import json
+
+import pytest
+import responses
+from globus_sdk._testing import get_response_set
+
+
+@pytest.mark.parametrize("recursive, expect", [(False, 3), (True, 2)])
+def test_delete_batch_dedupe_dryrun(
+    run_line, task_submit_responses, go_ep1_id, recursive, expect
+):
+    result = run_line(
+        f"globus delete -F json --batch - --dry-run --dedupe {go_ep1_id}"
+        + (" -r" if recursive else ""),
+        stdin="/a\n/a/b\n/a/b/\n/c\n",
+    )
+    assert len(json.loads(result.output)["DATA"]) == expect
+
+
+def test_dedupe_requires_batch(run_line, go_ep1_id):
+    result = run_line(f"globus delete --dedupe {go_ep1_id}:/a", assert_exit_code=2)
+    assert "--dedupe can only be used with --batch" in result.stderr
+
+
+def test_delete_batch_dry_run_summary(run_line, task_submit_responses, go_ep1_id):
+    result = run_line(
+        f"globus delete --batch - --dry-run-summary -r {go_ep1_id}:/src",
+        stdin="a\nb\n",
+    )
+    assert "Recursive Items:         2" in result.output
+    assert "Path Parent Directories: 1" in result.output
+
+
+@pytest.mark.parametrize(
+    "pattern, expect",
+    [
+        ("/share/*/file[12].txt", ["file1.txt", "file2.txt"]),
+        ("/share/god*/*", ["file1.txt", "file2.txt", "file3.txt"]),
+        ("/share/godata/.h*", [".hidden"]),
+        ("/share/*/", [""]),
+    ],
+)
+def test_delete_expand_globs_dryrun(
+    run_line, task_submit_responses, go_ep1_id, pattern, expect
+):
+    result = run_line(
+        f"globus delete -F json --dry-run --expand-globs '{go_ep1_id}:{pattern}'"
+    )
+    document = json.loads(result.output)
+    assert document["interpret_globs"] is False
+    assert [item["path"] for item in document["DATA"]] == [
+        "/share/godata" + (f"/{name}" if name else "") for name in expect
+    ]
+    assert "--expand-globs matched" in result.stderr
+
+
+def test_delete_batch_expand_globs(run_line, task_submit_responses, go_ep1_id):
+    result = run_line(
+        f"globus delete -F json --batch - --dry-run --expand-globs --dedupe "
+        f"{go_ep1_id}:/share",
+        stdin="godata/file1*\ngodata/file[13].txt\n",
+    )
+    paths = [item["path"] for item in json.loads(result.output)["DATA"]]
+    assert paths == ["/share/godata/file1.txt", "/share/godata/file3.txt"]
+    assert "--expand-globs matched 3 files (" in result.stderr
+
+
+@pytest.mark.parametrize("answer, submitted", [("n", 0), ("y", 2)])
+def test_delete_sharded_batch_expand_globs_confirms_first(
+    run_line, task_submit_responses, go_ep1_id, tmp_path, monkeypatch, answer, submitted
+):
+    task_submit_responses("delete", submitted)
+    monkeypatch.setattr("globus_cli.commands.delete.err_is_terminal", lambda: True)
+    monkeypatch.setattr("globus_cli.commands.delete.term_is_interactive", lambda: True)
+    batch = tmp_path / "batch"
+    batch.write_text("godata/file[12].txt\n")
+
+    result = run_line(
+        f"globus delete --batch {batch} --max-items-per-task 1 --expand-globs "
+        f"{go_ep1_id}:/share",
+        stdin=f"{answer}\n",
+        assert_exit_code=0 if submitted else 1,
+    )
+    assert "--expand-globs matched 2 files (" in result.stderr
+    assert "Are you sure you want to delete 2 files" in result.stderr
+    deletes = [c for c in responses.calls if c.request.url.endswith("/delete")]
+    assert len(deletes) == submitted
+
+
+def test_delete_expand_globs_no_match(run_line, task_submit_responses, go_ep1_id):
+    result = run_line(
+        f"globus delete --dry-run --expand-globs '{go_ep1_id}:/share/*/nope*'",
+        assert_exit_code=1,
+    )
+    assert 'No paths match "/share/*/nope*"' in result.stderr
+
+    run_line(f"globus delete --dry-run --expand-globs -f '{go_ep1_id}:/share/*/nope*'")
+
+
+def test_delete_expand_globs_conflicts_with_enable_globs(run_line, go_ep1_id):
+    result = run_line(
+        f"globus delete --expand-globs --enable-globs '{go_ep1_id}:/a/*'",
+        assert_exit_code=2,
+    )
+    assert "--expand-globs cannot be used with --enable-globs" in result.stderr
+
+
+def test_delete_batch_max_items_per_task_json(
+    run_line, task_submit_responses, go_ep1_id
+):
+    meta = get_response_set("cli.get_submission_id").metadata
+    submitted = task_submit_responses("delete", 2)
+
+    result = run_line(
+        f"globus delete -F json --batch - --max-items-per-task 3 {go_ep1_id}",
+        stdin="a\nb\nc\nd\n",
+    )
+    assert sorted(submitted()) == [1, 3]
+    manifest = json.loads(result.output)["DATA"]
+    assert [(m["shard"], m["items"]) for m in manifest] == [(1, 3), (2, 1)]
+    assert manifest[0]["submission_id"] == meta["submission_id"]
+
+
+def test_delete_batch_resume_journal(
+    run_line, task_submit_responses, go_ep1_id, tmp_path
+):
+    meta = get_response_set("cli.get_submission_id").metadata
+    journal = tmp_path / "journal"
+    command = (
+        "globus delete --batch - --max-items-per-task 2 "
+        f"--journal {journal} {go_ep1_id}"
+    )
+
+    submitted = task_submit_responses("delete", 2)
+    run_line(command, stdin="a\nb\nc\n")
+    assert sorted(submitted()) == [1, 2]
+
+    # forget that the second task was accepted, as if we died while submitting it
+    lines = journal.read_text().splitlines(keepends=True)
+    journal.write_text("".join(line for line in lines if '"ack":2' not in line))
+
+    responses.calls.reset()
+    submitted = task_submit_responses("delete", 1)
+    result = run_line(command + " --resume-journal", stdin="a\nb\nc\n")
+    assert submitted() == [1]
+    sent = json.loads(responses.calls[-1].request.body)
+    assert sent["submission_id"] == meta["submission_id"]
+    assert sent["DATA"] == [{"DATA_TYPE": "delete_item", "path": "c"}]
+    assert len(result.output.splitlines()) == 2
+
+
+@pytest.mark.parametrize(
+    "resumed_args",
+    [
+        "--max-items-per-task 3",
+        "--max-items-per-task 2 --label x",
+        "--max-items-per-task 2 --recursive",
+    ],
+)
+def test_resume_journal_with_different_settings(
+    run_line, task_submit_responses, go_ep1_id, tmp_path, resumed_args
+):
+    journal = tmp_path / "journal"
+    task_submit_responses("delete", 1)
+    run_line(
+        f"globus delete --batch - --max-items-per-task 2 --journal {journal} "
+        f"{go_ep1_id}",
+        stdin="a\n",
+    )
+
+    result = run_line(
+        f"globus delete --batch - {resumed_args} --journal {journal} "
+        f"--resume-journal {go_ep1_id}",
+        stdin="a\n",
+        assert_exit_code=2,
+    )
+    assert "cannot --resume-journal" in result.stderr
+    assert "different settings" in result.stderr
+
+
+@pytest.mark.parametrize(
+    "args, message",
+    [
+        ("--resume-journal", "--resume-journal requires --journal"),
+        ("--journal j", "--journal can only be used with --max-items-per-task"),
+        (
+            "--journal j --max-items-per-task 2 --dry-run",
+            "--journal cannot be used with --dry-run",
+        ),
+    ],
+)
+def test_journal_usage_errors(run_line, go_ep1_id, args, message):
+    result = run_line(
+        f"globus delete --batch - {args} {go_ep1_id}", stdin="", assert_exit_code=2
+    )
+    assert message in result.stderr
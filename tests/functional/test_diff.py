@@ -0,0 +1,87 @@
+import json
+
+import pytest
+from globus_sdk._testing import load_response_set
+
+
+@pytest.fixture(autouse=True)
+def _load_responses():
+    load_response_set("cli.transfer_activate_success")
+    load_response_set("cli.du_results")
+    load_response_set("cli.diff_results")
+
+
+def test_diff_text(run_line, go_ep1_id, go_ep2_id):
+    result = run_line(f"globus diff {go_ep1_id}:/share/godata {go_ep2_id}:/~/godata")
+    assert result.stdout == (
+        "added\t100\t.hidden\n"
+        "changed\t4\tfile2.txt\n"
+        "changed\t6\tfile3.txt\n"
+        "missing\t4096\told/\n"
+    )
+    assert "added: 1 files, 100\n" in result.stderr
+    assert "changed: 2 files, 10\n" in result.stderr
+
+
+def test_diff_sync_level_size(run_line, go_ep1_id, go_ep2_id):
+    result = run_line(
+        f"globus diff -s size {go_ep1_id}:/share/godata {go_ep2_id}:/~/godata"
+    )
+    assert "file2.txt" in result.stdout
+    assert "file3.txt" not in result.stdout
+
+
+def test_diff_walks_added_directories(run_line, go_ep1_id, go_ep2_id):
+    result = run_line(
+        f"globus diff -F json --parallel 2 {go_ep1_id}:/share {go_ep2_id}:/~/share"
+    )
+    data = json.loads(result.stdout)
+    assert [(d["status"], d["path"]) for d in data["DATA"]] == [
+        ("added", "godata"),
+        ("added", "godata/.hidden"),
+        ("added", "godata/file1.txt"),
+        ("added", "godata/file2.txt"),
+        ("added", "godata/file3.txt"),
+    ]
+    assert data["summary"]["added"] == {"files": 4, "bytes": 114}
+
+
+def test_diff_batch(run_line, go_ep1_id, go_ep2_id, tmp_path):
+    batch = tmp_path / "delta.txt"
+    run_line(
+        f"globus diff {go_ep1_id}:/share/godata {go_ep2_id}:/~/godata "
+        f"--batch {batch}"
+    )
+    lines = batch.read_text().splitlines()
+    assert lines[0].startswith(f"# globus transfer {go_ep1_id}:/share/godata ")
+    assert lines[1:] == [
+        ".hidden .hidden",
+        "file2.txt file2.txt",
+        "file3.txt file3.txt",
+    ]
+
+
+def test_diff_batch_to_stdout(run_line, go_ep1_id, go_ep2_id):
+    result = run_line(
+        f"globus diff {go_ep1_id}:/share/godata {go_ep2_id}:/~/godata --batch -"
+    )
+    lines = result.stdout.splitlines()
+    assert lines[0].endswith(" --batch -")
+    assert lines[1:] == [
+        ".hidden .hidden",
+        "file2.txt file2.txt",
+        "file3.txt file3.txt",
+    ]
+    assert "changed\t4\tfile2.txt\n" in result.stderr
+
+
+@pytest.mark.parametrize("outformat", ["json", "unix"])
+def test_diff_batch_to_stdout_requires_text_output(
+    run_line, go_ep1_id, go_ep2_id, outformat
+):
+    result = run_line(
+        f"globus diff -F {outformat} {go_ep1_id}:/share/godata "
+        f"{go_ep2_id}:/~/godata --batch -",
+        assert_exit_code=2,
+    )
+    assert "--batch - can only be used with text output" in result.stderr
@@ -0,0 +1,36 @@
+import json
+
+import pytest
+from globus_sdk._testing import load_response_set
+
+
+@pytest.fixture(autouse=True)
+def _load_responses():
+    load_response_set("cli.transfer_activate_success")
+    load_response_set("cli.du_results")
+
+
+def test_du_text(run_line, go_ep1_id):
+    result = run_line(f"globus du {go_ep1_id}:/share")
+    assert result.output == "114\t4\t/share/godata\n114\t4\t/share\n"
+
+
+@pytest.mark.parametrize("depth_opt", ["-s", "--max-depth 0"])
+def test_du_summarize(run_line, go_ep1_id, depth_opt):
+    result = run_line(f"globus du {depth_opt} {go_ep1_id}:/share")
+    assert result.output == "114\t4\t/share\n"
+
+
+def test_du_json(run_line, go_ep1_id):
+    result = run_line(f"globus du -F json --parallel 2 {go_ep1_id}:/share")
+    assert json.loads(result.output) == {
+        "DATA": [
+            {"path": "/share/godata", "size": 114, "files": 4, "directories": 0},
+            {"path": "/share", "size": 114, "files": 4, "directories": 1},
+        ]
+    }
+
+
+def test_du_summarize_and_max_depth_are_exclusive(run_line, go_ep1_id):
+    result = run_line(f"globus du -s -d 0 {go_ep1_id}:/share", assert_exit_code=2)
+    assert "mutually exclusive" in result.stderr
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+import responses
+from globus_sdk._testing import load_response_set
+
+
+@pytest.fixture(autouse=True)
+def _load_responses():
+    load_response_set("cli.transfer_activate_success")
+    load_response_set("cli.du_results")
+
+
+def _ls_calls():
+    return [c for c in responses.calls if "/ls" in c.request.url]
+
+
+def test_find_everything(run_line, go_ep1_id):
+    result = run_line(f"globus find {go_ep1_id}:/share")
+    assert result.output.splitlines() == [
+        "/share/godata/",
+        "/share/godata/.hidden",
+        "/share/godata/file1.txt",
+        "/share/godata/file2.txt",
+        "/share/godata/file3.txt",
+    ]
+
+
+@pytest.mark.parametrize(
+    "opts, expect",
+    [
+        ("--name '*.txt' --size -5", ["file1.txt", "file2.txt"]),
+        ("--name file3.txt --name .hidden", [".hidden", "file3.txt"]),
+        ("--size +5 --type file", [".hidden", "file3.txt"]),
+        ("--mtime +30", [".hidden", "file1.txt", "file2.txt", "file3.txt"]),
+        ("--mtime -30", []),
+    ],
+)
+def test_find_predicates(run_line, go_ep1_id, opts, expect):
+    result = run_line(f"globus find -F json {go_ep1_id}:/share {opts}")
+    found = json.loads(result.output)["DATA"]
+    assert [x["name"].split("/")[-1] for x in found if x["type"] == "file"] == expect
+    assert all(x["path"] == "/share/" + x["name"] for x in found)
+
+
+@pytest.mark.parametrize("opts", ["--maxdepth 1", "--prune 'go*'"])
+def test_find_prunes_listings(run_line, go_ep1_id, opts):
+    result = run_line(f"globus find {go_ep1_id}:/share {opts}")
+    assert result.output == "/share/godata/\n"
+    assert len(_ls_calls()) == 1
+
+
+def test_find_mindepth(run_line, go_ep1_id):
+    result = run_line(f"globus find {go_ep1_id}:/share --mindepth 2 --name 'file1*'")
+    assert result.output == "/share/godata/file1.txt\n"
+    assert len(_ls_calls()) == 2
+
+
+def test_find_bad_size(run_line, go_ep1_id):
+    result = run_line(f"globus find {go_ep1_id}:/share --size 1X", assert_exit_code=2)
+    assert "is not of the form [+-]N[KMGTP]" in result.stderr
@@ -1,3 +1,7 @@
+import json
+
+import pytest
+import responses
 from globus_sdk._testing import load_response_set
 
 
@@ -24,6 +28,19 @@ def test_recursive(run_line, go_ep1_id):
     assert "file1.txt" in result.output
 
 
+@pytest.mark.parametrize("traversal", ["bfs", "iddfs"])
+def test_recursive_traversal(run_line, go_ep1_id, traversal):
+    load_response_set("cli.transfer_activate_success")
+    load_response_set("cli.ls_results")
+    result = run_line(f"globus ls -r --traversal {traversal} {go_ep1_id}:/share")
+    assert result.output.splitlines() == [
+        "godata/",
+        "godata/file1.txt",
+        "godata/file2.txt",
+        "godata/file3.txt",
+    ]
+
+
 # regression test for
 #   https://github.com/globus/globus-cli/issues/577
 def test_recursive_empty(run_line, go_ep1_id):
@@ -56,3 +73,131 @@ def test_recursive_json(run_line, go_ep1_id):
     result = run_line(f"globus ls -r -F json {go_ep1_id}:/share")
     assert '"DATA":' in result.output
     assert '"name": "godata/file1.txt"' in result.output
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_recursive_parallel(run_line, go_ep1_id, ordered):
+    """
+    Confirms --recursive --parallel ls finds the same results as a serial listing
+    """
+    load_response_set("cli.transfer_activate_success")
+    load_response_set("cli.ls_results")
+    serial = run_line(f"globus ls -r --recursive-depth-limit 1 {go_ep1_id}:/")
+    result = run_line(
+        "globus ls -r --recursive-depth-limit 1 --parallel 4 "
+        f"{'--ordered' if ordered else ''} {go_ep1_id}:/"
+    )
+    assert "share/godata/" in result.output
+    if ordered:
+        assert result.output == serial.output
+    else:
+        assert sorted(result.output.splitlines()) == sorted(serial.output.splitlines())
+
+
+def test_recursive_rate_limit_from_env(run_line, go_ep1_id, monkeypatch):
+    """
+    Confirms that the rate limit settings can be given by environment variables
+    """
+    sleeps = []
+    monkeypatch.setattr("time.sleep", sleeps.append)
+    monkeypatch.setenv("GLOBUS_CLI_RATE_LIMIT", "fixed")
+    monkeypatch.setenv("GLOBUS_CLI_MAX_REQUEST_RATE", "0.5")
+    load_response_set("cli.transfer_activate_success")
+    load_response_set("cli.ls_results")
+    result = run_line(f"globus ls -r {go_ep1_id}:/share")
+    assert "godata/file1.txt" in result.output
+    # two listings, the second of which had to wait for the first
+    assert len(sleeps) == 1
+    assert sleeps[0] == pytest.approx(2, abs=0.1)
+
+
+def test_recursive_checkpoint_and_resume(run_line, go_ep1_id, tmp_path):
+    """
+    Confirms that a completed checkpointed listing has nothing left to do on resume
+    """
+    load_response_set("cli.transfer_activate_success")
+    load_response_set("cli.ls_results")
+    checkpoint = tmp_path / "ls.ckpt"
+    result = run_line(f"globus ls -r --checkpoint {checkpoint} {go_ep1_id}:/share")
+    assert "godata/file1.txt" in result.output
+    assert checkpoint.read_text().endswith('{"complete":true}\n')
+
+    result = run_line(
+        f"globus ls -r --checkpoint {checkpoint} --resume {go_ep1_id}:/share"
+    )
+    assert result.output == ""
+
+    # resuming a checkpoint of a different listing is an error
+    result = run_line(
+        f"globus ls -r --checkpoint {checkpoint} --resume {go_ep1_id}:/",
+        assert_exit_code=2,
+    )
+    assert "cannot --resume" in result.stderr
+
+
+@pytest.mark.parametrize(
+    "args, message",
+    [
+        ("-r --resume", "--resume requires --checkpoint"),
+        ("--checkpoint ckpt", "--checkpoint can only be used with --recursive"),
+        (
+            "-r --checkpoint ckpt --traversal iddfs",
+            "--checkpoint cannot be used with --traversal iddfs",
+        ),
+    ],
+)
+def test_checkpoint_usage_errors(run_line, go_ep1_id, args, message):
+    result = run_line(f"globus ls {args} {go_ep1_id}:/", assert_exit_code=2)
+    assert message in result.stderr
+
+
+@pytest.mark.parametrize("recursive", [True, False])
+def test_listing_cache(run_line, go_ep1_id, tmp_path, monkeypatch, recursive):
+    """
+    Confirms that --cache reuses listings, and that --refresh and --no-cache do not
+    """
+    monkeypatch.setattr(
+        "globus_cli.login_manager.listing_cache_location",
+        lambda: (str(tmp_path / "cache.db"), "test"),
+    )
+    load_response_set("cli.transfer_activate_success")
+    load_response_set("cli.ls_results")
+
+    def ls_calls(opts):
+        before = len(responses.calls)
+        result = run_line(
+            f"globus ls {'-r' if recursive else ''} {opts} {go_ep1_id}:/share"
+        )
+        assert "godata/" in result.output
+        return (
+            len([c for c in responses.calls[before:] if "/ls" in c.request.url]),
+            result.output,
+        )
+
+    first, first_output = ls_calls("--cache")
+    assert first == (2 if recursive else 1)
+    assert ls_calls("--cache") == (0, first_output)
+    assert ls_calls("--refresh") == (first, first_output)
+    assert ls_calls("--no-cache") == (first, first_output)
+    assert ls_calls("") == (first, first_output)
+    assert ls_calls("--cache --cache-ttl 0")[0] == first
+
+
+def test_recursive_jsonl(run_line, go_ep1_id):
+    """
+    Confirms -F jsonl prints one item per line from a RecursiveLsResponse
+    """
+    load_response_set("cli.transfer_activate_success")
+    load_response_set("cli.ls_results")
+    result = run_line(f"globus ls -r -F jsonl {go_ep1_id}:/share")
+    items = [json.loads(line) for line in result.output.splitlines()]
+    assert [x["name"] for x in items] == [
+        "godata",
+        "godata/file1.txt",
+        "godata/file2.txt",
+        "godata/file3.txt",
+    ]
+    assert all(x["DATA_TYPE"] == "file" for x in items)
+
+    result = run_line(f"globus ls -r -F jsonl --jq name {go_ep1_id}:/share")
+    assert result.output.splitlines()[0] == '"godata"'
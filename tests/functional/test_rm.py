@@ -120,3 +120,53 @@ def test_timeout_explicit_status(run_line, patch_sleep, go_ep1_id):
         assert_exit_code=status,
     )
     assert "Task has yet to complete after 1 seconds" in result.stderr
+
+
+def test_timeout_adaptive_polling(run_line, patch_sleep, go_ep1_id):
+    """
+    With adaptive polling, rm waits longer between checks, but never past the
+    timeout.
+    """
+    load_response_set("cli.transfer_activate_success")
+    load_response_set("cli.get_submission_id")
+    load_response_set("cli.submit_delete_queued")
+
+    result = run_line(
+        f"globus rm -r --timeout 10 --max-polling-interval 4 {go_ep1_id}:/foo/bar.txt",
+        assert_exit_code=1,
+    )
+    assert "Task has yet to complete after 10 seconds" in result.stderr
+    assert [args[0] for args, _ in patch_sleep] == [1, 2, 4, 3]
+
+
+def _get_task_calls():
+    return [c for c in responses.calls if "/task/" in c.request.url]
+
+
+def test_completed_task_is_fetched_once(run_line, go_ep1_id):
+    """
+    The poll which sees that the task has finished is used for the output, rather
+    than fetching the task again.
+    """
+    load_response_set("cli.transfer_activate_success")
+    load_response_set("cli.get_submission_id")
+    load_response_set("cli.submit_delete_success")
+
+    result = run_line(f"globus rm -r -F json {go_ep1_id}:/foo")
+    assert _load_probably_json_substring(result.output)["status"] == "SUCCEEDED"
+    assert len(_get_task_calls()) == 1
+
+
+def test_timeout_polls_once_per_interval(run_line, patch_sleep, go_ep1_id):
+    load_response_set("cli.transfer_activate_success")
+    load_response_set("cli.get_submission_id")
+    load_response_set("cli.submit_delete_queued")
+
+    result = run_line(
+        f"globus rm -r -F json --timeout 2 {go_ep1_id}:/foo/bar.txt",
+        assert_exit_code=1,
+    )
+    assert _load_probably_json_substring(result.output)["status"] == "ACTIVE"
+    # at the start, after one second, and at the timeout
+    assert len(_get_task_calls()) == 3
+    assert len(patch_sleep) == 2
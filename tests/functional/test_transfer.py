@@ -0,0 +1,317 @@
+import json
+
+import pytest
+import responses
+from globus_sdk._testing import RegisteredResponse, load_response
+
+
+def _ls_response(endpoint_id, files):
+    load_response(
+        RegisteredResponse(
+            service="transfer",
+            path=f"/operation/endpoint/{endpoint_id}/ls",
+            json={
+                "DATA": [
+                    {
+                        "name": name,
+                        "type": "file",
+                        "size": size,
+                        "last_modified": "2021-01-14 00:33:38+00:00",
+                    }
+                    for name, size in files.items()
+                ]
+            },
+        )
+    )
+
+
+def test_transfer_batch_options_dryrun(
+    run_line, task_submit_responses, go_ep1_id, go_ep2_id
+):
+    batch_input = "-r abc/ /def/\nx y --external-checksum=ff\n"
+    result = run_line(
+        f"globus transfer -F json --batch - --dry-run {go_ep1_id}:/src {go_ep2_id}",
+        stdin=batch_input,
+    )
+    items = json.loads(result.output)["DATA"]
+    assert [
+        (i["source_path"], i["destination_path"], i["recursive"]) for i in items
+    ] == [("/src/abc/", "/def/", True), ("/src/x", "y", False)]
+    assert items[1]["external_checksum"] == "ff"
+
+
+def test_transfer_batch_error_gives_line_number(
+    run_line, task_submit_responses, go_ep1_id, go_ep2_id
+):
+    result = run_line(
+        f"globus transfer --batch - --dry-run {go_ep1_id} {go_ep2_id}",
+        stdin="abc /def\n-r a b --external-checksum x\n",
+        assert_exit_code=2,
+    )
+    assert "--batch line 2: --recursive and --external-checksum" in result.stderr
+
+
+def test_transfer_batch_dedupe_dryrun(
+    run_line, task_submit_responses, go_ep1_id, go_ep2_id
+):
+    batch_input = (
+        "a/b/c x/b/c\n"
+        "a x -r\n"
+        "a/b/c x/b/c\n"
+        "a/d y/d\n"
+        "a/e x/e --external-checksum ff\n"
+        "./z q\n"
+        "z q\n"
+    )
+    result = run_line(
+        f"globus transfer -F json --batch - --dry-run --dedupe {go_ep1_id} {go_ep2_id}",
+        stdin=batch_input,
+    )
+    items = json.loads(result.output)["DATA"]
+    assert [(i["source_path"], i["destination_path"]) for i in items] == [
+        ("a", "x"),
+        ("a/d", "y/d"),
+        ("a/e", "x/e"),
+        ("z", "q"),
+    ]
+    assert (
+        "--dedupe dropped 2 duplicate items and 1 items covered by recursive items"
+        in result.stderr
+    )
+
+
+def test_transfer_batch_skip_unchanged_dryrun(
+    run_line, task_submit_responses, go_ep1_id, go_ep2_id
+):
+    _ls_response(go_ep1_id, {"a.txt": 10, "b.txt": 20, "c.txt": 30})
+    _ls_response(go_ep2_id, {"a.txt": 10, "b.txt": 21})
+
+    result = run_line(
+        f"globus transfer -F json --batch - --dry-run --skip-unchanged "
+        f"--sync-level size {go_ep1_id} {go_ep2_id}",
+        stdin="/src/a.txt /dst/a.txt\n/src/b.txt /dst/b.txt\n/src/c.txt /dst/c.txt\n",
+    )
+    items = json.loads(result.output)["DATA"]
+    assert [i["source_path"] for i in items] == ["/src/b.txt", "/src/c.txt"]
+    assert (
+        "--skip-unchanged left out 1 files (10) which are already up to date"
+        in result.stderr
+    )
+
+
+@pytest.mark.parametrize(
+    "args, message",
+    [
+        ("--sync-level size SRC", "--skip-unchanged can only be used with --batch"),
+        (
+            "--batch - --sync-level checksum",
+            "--skip-unchanged requires --sync-level exists, size, or mtime",
+        ),
+        (
+            "--batch -",
+            "--skip-unchanged requires --sync-level exists, size, or mtime",
+        ),
+    ],
+)
+def test_skip_unchanged_usage_errors(run_line, go_ep1_id, go_ep2_id, args, message):
+    if args.endswith("SRC"):
+        args = args[:-3] + f"{go_ep1_id}:/a {go_ep2_id}:/b"
+    else:
+        args += f" {go_ep1_id} {go_ep2_id}"
+    result = run_line(
+        f"globus transfer --skip-unchanged {args}", stdin="", assert_exit_code=2
+    )
+    assert message in result.stderr
+
+
+def test_transfer_batch_dry_run_summary(
+    run_line, task_submit_responses, go_ep1_id, go_ep2_id
+):
+    result = run_line(
+        f"globus transfer -F json --batch - --dry-run-summary --max-items-per-task 2 "
+        f"{go_ep1_id}:/src {go_ep2_id}:/dst",
+        stdin="a/1 a/1\na/2 a/2\nb b -r\na/1 a/1\n",
+    )
+    summary = json.loads(result.output)
+    assert summary.pop("payload_bytes") > 0
+    assert summary == {
+        "items": 4,
+        "recursive_items": 1,
+        "duplicate_items": 1,
+        "parent_directories": {"source_path": 2, "destination_path": 2},
+        "tasks": 2,
+        "exact": True,
+    }
+
+
+def test_transfer_batch_max_items_per_task(
+    run_line, task_submit_responses, go_ep1_id, go_ep2_id
+):
+    submitted = task_submit_responses("transfer", 3)
+
+    batch_input = "".join(f"src{i} dst{i}\n" for i in range(5))
+    result = run_line(
+        f"globus transfer --batch - --max-items-per-task 2 {go_ep1_id} {go_ep2_id}",
+        stdin=batch_input,
+    )
+    # shards are submitted in parallel, so they may reach the API in any order
+    assert sorted(submitted()) == [1, 2, 2]
+    assert sorted(result.output.splitlines()) == [
+        "00000000-0000-0000-0000-000000000001",
+        "00000000-0000-0000-0000-000000000002",
+        "00000000-0000-0000-0000-000000000003",
+    ]
+
+
+def test_transfer_batch_max_items_per_task_serial(
+    run_line, task_submit_responses, go_ep1_id, go_ep2_id
+):
+    submitted = task_submit_responses("transfer", 3)
+
+    batch_input = "".join(f"src{i} dst{i}\n" for i in range(5))
+    result = run_line(
+        "globus transfer --batch - --max-items-per-task 2 --parallel-submissions 1 "
+        f"{go_ep1_id} {go_ep2_id}",
+        stdin=batch_input,
+    )
+    assert submitted() == [2, 2, 1]
+    assert result.output.splitlines() == [
+        "00000000-0000-0000-0000-000000000001",
+        "00000000-0000-0000-0000-000000000002",
+        "00000000-0000-0000-0000-000000000003",
+    ]
+
+
+def test_batch_max_items_per_task_reports_tasks_before_error(
+    run_line, task_submit_responses, go_ep1_id, go_ep2_id
+):
+    submitted = task_submit_responses("transfer", 1)
+
+    result = run_line(
+        f"globus transfer --batch - --max-items-per-task 1 {go_ep1_id} {go_ep2_id}",
+        stdin="a b\nc\n",
+        assert_exit_code=2,
+    )
+    assert submitted() == [1]
+    assert "1 tasks were submitted before this error" in result.stderr
+    assert "--batch line 2" in result.stderr
+
+
+def test_transfer_batch_max_items_per_task_exclude_without_recursive(
+    run_line, task_submit_responses, go_ep1_id, go_ep2_id
+):
+    submitted = task_submit_responses("transfer", 2)
+
+    result = run_line(
+        "globus transfer --exclude *.txt --batch - --max-items-per-task 1 "
+        f"{go_ep1_id} {go_ep2_id}",
+        stdin="a b\nc d\n",
+        assert_exit_code=2,
+    )
+    assert "--exclude can only be used with --recursive transfers" in result.stderr
+    # the batch is rejected before any task is submitted
+    assert submitted() == []
+
+
+def test_transfer_batch_max_items_per_task_exclude(
+    run_line, task_submit_responses, go_ep1_id, go_ep2_id
+):
+    task_submit_responses("transfer", 2)
+
+    run_line(
+        "globus transfer --exclude *.txt --batch - --max-items-per-task 1 "
+        f"--parallel-submissions 1 {go_ep1_id} {go_ep2_id}",
+        stdin="a b\n--recursive c d\n",
+    )
+    sent = [
+        json.loads(call.request.body)
+        for call in responses.calls
+        if call.request.url.endswith("/transfer")
+    ]
+    # the rules are only sent with the task which has the recursive item
+    assert [task["filter_rules"] for task in sent] == [
+        None,
+        [{"DATA_TYPE": "filter_rule", "method": "exclude", "name": "*.txt"}],
+    ]
+
+
+@pytest.mark.parametrize(
+    "args, message",
+    [
+        ("{ep}:/a {ep}:/b", "--max-items-per-task can only be used with --batch"),
+        (
+            "--batch - --submission-id abc {ep} {ep}",
+            "You cannot use --submission-id with --max-items-per-task",
+        ),
+    ],
+)
+def test_max_items_per_task_usage_errors(run_line, go_ep1_id, args, message):
+    result = run_line(
+        "globus transfer --max-items-per-task 2 " + args.format(ep=go_ep1_id),
+        stdin="",
+        assert_exit_code=2,
+    )
+    assert message in result.stderr
+
+
+def test_transfer_batch_journal(
+    run_line, task_submit_responses, go_ep1_id, go_ep2_id, tmp_path
+):
+    task_submit_responses("transfer", 1)
+    journal = tmp_path / "journal"
+
+    run_line(
+        f"globus transfer --batch - --max-items-per-task 2 --journal {journal} "
+        f"{go_ep1_id} {go_ep2_id}",
+        stdin="a b\n",
+    )
+    header, shard, ack = (json.loads(line) for line in journal.read_text().split())
+    settings = header["settings"]
+    assert (settings["command"], settings["max_items_per_task"]) == ("transfer", 2)
+    # every task-level field is recorded, but not the items or submission ID
+    task = settings["task"]
+    assert (task["source_endpoint"], task["destination_endpoint"]) == (
+        go_ep1_id,
+        go_ep2_id,
+    )
+    assert "verify_checksum" in task and "filter_rules" in task
+    assert "DATA" not in task and "submission_id" not in task
+    assert (shard["shard"], shard["items"]) == (1, 1)
+    assert ack == {"ack": 1, "task_id": "00000000-0000-0000-0000-000000000001"}
+
+
+@pytest.mark.parametrize(
+    "first_args, resumed_args",
+    [
+        (
+            "--max-items-per-task 2 --sync-level size",
+            "--max-items-per-task 2 --sync-level mtime",
+        ),
+        ("--max-items-per-task 2", "--max-items-per-task 2 --preserve-mtime"),
+    ],
+)
+def test_resume_journal_with_different_settings(
+    run_line,
+    task_submit_responses,
+    go_ep1_id,
+    go_ep2_id,
+    tmp_path,
+    first_args,
+    resumed_args,
+):
+    journal = tmp_path / "journal"
+    task_submit_responses("transfer", 1)
+    run_line(
+        f"globus transfer --batch - {first_args} --journal {journal} "
+        f"{go_ep1_id} {go_ep2_id}",
+        stdin="a b\n",
+    )
+
+    result = run_line(
+        f"globus transfer --batch - {resumed_args} --journal {journal} "
+        f"--resume-journal {go_ep1_id} {go_ep2_id}",
+        stdin="a b\n",
+        assert_exit_code=2,
+    )
+    assert "cannot --resume-journal" in result.stderr
+    assert "different settings" in result.stderr
@@ -0,0 +1,94 @@
+import pytest
+
+from globus_cli.parsing import BatchDeduplicator
+
+
+def _transfer_dedupe(lines):
+    dedupe = BatchDeduplicator(
+        ("source_path", "destination_path"),
+        is_recursive=lambda item: item["recursive"],
+    )
+    for source, dest, recursive in lines:
+        dedupe.add(
+            {"source_path": source, "destination_path": dest, "recursive": recursive}
+        )
+    return dedupe, [
+        (item["source_path"], item["destination_path"], item["recursive"])
+        for item in dedupe
+    ]
+
+
+def test_exact_duplicates_are_dropped():
+    dedupe, items = _transfer_dedupe(
+        [("/a", "/x", False), ("/a/", "/x", False), ("/a", "/y", False)]
+    )
+    assert items == [("/a", "/x", False), ("/a", "/y", False)]
+    assert (dedupe.item_count, dedupe.duplicate_count) == (2, 1)
+
+
+def test_recursive_ancestors_cover_items_in_the_same_place():
+    dedupe, items = _transfer_dedupe(
+        [
+            ("/a/b/c", "/x/b/c", False),
+            ("/a/b/", "/x/b/", True),
+            ("/a/", "/x/", True),
+            ("/a/b/d", "/elsewhere", False),
+            ("/ab", "/xb", False),
+        ]
+    )
+    assert items == [
+        ("/a/", "/x/", True),
+        ("/a/b/d", "/elsewhere", False),
+        ("/ab", "/xb", False),
+    ]
+    assert dedupe.folded_count == 2
+
+
+def test_any_matching_ancestor_covers():
+    _, items = _transfer_dedupe(
+        [("/a", "/x", True), ("/a/b", "/y", True), ("/a/b/c", "/x/b/c", False)]
+    )
+    assert items == [("/a", "/x", True), ("/a/b", "/y", True)]
+
+
+def test_relative_and_absolute_paths_are_distinct():
+    _, items = _transfer_dedupe([("a", "x", True), ("/a/b", "/x/b", False)])
+    assert len(items) == 2
+
+
+def test_root_directory_covers_everything():
+    _, items = _transfer_dedupe([("/", "/", True), ("/a/b", "/a/b", False)])
+    assert items == [("/", "/", True)]
+
+
+def test_can_fold_keeps_items():
+    dedupe = BatchDeduplicator(
+        ("path",), is_recursive=lambda item: True, can_fold=lambda item: item["keep"]
+    )
+    for path, keep in [("/a", False), ("/a/b", True), ("/a/c", False)]:
+        dedupe.add({"path": path, "keep": keep})
+    assert [item["path"] for item in dedupe] == ["/a", "/a/c"]
+
+
+@pytest.mark.parametrize("depth", [10, 5000])
+def test_deep_paths(depth):
+    dedupe = BatchDeduplicator(("path",), is_recursive=lambda item: False)
+    path = "/d" * depth
+    dedupe.add({"path": path})
+    dedupe.add({"path": path + "/"})
+    assert [item["path"] for item in dedupe] == [path]
+
+
+def test_many_items_for_one_path():
+    lines = [("/a/file", f"/x/{i}", False) for i in range(20000)]
+    dedupe, items = _transfer_dedupe(lines + lines[:100])
+    assert items == lines
+    assert (dedupe.item_count, dedupe.duplicate_count) == (20000, 100)
+
+
+def test_first_paths_are_kept_as_given():
+    dedupe, items = _transfer_dedupe(
+        [("/a/b/", "/x/", True), ("/a/b/c", "/x/c", False), ("a", "/y", False)]
+    )
+    assert items == [("/a/b/", "/x/", True), ("a", "/y", False)]
+    assert dedupe.folded_count == 1
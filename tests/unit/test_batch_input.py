@@ -0,0 +1,185 @@
+import io
+import random
+import shlex
+
+import click
+import pytest
+
+from globus_cli.parsing import (
+    BatchLineParser,
+    TaskPath,
+    mutex_option_group,
+    resolve_task_path,
+)
+from globus_cli.parsing.batch_input import split_batch_line
+
+
+def _transfer_parser(source_base=None, dest_base=None):
+    return BatchLineParser(
+        ("source_path", "dest_path"),
+        flags={"--recursive": "recursive", "-r": "recursive"},
+        options={"--external-checksum": "external_checksum"},
+        convert={
+            "source_path": lambda p: resolve_task_path(p, source_base),
+            "dest_path": lambda p: resolve_task_path(p, dest_base),
+        },
+        mutex=("--recursive", "--external-checksum"),
+    )
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "abc /def\n",
+        "  a\tb  \r\n",
+        "'with space' b\n",
+        'a "b c" # comment\n',
+        "a\\ b c\n",
+        "# only a comment\n",
+        "a b#c\n",
+        "a\x0bb c\n",
+        "été  x\n",
+        "",
+    ],
+)
+def test_split_batch_line_matches_shlex(line):
+    assert split_batch_line(line) == shlex.split(line, comments=True)
+
+
+def test_split_batch_line_matches_shlex_on_random_lines():
+    rng = random.Random(0)
+    alphabet = "ab/._-~ \t\r\x0c #'\"\\"
+    for _ in range(5000):
+        line = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        try:
+            expect = shlex.split(line, comments=True)
+        except ValueError:
+            with pytest.raises(ValueError):
+                split_batch_line(line)
+        else:
+            assert split_batch_line(line) == expect
+
+
+def test_parse_transfer_lines():
+    batch = io.StringIO(
+        "abc /def\n"
+        "\n"
+        "# a comment\n"
+        "--recursive src/ dst/\n"
+        "x -r y\n"
+        "a b --external-checksum=abc123\n"
+        "--external-checksum 456 'c d' e\n"
+        "-- -dash --recursive\n"
+    )
+    assert list(_transfer_parser("/base/", "~/").parse(batch)) == [
+        {
+            "source_path": "/base/abc",
+            "dest_path": "/def",
+            "recursive": False,
+            "external_checksum": None,
+        },
+        {
+            "source_path": "/base/src/",
+            "dest_path": "~/dst/",
+            "recursive": True,
+            "external_checksum": None,
+        },
+        {
+            "source_path": "/base/x",
+            "dest_path": "~/y",
+            "recursive": True,
+            "external_checksum": None,
+        },
+        {
+            "source_path": "/base/a",
+            "dest_path": "~/b",
+            "recursive": False,
+            "external_checksum": "abc123",
+        },
+        {
+            "source_path": "/base/c d",
+            "dest_path": "~/e",
+            "recursive": False,
+            "external_checksum": "456",
+        },
+        {
+            "source_path": "/base/-dash",
+            "dest_path": "~/--recursive",
+            "recursive": False,
+            "external_checksum": None,
+        },
+    ]
+
+
+@pytest.mark.parametrize(
+    "line, message",
+    [
+        ("a\n", "Missing argument 'DEST_PATH'."),
+        ("a b c\n", "Got unexpected extra argument (c)"),
+        ("a b --bogus\n", "No such option: --bogus"),
+        ("a b --external-checksum\n", "requires an argument"),
+        ("a b --recursive=yes\n", "does not take a value"),
+        ("a b -r --external-checksum x\n", "are mutually exclusive"),
+    ],
+)
+def test_parse_errors_give_line_number(line, message):
+    batch = io.StringIO("ok ok\n\n" + line)
+    with pytest.raises(click.UsageError) as excinfo:
+        list(_transfer_parser().parse(batch))
+    assert str(excinfo.value).startswith("--batch line 3: ")
+    assert message in str(excinfo.value)
+
+
+def test_parse_reads_incrementally():
+    class CountingStream(io.StringIO):
+        reads = 0
+
+        def readline(self, *args):
+            self.reads += 1
+            return super().readline(*args)
+
+    batch = CountingStream("".join(f"s{i} d{i}\n" for i in range(1000)))
+    lines = _transfer_parser().parse(batch)
+    assert next(lines)["source_path"] == "s0"
+    assert batch.reads == 1
+
+
+def test_parse_matches_click_command():
+    """
+    The parser gives exactly the same values as the click command which it replaced
+    """
+    lines = [
+        "abc /def",
+        "/xyz p/q/r",
+        "-r a/../b c/./d/",
+        "--external-checksum=ff 'sp ace' x",
+        "x y --recursive",
+        "a b # comment",
+    ]
+    results = []
+
+    @click.command()
+    @click.option("--external-checksum")
+    @click.option("--recursive", "-r", is_flag=True)
+    @click.argument("source_path", type=TaskPath(base_dir="/src"))
+    @click.argument("dest_path", type=TaskPath(base_dir="/dst/"))
+    @mutex_option_group("--recursive", "--external-checksum")
+    def process_batch_line(dest_path, source_path, recursive, external_checksum):
+        results.append(
+            {
+                "source_path": str(source_path),
+                "dest_path": str(dest_path),
+                "recursive": recursive,
+                "external_checksum": external_checksum,
+            }
+        )
+
+    for line in lines:
+        process_batch_line.main(
+            args=shlex.split(line, comments=True), standalone_mode=False
+        )
+
+    parsed = list(
+        _transfer_parser("/src", "/dst/").parse(io.StringIO("\n".join(lines)))
+    )
+    assert parsed == results
@@ -0,0 +1,93 @@
+import json
+
+from globus_sdk import DeleteData, TransferData
+
+from globus_cli.services.transfer import BatchSummary, CompactItemList
+from globus_cli.services.transfer.compact_items import iter_document_json
+
+SUBMISSION_ID = "c8f0ec8d-0a5b-4e5b-9a22-0bf3b8a63e1a"
+
+
+def _transfer_data(data):
+    transfer_data = TransferData(
+        None, "SRC", "DST", submission_id=SUBMISSION_ID, label="summary"
+    )
+    transfer_data["DATA"] = data
+    return transfer_data
+
+
+def _add_transfer_items(transfer_data):
+    transfer_data.add_item("/src/a/1", "/dst/a/1")
+    transfer_data.add_item("/src/a/2", "/dst/a/2")
+    transfer_data.add_item("/src/b/", "/dst/b/", recursive=True)
+    transfer_data.add_item("/src/b", "/dst/b", recursive=True)
+    transfer_data.add_item("/src/a/1", "/dst/c/1")
+
+
+def test_batch_summary_counts():
+    transfer_data = _transfer_data(BatchSummary(("source_path", "destination_path")))
+    _add_transfer_items(transfer_data)
+    summary = transfer_data["DATA"]
+    assert len(summary) == 5
+    result = summary.summarize(transfer_data.data)
+    assert result.pop("payload_bytes") > 0
+    assert result == {
+        "items": 5,
+        "recursive_items": 2,
+        "duplicate_items": 1,
+        "parent_directories": {"source_path": 2, "destination_path": 3},
+        "tasks": 1,
+        "exact": True,
+    }
+
+
+def test_batch_summary_payload_matches_encoded_document():
+    summary_data = _transfer_data(BatchSummary(("source_path", "destination_path")))
+    _add_transfer_items(summary_data)
+    full_data = _transfer_data(CompactItemList())
+    _add_transfer_items(full_data)
+
+    encoded = "".join(iter_document_json(full_data.data)).encode("utf-8")
+    summary = summary_data["DATA"].summarize(summary_data.data)
+    assert summary["payload_bytes"] == len(encoded)
+
+
+def test_batch_summary_payload_of_shards():
+    summary = BatchSummary(("path",), max_items_per_task=2)
+    delete_data = DeleteData(None, "EP", submission_id=SUBMISSION_ID, recursive=True)
+    delete_data["DATA"] = summary
+    for path in ("/a", "/b", "/c"):
+        delete_data.add_item(path)
+
+    shard_bytes = 0
+    for paths in (("/a", "/b"), ("/c",)):
+        shard = DeleteData(None, "EP", submission_id=SUBMISSION_ID, recursive=True)
+        for path in paths:
+            shard.add_item(path)
+        shard_bytes += len(json.dumps(shard.data, separators=(",", ":")))
+
+    result = summary.summarize(delete_data.data)
+    assert result["tasks"] == 2
+    assert result["payload_bytes"] == shard_bytes
+    # a recursive delete is recursive for every item
+    assert result["recursive_items"] == 3
+
+
+def test_batch_summary_estimates_large_counts():
+    summary = BatchSummary(("path",), exact_limit=100)
+    for i in range(20000):
+        summary.append({"path": f"/dir{i % 500}/file{i % 15000}"})
+    result = summary.summarize({"DATA": []})
+    assert not result["exact"]
+    # only duplicates of the first 100 distinct items are counted
+    assert result["duplicate_items"] == 100
+    assert abs(result["parent_directories"]["path"] - 500) < 25
+
+
+def test_batch_summary_unique_items_past_exact_limit():
+    summary = BatchSummary(("path",), exact_limit=100)
+    for i in range(20000):
+        summary.append({"path": f"/dir{i % 500}/file{i}"})
+    result = summary.summarize({"DATA": []})
+    assert not result["exact"]
+    assert result["duplicate_items"] == 0
@@ -0,0 +1,146 @@
+import json
+import tracemalloc
+
+import pytest
+from globus_sdk import DeleteData, TransferData
+
+from globus_cli.services.transfer import CompactItemList
+from globus_cli.services.transfer.compact_items import (
+    StreamingJSONBody,
+    _ValueColumn,
+    iter_document_json,
+)
+
+
+def _transfer_items(count):
+    data = TransferData(None, "SRC", "DST", submission_id="x")
+    for i in range(count):
+        data.add_item(
+            f"/source/project/run-{i // 100}/file-{i}.dat",
+            f"/dest/project/run-{i // 100}/file-{i}.dat",
+            recursive=i % 7 == 0,
+            external_checksum="ff" if i % 11 == 0 else None,
+            checksum_algorithm="MD5",
+        )
+    return data
+
+
+def test_items_read_back_as_added():
+    expected = list(_transfer_items(100)["DATA"])
+    compact = CompactItemList()
+    for item in expected:
+        compact.append(item)
+
+    assert len(compact) == 100
+    assert list(compact) == expected
+    assert [compact[i] for i in range(100)] == expected
+    assert compact[-1] == expected[-1]
+    assert compact[30:35] == expected[30:35]
+    with pytest.raises(IndexError):
+        compact[100]
+
+
+def test_works_in_place_of_task_data_lists():
+    data = DeleteData(None, "EP", submission_id="x")
+    data["DATA"] = CompactItemList()
+    data.add_item("/a/ü")
+    data.add_item("/a/b", additional_fields={"extra": [1, 2]})
+    data.add_item("/a/b")
+    assert list(data["DATA"]) == [
+        {"DATA_TYPE": "delete_item", "path": "/a/ü"},
+        {"DATA_TYPE": "delete_item", "path": "/a/b", "extra": [1, 2]},
+        {"DATA_TYPE": "delete_item", "path": "/a/b"},
+    ]
+
+
+@pytest.mark.parametrize("key", ["recursive", "external_checksum"])
+def test_values_keep_their_types(key):
+    compact = CompactItemList()
+    for value in (True, 1, False, 0, None, "1"):
+        compact.append({key: value})
+    assert [type(item[key]) for item in compact] == [
+        bool,
+        int,
+        bool,
+        int,
+        type(None),
+        str,
+    ]
+
+
+def test_document_json_matches_expanded_document():
+    data = _transfer_items(50)
+    expanded = json.loads(json.dumps(data.data))
+    compact = CompactItemList()
+    for item in data["DATA"]:
+        compact.append(item)
+    data["DATA"] = compact
+
+    assert json.loads("".join(iter_document_json(data.data))) == expanded
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf")])
+def test_document_json_rejects_non_json_numbers(value):
+    compact = CompactItemList()
+    compact.append({"DATA_TYPE": "delete_item", "path": "/a", "size": value})
+    with pytest.raises(ValueError):
+        "".join(iter_document_json({"DATA": compact}))
+
+
+def _measure(func):
+    tracemalloc.start()
+    try:
+        kept = func()  # noqa: F841
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def test_uses_much_less_memory_than_dicts():
+    measure = _measure
+
+    def compact():
+        data = TransferData(None, "SRC", "DST", submission_id="x")
+        data["DATA"] = CompactItemList()
+        for item in _transfer_items(2000)["DATA"]:
+            data["DATA"].append(item)
+        return data
+
+    dict_size = measure(lambda: _transfer_items(2000))
+    compact_size = measure(compact)
+    assert compact_size * 5 < dict_size
+
+
+def test_streaming_body_can_be_sent_again():
+    data = _transfer_items(200)
+    compact = CompactItemList()
+    for item in data["DATA"]:
+        compact.append(item)
+    data["DATA"] = compact
+
+    body = StreamingJSONBody(data.data, chunk_size=1024)
+    first = list(body)
+    assert len(first) > 1
+    assert all(len(chunk) >= 1024 for chunk in first[:-1])
+    assert list(body) == first
+    assert json.loads(b"".join(first))["DATA"] == list(compact)
+
+
+def test_distinct_checksums_are_not_tabled():
+    checksums = [f"{i:032x}" for i in range(2000)]
+
+    def compact():
+        items = CompactItemList()
+        for checksum in checksums:
+            items.append({"external_checksum": checksum, "checksum_algorithm": "MD5"})
+        return items
+
+    def table():
+        column = _ValueColumn()
+        for checksum in checksums:
+            column.append(checksum)
+        return column
+
+    # the checksums themselves are shared, so only the overhead is measured
+    assert _measure(compact) * 2 < _measure(table)
+    assert list(compact())[-1]["external_checksum"] == checksums[-1]
@@ -0,0 +1,97 @@
+import pytest
+
+from globus_cli.parsing import NumericComparison
+from globus_cli.services.transfer.find import FindPredicates, parse_last_modified
+
+NOW = parse_last_modified("2022-01-31 00:00:00+00:00")
+
+
+def _item(name, type="file", size=0, last_modified="2022-01-30 12:00:00+00:00"):
+    return {"name": name, "type": type, "size": size, "last_modified": last_modified}
+
+
+def test_parse_last_modified():
+    assert parse_last_modified("1970-01-02 00:00:00+00:00") == 86400
+
+
+@pytest.mark.parametrize(
+    "value, expect",
+    [
+        ("10", ("", 10)),
+        ("+1k", ("+", 1024)),
+        ("-2M", ("-", 2 * 1024**2)),
+        ("+1.5G", ("+", 1.5 * 1024**3)),
+    ],
+)
+def test_size_comparison_param(value, expect):
+    param = NumericComparison(units=NumericComparison.SIZE_UNITS)
+    assert param.convert(value, None, None) == expect
+
+
+@pytest.mark.parametrize("value", ["", "+", "1X", "++1", "1 K"])
+def test_size_comparison_param_invalid(value):
+    param = NumericComparison(units=NumericComparison.SIZE_UNITS)
+    with pytest.raises(Exception, match="is not of the form"):
+        param.convert(value, None, None)
+
+
+def test_no_conditions_match_everything():
+    predicates = FindPredicates()
+    assert predicates.matches(_item("a"), 1)
+    assert predicates.matches(_item("a/b/c", type="dir"), 3)
+    assert predicates.descend(_item("x", type="dir"), 100)
+
+
+def test_name_and_type():
+    predicates = FindPredicates(names=["*.txt", "*.csv"], types=["file"])
+    assert predicates.matches(_item("dir/a.txt"), 2)
+    assert predicates.matches(_item("b.csv"), 1)
+    assert not predicates.matches(_item("a.txt.gz"), 1)
+    # the glob only applies to the name, not the whole path
+    assert not predicates.matches(_item("x.txt/a"), 2)
+    assert not predicates.matches(_item("a.txt", type="dir"), 1)
+
+
+def test_link_type_matches_invalid_symlinks():
+    predicates = FindPredicates(types=["link"])
+    assert predicates.matches(_item("broken", type="invalid_symlink"), 1)
+    assert not predicates.matches(_item("a"), 1)
+
+
+def test_size():
+    predicates = FindPredicates(sizes=[("+", 10), ("-", 20)])
+    matching = [s for s in range(5, 25) if predicates.matches(_item("a", size=s), 1)]
+    assert matching == list(range(11, 20))
+
+
+def test_mtime():
+    recent = _item("a", last_modified="2022-01-30 12:00:00+00:00")
+    old = _item("b", last_modified="2021-12-01 00:00:00+00:00")
+    newer_than_week = FindPredicates(mtimes=[("-", 7)], now=NOW)
+    assert newer_than_week.matches(recent, 1)
+    assert not newer_than_week.matches(old, 1)
+    older_than_month = FindPredicates(mtimes=[("+", 30)], now=NOW)
+    assert older_than_month.matches(old, 1)
+    assert not older_than_month.matches(recent, 1)
+    # half a day old is "0 days" old
+    assert FindPredicates(mtimes=[("", 0)], now=NOW).matches(recent, 1)
+
+
+@pytest.mark.parametrize("last_modified", [None, "missing"])
+def test_mtime_without_modification_time(last_modified):
+    item = _item("a", last_modified=last_modified)
+    if last_modified == "missing":
+        del item["last_modified"]
+    for sign in ("+", "-", ""):
+        assert not FindPredicates(mtimes=[(sign, 0)], now=NOW).matches(item, 1)
+
+
+def test_depth_and_prune():
+    predicates = FindPredicates(min_depth=2, max_depth=3, prune=[".git"])
+    assert not predicates.matches(_item("a"), 1)
+    assert predicates.matches(_item("a/b"), 2)
+    assert not predicates.matches(_item("a/b/c/d"), 4)
+
+    assert predicates.descend(_item("a", type="dir"), 2)
+    assert not predicates.descend(_item("a", type="dir"), 3)
+    assert not predicates.descend(_item(".git", type="dir"), 1)
@@ -0,0 +1,50 @@
+import pytest
+
+from globus_cli.services.transfer.glob_expand import (
+    compile_segment,
+    has_magic,
+    split_pattern,
+)
+
+
+@pytest.mark.parametrize(
+    "segment, expect",
+    [("a*", True), ("a?b", True), ("[ab]", True), (r"a\*", False), ("abc", False)],
+)
+def test_has_magic(segment, expect):
+    assert has_magic(segment) is expect
+
+
+@pytest.mark.parametrize(
+    "segment, matches, misses",
+    [
+        ("*.txt", ["a.txt", "b.c.txt"], ["a.txt.gz", ".a.txt"]),
+        (".*", [".hidden"], ["visible"]),
+        ("file?", ["file1", "fileA"], ["file", "file10"]),
+        ("[ab]*", ["apple", "bee"], ["cat"]),
+        ("[!ab]*", ["cat"], ["apple", "bee"]),
+        ("[]]", ["]"], ["a"]),
+        (r"\*star", ["*star"], ["a star", "xstar"]),
+        ("[unclosed", ["[unclosed"], ["u"]),
+        ("a.b", ["a.b"], ["axb"]),
+    ],
+)
+def test_compile_segment(segment, matches, misses):
+    regex = compile_segment(segment)
+    assert all(regex.match(name) for name in matches)
+    assert not any(regex.match(name) for name in misses)
+
+
+@pytest.mark.parametrize(
+    "pattern, start, segments",
+    [
+        ("/data/2020-*/logs/*.tmp", "/data/", ["2020-*", "logs", "*.tmp"]),
+        ("/data/file.txt", "/data/", ["file.txt"]),
+        ("*.tmp", None, ["*.tmp"]),
+        ("/*", "/", ["*"]),
+        (r"/we\[ird\]/x*", "/we[ird]/", ["x*"]),
+        ("~/a/*/b", "~/a/", ["*", "b"]),
+    ],
+)
+def test_split_pattern(pattern, start, segments):
+    assert split_pattern(pattern) == (start, segments)
@@ -0,0 +1,87 @@
+import pytest
+
+from globus_cli.services.transfer import ListingCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def make_cache(tmp_path, clock):
+    caches = []
+
+    def func(**kwargs):
+        kwargs.setdefault("clock", clock)
+        cache = ListingCache(str(tmp_path / "cache.db"), **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield func
+    for cache in caches:
+        cache.close()
+
+
+def _listing(path, *names):
+    return {"path": path, "DATA": [{"name": n, "type": "file"} for n in names]}
+
+
+def test_cache_round_trip(make_cache):
+    cache = make_cache()
+    params = {"path": "/a/", "show_hidden": 0}
+    assert cache.get("EP", params) is None
+    cache.put("EP", params, _listing("/a/", "x"))
+    assert cache.get("EP", params) == _listing("/a/", "x")
+
+    # other params, endpoints, and namespaces are separate
+    assert cache.get("EP", {"path": "/a/", "show_hidden": 1}) is None
+    assert cache.get("EP2", params) is None
+    assert make_cache(namespace="other").get("EP", params) is None
+    # and the cache persists
+    assert make_cache().get("EP", params) == _listing("/a/", "x")
+
+
+def test_cache_ttl(make_cache, clock):
+    cache = make_cache(ttl=60)
+    cache.put("EP", {"path": "/a/"}, _listing("/a/", "x"))
+    clock.now += 59
+    assert cache.get("EP", {"path": "/a/"}) is not None
+    clock.now += 2
+    assert cache.get("EP", {"path": "/a/"}) is None
+
+
+def test_cache_mtime_mismatch(make_cache):
+    cache = make_cache()
+    cache.put("EP", {"path": "/a/"}, _listing("/a/", "x"), mtime="2020-01-01")
+    assert cache.get("EP", {"path": "/a/"}, mtime="2020-01-01") is not None
+    assert cache.get("EP", {"path": "/a/"}) is not None
+    assert cache.get("EP", {"path": "/a/"}, mtime="2021-01-01") is None
+
+
+def test_cache_refresh_does_not_read(make_cache):
+    make_cache().put("EP", {"path": "/a/"}, _listing("/a/", "x"))
+    cache = make_cache(refresh=True)
+    assert cache.get("EP", {"path": "/a/"}) is None
+    cache.put("EP", {"path": "/a/"}, _listing("/a/", "y"))
+    assert make_cache().get("EP", {"path": "/a/"}) == _listing("/a/", "y")
+
+
+def test_cache_size_eviction(make_cache, clock):
+    cache = make_cache(max_bytes=2000)
+    for i in range(100):
+        clock.now += 1
+        # unique names, so that the listings do not compress away to nothing
+        cache.put("EP", {"path": f"/{i}/"}, _listing(f"/{i}/", f"file-{i}-{i * 7919}"))
+    assert cache._total_bytes <= 2000
+    # the most recent listing is kept, and the oldest is evicted
+    assert cache.get("EP", {"path": "/99/"}) is not None
+    assert cache.get("EP", {"path": "/0/"}) is None
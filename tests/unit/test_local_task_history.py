@@ -0,0 +1,189 @@
+import datetime
+
+import pytest
+
+from globus_cli.services.transfer import TaskHistory
+from globus_cli.services.transfer.task_history import normalize_time
+
+
+def _task(n, status="SUCCEEDED", label=None, type="TRANSFER", bytes_transferred=0):
+    request_time = f"2021-03-01T00:{n // 60:02d}:{n % 60:02d}+00:00"
+    return {
+        "task_id": f"task-{n}",
+        "type": type,
+        "status": status,
+        "label": label,
+        "request_time": request_time,
+        "completion_time": None if status == "ACTIVE" else request_time,
+        "bytes_transferred": bytes_transferred,
+        "files_transferred": 1,
+    }
+
+
+class FakeTransferClient:
+    """
+    Answer task_list calls from a list of tasks, applying the filters and the
+    ordering which TaskHistory uses, and recording the filters.
+    """
+
+    def __init__(self, tasks):
+        self.tasks = tasks
+        self.filters = []
+
+    def task_list(self, *, limit, filter, query_params):
+        self.filters.append(dict(filter))
+        field, _ = query_params["orderby"].split()
+
+        def matches(task):
+            for key, value in filter.items():
+                if key in ("request_time", "completion_time"):
+                    start = value.rstrip(",")
+                    if task[key] is None or normalize_time(task[key]) < start:
+                        return False
+                elif task[key] not in value.split(","):
+                    return False
+            return True
+
+        found = sorted(
+            (dict(t) for t in self.tasks if matches(t)), key=lambda t: t[field]
+        )
+        return found[:limit]
+
+
+@pytest.fixture
+def history(tmp_path):
+    with TaskHistory(str(tmp_path / "history.db")) as history:
+        yield history
+
+
+def test_first_sync_fetches_everything(history):
+    client = FakeTransferClient([_task(n) for n in range(3)])
+    assert history.sync(client) == {"new": 3, "updated": 0, "api_calls": 1}
+    assert client.filters == [{"type": "TRANSFER,DELETE"}]
+    assert len(history) == 3
+
+
+def test_sync_only_fetches_new_tasks_when_none_are_active(history):
+    client = FakeTransferClient([_task(n) for n in range(3)])
+    history.sync(client)
+    client.tasks.append(_task(3))
+    client.filters = []
+
+    assert history.sync(client) == {"new": 1, "updated": 0, "api_calls": 1}
+    assert client.filters == [
+        {"type": "TRANSFER,DELETE", "request_time": "2021-03-01 00:00:02,"}
+    ]
+
+
+def test_sync_refreshes_active_tasks(history):
+    client = FakeTransferClient(
+        [_task(0), _task(1, "ACTIVE"), _task(2, "ACTIVE"), _task(3)]
+    )
+    history.sync(client)
+    # one active task finishes, the other makes progress
+    client.tasks[1] = dict(_task(1, "FAILED"), completion_time="2021-03-01T01:00:00")
+    client.tasks[2] = _task(2, "ACTIVE", bytes_transferred=100)
+    client.filters = []
+
+    assert history.sync(client) == {"new": 0, "updated": 2, "api_calls": 3}
+    assert client.filters[1:] == [
+        {
+            "type": "TRANSFER,DELETE",
+            "status": "ACTIVE,INACTIVE",
+            "request_time": "2021-03-01 00:00:01,",
+        },
+        {"type": "TRANSFER,DELETE", "completion_time": "2021-03-01 00:00:03,"},
+    ]
+    assert history.summarize("status") == [
+        {
+            "status": "ACTIVE",
+            "tasks": 1,
+            "bytes_transferred": 100,
+            "files_transferred": 1,
+        },
+        {
+            "status": "FAILED",
+            "tasks": 1,
+            "bytes_transferred": 0,
+            "files_transferred": 1,
+        },
+        {
+            "status": "SUCCEEDED",
+            "tasks": 2,
+            "bytes_transferred": 0,
+            "files_transferred": 2,
+        },
+    ]
+
+
+def test_sync_pages_through_windows(history, monkeypatch):
+    monkeypatch.setattr("globus_cli.services.transfer.task_history.SYNC_PAGE_SIZE", 4)
+    client = FakeTransferClient([_task(n) for n in range(10)])
+    result = history.sync(client)
+    # each window starts at the last request_time of the window before
+    assert [f.get("request_time") for f in client.filters] == [
+        None,
+        "2021-03-01 00:00:03,",
+        "2021-03-01 00:00:06,",
+        "2021-03-01 00:00:09,",
+    ]
+    assert result["new"] == 10
+    assert len(history) == 10
+
+
+def test_tasks_filters(history):
+    history.sync(
+        FakeTransferClient(
+            [
+                _task(0, label="nightly-a"),
+                _task(1, label="Nightly-b", type="DELETE"),
+                _task(2, "FAILED", label="nightly_c"),
+                _task(3),
+            ]
+        )
+    )
+
+    def ids(**filters):
+        return [t["task_id"] for t in history.tasks(**filters)]
+
+    assert ids() == ["task-3", "task-2", "task-1", "task-0"]
+    assert ids(limit=1) == ["task-3"]
+    assert ids(statuses=["FAILED"]) == ["task-2"]
+    assert ids(types=["DELETE"]) == ["task-1"]
+    assert ids(labels=["nightly-*"]) == ["task-1", "task-0"]
+    assert ids(labels=["nightly-a"], exact=True) == ["task-0"]
+    assert ids(not_labels=["*-*"]) == ["task-3", "task-2"]
+    assert ids(
+        requested_after=datetime.datetime(2021, 3, 1, 0, 0, 1),
+        requested_before=datetime.datetime(2021, 3, 1, 0, 0, 2),
+    ) == ["task-2", "task-1"]
+
+
+def test_summarize_by_day(history):
+    tasks = [_task(0, bytes_transferred=10), _task(1, bytes_transferred=5)]
+    tasks[1]["completion_time"] = "2021-03-02T01:00:00+00:00"
+    history.sync(FakeTransferClient(tasks))
+    assert history.summarize("day") == [
+        {
+            "day": "2021-03-01",
+            "tasks": 1,
+            "bytes_transferred": 10,
+            "files_transferred": 1,
+        },
+        {
+            "day": "2021-03-02",
+            "tasks": 1,
+            "bytes_transferred": 5,
+            "files_transferred": 1,
+        },
+    ]
+
+
+def test_namespaces_are_separate(tmp_path):
+    filename = str(tmp_path / "history.db")
+    with TaskHistory(filename, namespace="a") as history:
+        history.sync(FakeTransferClient([_task(0)]))
+    with TaskHistory(filename, namespace="b") as history:
+        assert len(history) == 0
+    with TaskHistory(filename, namespace="a") as history:
+        assert len(history) == 1
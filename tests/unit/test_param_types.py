@@ -3,7 +3,12 @@ import json
 import click
 
 from globus_cli.constants import EXPLICIT_NULL
-from globus_cli.parsing import CommaDelimitedList, JSONStringOrFile, StringOrNull
+from globus_cli.parsing import (
+    ByteSize,
+    CommaDelimitedList,
+    JSONStringOrFile,
+    StringOrNull,
+)
 from globus_cli.parsing.param_types.prefix_mapper import StringPrefixMapper
 
 
@@ -71,6 +76,25 @@ def test_comma_delimited_list(runner):
     assert result.output == "2\nalpha\nbeta\n"
 
 
+def test_byte_size(runner):
+    @click.command()
+    @click.option("--size", type=ByteSize())
+    def foo(size):
+        click.echo(repr(size))
+
+    result = runner.invoke(foo, ["--help"])
+    assert "--size N[KMGTP]" in result.output
+
+    for value, expect in (("100", 100), ("2k", 2048), ("1.5G", 3 * 1024**3 // 2)):
+        result = runner.invoke(foo, ["--size", value])
+        assert result.output == f"{expect}\n"
+
+    for value in ("-1", "1X", "K"):
+        result = runner.invoke(foo, ["--size", value])
+        assert result.exit_code == 2
+        assert "is not a size of the form N[KMGTP]" in result.output
+
+
 def test_string_prefix_mapper(runner, tmpdir):
     class MyType(StringPrefixMapper):
         __prefix_mapping__ = {"bar:": "prefix_mapper_parse_bar"}
@@ -0,0 +1,45 @@
+import pytest
+
+from globus_cli.services.polling import PollingSchedule, task_progress
+
+
+def test_fixed_schedule():
+    schedule = PollingSchedule(3)
+    assert not schedule.adaptive
+    assert [schedule.next_interval("same", remaining=1) for _ in range(3)] == [3, 3, 3]
+
+
+def test_adaptive_schedule_backs_off_to_ceiling():
+    schedule = PollingSchedule(1, max_interval=10)
+    assert schedule.adaptive
+    assert [schedule.next_interval("same") for _ in range(6)] == [1, 2, 4, 8, 10, 10]
+
+
+def test_adaptive_schedule_snaps_back_on_progress():
+    schedule = PollingSchedule(2, max_interval=60, backoff=3)
+    waits = [schedule.next_interval(progress) for progress in (0, 0, 0, 1, 1)]
+    assert waits == [2, 6, 18, 2, 6]
+
+
+def test_adaptive_schedule_stops_at_timeout():
+    schedule = PollingSchedule(1, max_interval=60)
+    assert [schedule.next_interval("same", remaining=r) for r in (5, 4, 2)] == [
+        1,
+        2,
+        2,
+    ]
+
+
+def test_ceiling_below_interval_is_fixed():
+    assert not PollingSchedule(5, max_interval=5).adaptive
+
+
+def test_bad_interval():
+    with pytest.raises(ValueError):
+        PollingSchedule(0)
+
+
+def test_task_progress():
+    task = {"status": "ACTIVE", "subtasks_pending": 3, "bytes_transferred": 10}
+    assert task_progress(task) != task_progress(dict(task, bytes_transferred=11))
+    assert task_progress(task) == task_progress(dict(task, label="unrelated"))
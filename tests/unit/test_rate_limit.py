@@ -0,0 +1,128 @@
+import globus_sdk
+import pytest
+import responses
+
+from globus_cli.services.rate_limit import (
+    AdaptiveRateLimiter,
+    RateLimiter,
+    TokenBucketRateLimiter,
+    build_rate_limiter,
+)
+from globus_cli.services.transfer import CustomTransferClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def sleeps(monkeypatch, clock):
+    calls = []
+
+    def mock_sleep(seconds):
+        calls.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr("time.sleep", mock_sleep)
+    return calls
+
+
+def test_token_bucket_allows_burst_then_limits(clock, sleeps):
+    limiter = TokenBucketRateLimiter(2, burst=3, clock=clock)
+    for _ in range(3):
+        limiter.acquire()
+    assert sleeps == []
+
+    limiter.acquire()
+    assert sleeps == [pytest.approx(0.5)]
+
+
+def test_token_bucket_refills_over_time(clock, sleeps):
+    limiter = TokenBucketRateLimiter(10, burst=1, clock=clock)
+    limiter.acquire()
+    clock.now += 1
+    limiter.acquire()
+    assert sleeps == []
+
+
+def test_token_bucket_respects_retry_after(clock, sleeps):
+    limiter = TokenBucketRateLimiter(100, clock=clock)
+    limiter.observe(0.1, 429, retry_after=7)
+    limiter.acquire()
+    assert sleeps == [pytest.approx(7)]
+
+
+def test_adaptive_limiter_increases_on_fast_success(clock):
+    limiter = AdaptiveRateLimiter(10, max_rate=12, increase=1, clock=clock)
+    for _ in range(5):
+        limiter.observe(0.1, 200)
+    assert limiter.rate == 12
+
+
+@pytest.mark.parametrize("status, latency", [(429, 0.1), (503, 0.1), (200, 30)])
+def test_adaptive_limiter_decreases_on_throttle_or_slow_response(
+    clock, status, latency
+):
+    limiter = AdaptiveRateLimiter(
+        10, min_rate=4, decrease_factor=0.5, target_latency=5, clock=clock
+    )
+    limiter.observe(latency, status)
+    assert limiter.rate == 5
+    limiter.observe(latency, status)
+    assert limiter.rate == 4
+
+
+def test_adaptive_limiter_ignores_client_errors(clock):
+    limiter = AdaptiveRateLimiter(10, clock=clock)
+    limiter.observe(0.1, 404)
+    assert limiter.rate == 10
+
+
+@pytest.mark.parametrize(
+    "strategy, rate, expect_type, expect_rate",
+    [
+        ("none", None, RateLimiter, None),
+        ("fixed", None, TokenBucketRateLimiter, 25),
+        ("fixed", 3, TokenBucketRateLimiter, 3),
+        ("ADAPTIVE", None, AdaptiveRateLimiter, 25),
+        ("adaptive", 5, AdaptiveRateLimiter, 5),
+    ],
+)
+def test_build_rate_limiter(strategy, rate, expect_type, expect_rate):
+    limiter = build_rate_limiter(strategy, rate)
+    assert type(limiter) is expect_type
+    if expect_rate is not None:
+        assert limiter.rate == expect_rate
+
+
+def test_transfer_client_paces_requests_by_default():
+    assert type(CustomTransferClient().rate_limiter) is AdaptiveRateLimiter
+
+
+def test_transfer_client_feeds_responses_to_limiter(clock, sleeps):
+    responses.add(
+        responses.GET,
+        "https://transfer.api.globus.org/v0.10/operation/endpoint/EP/ls",
+        status=429,
+        headers={"Retry-After": "4"},
+        json={"code": "RateLimited", "message": "slow down"},
+    )
+    client = CustomTransferClient()
+    client.rate_limiter = AdaptiveRateLimiter(10, clock=clock)
+
+    with pytest.raises(globus_sdk.TransferAPIError):
+        client.operation_ls("EP")
+    assert client.rate_limiter.rate == 5
+
+    with pytest.raises(globus_sdk.TransferAPIError):
+        client.operation_ls("EP")
+    assert sleeps == [pytest.approx(4)]
@@ -0,0 +1,659 @@
+import itertools
+import json
+import threading
+
+import pytest
+
+from globus_cli.services.transfer import (
+    CheckpointMismatchError,
+    ListingCache,
+    RecursiveLsCheckpoint,
+    RecursiveLsResponse,
+)
+from globus_cli.services.transfer.disk_usage import iter_disk_usage
+from globus_cli.services.transfer.recursive_ls_frontier import (
+    SpillingFrontier,
+    SpillingQueue,
+)
+
+# a small filesystem tree, as a mapping of absolute paths to directory contents
+FILESYSTEM = {
+    "/": ["a/", "b/", "top.txt"],
+    "/a/": ["a1/", "a2/", "a.txt"],
+    "/a/a1/": ["deep/", "a1.txt"],
+    "/a/a1/deep/": ["deep.txt"],
+    "/a/a2/": [],
+    "/b/": ["b1/", "b.txt"],
+    "/b/b1/": ["b1.txt"],
+}
+
+
+class FakeResponse(dict):
+    @property
+    def data(self):
+        return self
+
+
+class FakeTransferClient:
+    def __init__(self, filesystem):
+        self.filesystem = filesystem
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def operation_ls(self, endpoint_id, **params):
+        path = params.get("path", "/")
+        if not path.endswith("/"):
+            path += "/"
+        with self._lock:
+            self.calls.append(dict(params))
+        return FakeResponse(
+            path=path,
+            DATA=[
+                {"name": x.rstrip("/"), "type": "dir" if x.endswith("/") else "file"}
+                for x in self.filesystem[path]
+            ],
+        )
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr("time.sleep", lambda x: None)
+
+
+def _names(response):
+    return [x["name"] for x in response]
+
+
+def _listed_paths(client):
+    return sorted(c["path"].rstrip("/") + "/" for c in client.calls)
+
+
+def test_serial_listing_order():
+    client = FakeTransferClient(FILESYSTEM)
+    res = RecursiveLsResponse(client, "EP", {"path": "/"}, max_depth=10)
+    assert _names(res) == [
+        "a",
+        "b",
+        "top.txt",
+        "a/a1",
+        "a/a2",
+        "a/a.txt",
+        "a/a1/deep",
+        "a/a1/a1.txt",
+        "a/a1/deep/deep.txt",
+        "b/b1",
+        "b/b.txt",
+        "b/b1/b1.txt",
+    ]
+
+
+def _fan_out_filesystem(depth, width):
+    """A tree in which every directory above ``depth`` has ``width`` subdirs."""
+    filesystem = {}
+
+    def add(path, level):
+        names = [f"d{i}/" for i in range(width)] if level < depth else []
+        filesystem[path] = names + ["f.txt"]
+        for name in names:
+            add(path + name, level + 1)
+
+    add("/", 0)
+    return filesystem
+
+
+def test_ordered_concurrent_prefetch_is_bounded(monkeypatch):
+    filesystem = _fan_out_filesystem(depth=5, width=3)
+    peak = 0
+    real_prefetch = RecursiveLsResponse._prefetch
+
+    def recording_prefetch(self, executor, dir_queue, prefetched):
+        nonlocal peak
+        real_prefetch(self, executor, dir_queue, prefetched)
+        peak = max(peak, len(prefetched))
+
+    monkeypatch.setattr(RecursiveLsResponse, "_prefetch", recording_prefetch)
+    serial = _names(
+        RecursiveLsResponse(
+            FakeTransferClient(filesystem), "EP", {"path": "/"}, max_depth=10
+        )
+    )
+    ordered = _names(
+        RecursiveLsResponse(
+            FakeTransferClient(filesystem),
+            "EP",
+            {"path": "/"},
+            max_depth=10,
+            parallelism=3,
+            ordered=True,
+        )
+    )
+    assert ordered == serial
+    # the prefetched listings do not grow with the depth of the tree
+    assert peak <= 6
+
+
+@pytest.mark.parametrize("parallelism", [2, 4, 16])
+def test_concurrent_listing_finds_all_items(parallelism):
+    serial = _names(
+        RecursiveLsResponse(
+            FakeTransferClient(FILESYSTEM), "EP", {"path": "/"}, max_depth=10
+        )
+    )
+    client = FakeTransferClient(FILESYSTEM)
+    concurrent = _names(
+        RecursiveLsResponse(
+            client, "EP", {"path": "/"}, max_depth=10, parallelism=parallelism
+        )
+    )
+    assert sorted(concurrent) == sorted(serial)
+    # every directory is listed exactly once
+    assert _listed_paths(client) == sorted(FILESYSTEM)
+
+
+@pytest.mark.parametrize("parallelism", [2, 3, 16])
+def test_ordered_concurrent_listing_matches_serial(parallelism):
+    serial = _names(
+        RecursiveLsResponse(
+            FakeTransferClient(FILESYSTEM), "EP", {"path": "/"}, max_depth=10
+        )
+    )
+    ordered = _names(
+        RecursiveLsResponse(
+            FakeTransferClient(FILESYSTEM),
+            "EP",
+            {"path": "/"},
+            max_depth=10,
+            parallelism=parallelism,
+            ordered=True,
+        )
+    )
+    assert ordered == serial
+
+
+@pytest.mark.parametrize("parallelism", [1, 4])
+def test_depth_limit_is_respected(parallelism):
+    client = FakeTransferClient(FILESYSTEM)
+    names = _names(
+        RecursiveLsResponse(
+            client, "EP", {"path": "/"}, max_depth=1, parallelism=parallelism
+        )
+    )
+    assert "a/a1" in names
+    assert "a/a1/a1.txt" not in names
+    assert _listed_paths(client) == ["/", "/a/", "/b/"]
+
+
+@pytest.mark.parametrize("parallelism", [1, 4])
+def test_filter_removed_after_first(parallelism):
+    client = FakeTransferClient(FILESYSTEM)
+    params = {"path": "/", "filter": "name:~*"}
+    list(
+        RecursiveLsResponse(
+            client,
+            "EP",
+            params,
+            max_depth=10,
+            filter_after_first=False,
+            parallelism=parallelism,
+        )
+    )
+    assert [c for c in client.calls if "filter" in c] == [params]
+
+
+def test_invalid_parallelism():
+    with pytest.raises(ValueError):
+        RecursiveLsResponse(FakeTransferClient(FILESYSTEM), "EP", {}, parallelism=0)
+
+
+class FlakyTransferClient(FakeTransferClient):
+    """A fake client which fails on its Nth call"""
+
+    def __init__(self, filesystem, fail_on_call):
+        super().__init__(filesystem)
+        self.fail_on_call = fail_on_call
+
+    def operation_ls(self, endpoint_id, **params):
+        if len(self.calls) + 1 == self.fail_on_call:
+            self.calls.append(None)
+            raise ConnectionError("network went away")
+        return super().operation_ls(endpoint_id, **params)
+
+
+@pytest.mark.parametrize("fail_on_call", [1, 2, 4, 7])
+@pytest.mark.parametrize("parallelism", [1, 3])
+def test_checkpoint_resume_after_failure(tmp_path, fail_on_call, parallelism):
+    expect = _names(
+        RecursiveLsResponse(
+            FakeTransferClient(FILESYSTEM), "EP", {"path": "/"}, max_depth=10
+        )
+    )
+    filename = str(tmp_path / "checkpoint")
+
+    seen = []
+    with RecursiveLsCheckpoint(filename) as checkpoint:
+        with pytest.raises(ConnectionError):
+            for item in RecursiveLsResponse(
+                FlakyTransferClient(FILESYSTEM, fail_on_call),
+                "EP",
+                {"path": "/"},
+                max_depth=10,
+                parallelism=parallelism,
+                checkpoint=checkpoint,
+            ):
+                seen.append(item["name"])
+
+    client = FakeTransferClient(FILESYSTEM)
+    with RecursiveLsCheckpoint(filename, resume=True) as checkpoint:
+        seen.extend(
+            _names(
+                RecursiveLsResponse(
+                    client,
+                    "EP",
+                    {"path": "/"},
+                    max_depth=10,
+                    parallelism=parallelism,
+                    checkpoint=checkpoint,
+                )
+            )
+        )
+        assert checkpoint.completed
+
+    # everything is seen, and only directories which were not done when the
+    # failure happened are listed again
+    assert set(seen) == set(expect)
+    assert len(client.calls) <= len(FILESYSTEM) - fail_on_call + parallelism
+
+
+def test_checkpoint_resume_of_completed_listing(tmp_path):
+    filename = str(tmp_path / "checkpoint")
+    with RecursiveLsCheckpoint(filename) as checkpoint:
+        list(
+            RecursiveLsResponse(
+                FakeTransferClient(FILESYSTEM),
+                "EP",
+                {"path": "/"},
+                checkpoint=checkpoint,
+            )
+        )
+
+    client = FakeTransferClient(FILESYSTEM)
+    with RecursiveLsCheckpoint(filename, resume=True) as checkpoint:
+        res = RecursiveLsResponse(client, "EP", {"path": "/"}, checkpoint=checkpoint)
+        assert list(res) == []
+    assert client.calls == []
+
+
+def test_checkpoint_from_older_version_is_rejected(tmp_path):
+    filename = tmp_path / "checkpoint"
+    settings = {
+        "endpoint_id": "EP",
+        "ls_params": {"path": "/"},
+        "max_depth": 3,
+        "filter_after_first": True,
+    }
+    # version 1 queue entries had no modification time
+    filename.write_text(
+        json.dumps({"version": 1, "settings": settings})
+        + "\n"
+        + json.dumps({"done": "", "queued": [["/a/", "a", 1]]})
+        + "\n"
+    )
+
+    client = FakeTransferClient(FILESYSTEM)
+    with RecursiveLsCheckpoint(str(filename), resume=True) as checkpoint:
+        with pytest.raises(CheckpointMismatchError, match="unsupported version 1"):
+            RecursiveLsResponse(client, "EP", {"path": "/"}, checkpoint=checkpoint)
+    assert client.calls == []
+
+
+def test_checkpoint_ignores_torn_final_record(tmp_path):
+    filename = tmp_path / "checkpoint"
+    with RecursiveLsCheckpoint(str(filename)) as checkpoint:
+        list(
+            RecursiveLsResponse(
+                FakeTransferClient(FILESYSTEM),
+                "EP",
+                {"path": "/"},
+                checkpoint=checkpoint,
+            )
+        )
+    # drop the "complete" record, and tear the last "done" record in half
+    lines = filename.read_text().splitlines(keepends=True)
+    filename.write_text("".join(lines[:-2]) + lines[-2][:10])
+
+    client = FakeTransferClient(FILESYSTEM)
+    with RecursiveLsCheckpoint(str(filename), resume=True) as checkpoint:
+        names = _names(
+            RecursiveLsResponse(client, "EP", {"path": "/"}, checkpoint=checkpoint)
+        )
+    assert names == ["b/b1/b1.txt"]
+    # the file is fully parseable again after resuming
+    assert filename.read_text().endswith('{"complete":true}\n')
+
+
+def test_checkpoint_settings_mismatch(tmp_path):
+    filename = str(tmp_path / "checkpoint")
+    with RecursiveLsCheckpoint(filename) as checkpoint:
+        RecursiveLsResponse(
+            FakeTransferClient(FILESYSTEM), "EP", {"path": "/"}, checkpoint=checkpoint
+        )
+
+    with RecursiveLsCheckpoint(filename, resume=True) as checkpoint:
+        with pytest.raises(CheckpointMismatchError):
+            RecursiveLsResponse(
+                FakeTransferClient(FILESYSTEM),
+                "EP",
+                {"path": "/a/"},
+                checkpoint=checkpoint,
+            )
+
+
+def test_frontier_spills_and_keeps_stack_order(tmp_path):
+    entries = [(f"/{i}/", str(i), 1, None) for i in range(1000)]
+    with SpillingFrontier(10, spill_dir=str(tmp_path)) as frontier:
+        for i in range(0, 1000, 100):
+            frontier.extend(entries[i : i + 100])
+            assert len(frontier._memory) <= 10
+        assert len(frontier) == 1000
+        assert len(list(tmp_path.iterdir())) == 1
+
+        assert frontier.peek(3) == entries[-1:-4:-1]
+        popped = []
+        while frontier:
+            popped.append(frontier.pop())
+            assert len(frontier._memory) <= 10
+        assert popped == entries[::-1]
+    # the spill file is removed on close
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_frontier_peek_reads_back_spilled_entries():
+    entries = [(f"/{i}/", str(i), 1, None) for i in range(20)]
+    with SpillingFrontier(4) as frontier:
+        frontier.extend(entries)
+        assert frontier.peek(8) == entries[-1:-9:-1]
+        assert len(frontier) == 20
+
+
+def test_queue_spills_and_keeps_fifo_order(tmp_path):
+    entries = [(f"/{i}/", str(i), 1, None) for i in range(1000)]
+    with SpillingQueue(10, spill_dir=str(tmp_path)) as queue:
+        popped = []
+        for i in range(0, 1000, 100):
+            queue.extend(entries[i : i + 100])
+            assert len(queue._memory) <= 10
+            # interleave pops with pushes, as a traversal does
+            popped.extend(queue.pop() for _ in range(50))
+        assert len(queue) == 500
+        assert len(list(tmp_path.iterdir())) == 1
+
+        assert queue.peek(3) == entries[500:503]
+        while queue:
+            popped.append(queue.pop())
+            assert len(queue._memory) <= 10
+        assert popped == entries
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("parallelism, ordered", [(1, False), (3, True), (3, False)])
+def test_wide_tree_listing_with_small_frontier(parallelism, ordered):
+    filesystem = {"/": [f"d{i}/" for i in range(200)]}
+    filesystem.update({f"/d{i}/": [f"f{i}.txt"] for i in range(200)})
+
+    def listing(**kwargs):
+        return _names(
+            RecursiveLsResponse(
+                FakeTransferClient(filesystem),
+                "EP",
+                {"path": "/"},
+                parallelism=parallelism,
+                ordered=ordered,
+                **kwargs,
+            )
+        )
+
+    expect = listing()
+    spilled = listing(frontier_memory_limit=8)
+    assert len(spilled) == 400
+    if ordered or parallelism == 1:
+        assert spilled == expect
+    else:
+        assert sorted(spilled) == sorted(expect)
+
+
+def test_listing_cache_is_used_and_checks_mtime(tmp_path):
+    filesystem = {
+        "/": [("a/", "2020-01-01"), ("b/", "2020-01-01")],
+        "/a/": [("a.txt", "2020-01-01")],
+        "/b/": [("b.txt", "2020-01-01")],
+    }
+
+    class MtimeTransferClient(FakeTransferClient):
+        def operation_ls(self, endpoint_id, **params):
+            path = params["path"].rstrip("/") + "/"
+            self.calls.append(path)
+            return FakeResponse(
+                path=path,
+                DATA=[
+                    {
+                        "name": name.rstrip("/"),
+                        "type": "dir" if name.endswith("/") else "file",
+                        "last_modified": mtime,
+                    }
+                    for name, mtime in self.filesystem[path]
+                ],
+            )
+
+    def listing(client, cache, **kwargs):
+        return sorted(
+            _names(
+                RecursiveLsResponse(client, "EP", {"path": "/"}, cache=cache, **kwargs)
+            )
+        )
+
+    filename = str(tmp_path / "cache.db")
+    with ListingCache(filename) as cache:
+        client = MtimeTransferClient(filesystem)
+        expect = listing(client, cache)
+        assert len(client.calls) == 3
+
+        client = MtimeTransferClient(filesystem)
+        assert listing(client, cache) == expect
+        assert client.calls == []
+
+        # "b" is modified, and the top dir is listed again
+        filesystem["/"][1] = ("b/", "2021-01-01")
+        filesystem["/b/"].append(("new.txt", "2021-01-01"))
+        with ListingCache(filename, refresh=True) as refresh_cache:
+            listing(MtimeTransferClient(filesystem), refresh_cache, max_depth=0)
+
+        # so the cached listing of "b" is stale, but "a" is still good
+        client = MtimeTransferClient(filesystem)
+        assert "b/new.txt" in listing(client, cache)
+        assert client.calls == ["/b/"]
+
+
+@pytest.mark.parametrize("parallelism", [1, 4])
+def test_disk_usage_totals(parallelism):
+    sizes = {
+        "top.txt": 1,
+        "a.txt": 10,
+        "a1.txt": 100,
+        "deep.txt": 1000,
+        "b.txt": 5,
+        "b1.txt": 50,
+    }
+
+    class SizedTransferClient(FakeTransferClient):
+        def operation_ls(self, endpoint_id, **params):
+            res = super().operation_ls(endpoint_id, **params)
+            for item in res["DATA"]:
+                item["size"] = sizes.get(item["name"], 4096)
+            return res
+
+    res = RecursiveLsResponse(
+        SizedTransferClient(FILESYSTEM),
+        "EP",
+        {"path": "/"},
+        max_depth=10,
+        parallelism=parallelism,
+    )
+    totals = list(iter_disk_usage(res.listings()))
+    by_path = {t["path"]: (t["size"], t["files"], t["directories"]) for t in totals}
+    assert by_path == {
+        "": (1166, 6, 6),
+        "a": (1110, 3, 3),
+        "a/a1": (1100, 2, 1),
+        "a/a1/deep": (1000, 1, 0),
+        "a/a2": (0, 0, 0),
+        "b": (55, 2, 1),
+        "b/b1": (50, 1, 0),
+    }
+    # children come before their parents, and the top dir is last
+    paths = [t["path"] for t in totals]
+    for path in paths:
+        if path:
+            parent = path.rsplit("/", 1)[0] if "/" in path else ""
+            assert paths.index(path) < paths.index(parent)
+    assert paths[-1] == ""
+
+
+def test_disk_usage_max_depth():
+    res = RecursiveLsResponse(
+        FakeTransferClient(FILESYSTEM), "EP", {"path": "/"}, max_depth=10
+    )
+    paths = [t["path"] for t in iter_disk_usage(res.listings(), max_depth=1)]
+    assert sorted(paths) == ["", "a", "b"]
+
+
+BFS_ORDER = [
+    "a",
+    "b",
+    "top.txt",
+    "a/a1",
+    "a/a2",
+    "a/a.txt",
+    "b/b1",
+    "b/b.txt",
+    "a/a1/deep",
+    "a/a1/a1.txt",
+    "b/b1/b1.txt",
+    "a/a1/deep/deep.txt",
+]
+
+
+@pytest.mark.parametrize("parallelism, ordered", [(1, False), (3, True)])
+@pytest.mark.parametrize("frontier_memory_limit", [2, 100])
+def test_bfs_listing_order(parallelism, ordered, frontier_memory_limit):
+    client = FakeTransferClient(FILESYSTEM)
+    res = RecursiveLsResponse(
+        client,
+        "EP",
+        {"path": "/"},
+        max_depth=10,
+        traversal="bfs",
+        parallelism=parallelism,
+        ordered=ordered,
+        frontier_memory_limit=frontier_memory_limit,
+    )
+    assert _names(res) == BFS_ORDER
+    assert _listed_paths(client) == sorted(FILESYSTEM)
+
+
+@pytest.mark.parametrize("parallelism", [1, 3])
+def test_iddfs_listing_order(parallelism):
+    client = FakeTransferClient(FILESYSTEM)
+    res = RecursiveLsResponse(
+        client,
+        "EP",
+        {"path": "/"},
+        max_depth=10,
+        traversal="iddfs",
+        parallelism=parallelism,
+    )
+    assert _names(res) == BFS_ORDER
+    # upper levels are listed again on each pass, one pass per level
+    assert len(client.calls) == 1 + 3 + 6 + 7
+
+
+def test_iddfs_respects_depth_limit():
+    client = FakeTransferClient(FILESYSTEM)
+    res = RecursiveLsResponse(
+        client, "EP", {"path": "/"}, max_depth=1, traversal="iddfs"
+    )
+    assert _names(res) == BFS_ORDER[:8]
+    assert len(client.calls) == 1 + 3
+
+
+def test_iddfs_listings_work_with_disk_usage():
+    res = RecursiveLsResponse(
+        FakeTransferClient(FILESYSTEM),
+        "EP",
+        {"path": "/"},
+        max_depth=10,
+        traversal="iddfs",
+    )
+    totals = {doc["path"]: doc["files"] for doc in iter_disk_usage(res.listings())}
+    assert totals[""] == 6
+    assert totals["a"] == 3
+
+
+def test_iddfs_cannot_be_checkpointed(tmp_path):
+    with RecursiveLsCheckpoint(str(tmp_path / "checkpoint")) as checkpoint:
+        with pytest.raises(ValueError):
+            RecursiveLsResponse(
+                FakeTransferClient(FILESYSTEM),
+                "EP",
+                {"path": "/"},
+                traversal="iddfs",
+                checkpoint=checkpoint,
+            )
+
+
+def test_frontier_extend_from_generator_stays_bounded():
+    with SpillingFrontier(10) as frontier:
+        peak = 0
+
+        def entries():
+            nonlocal peak
+            for i in range(1000):
+                peak = max(peak, len(frontier._memory))
+                yield (f"/{i}/", str(i), 1, None)
+
+        frontier.extend(entries())
+        assert len(frontier) == 1000
+        assert peak <= 20
+        assert frontier.pop() == ("/999/", "999", 1, None)
+
+
+def test_checkpoint_resume_of_wide_tree_with_small_frontier(tmp_path):
+    filesystem = {"/": [f"d{i}/" for i in range(200)]}
+    filesystem.update({f"/d{i}/": [f"f{i}.txt"] for i in range(200)})
+    expect = _names(RecursiveLsResponse(FakeTransferClient(filesystem), "EP", {}))
+    filename = str(tmp_path / "checkpoint")
+
+    with RecursiveLsCheckpoint(filename) as checkpoint:
+        res = RecursiveLsResponse(
+            FakeTransferClient(filesystem), "EP", {}, checkpoint=checkpoint
+        )
+        # stop after the root and two of its subdirectories are done
+        seen = []
+        for _, items, _ in itertools.islice(res.listings(), 4):
+            seen.extend(item["name"] for item in items)
+
+    with RecursiveLsCheckpoint(filename, resume=True) as checkpoint:
+        seen.extend(
+            _names(
+                RecursiveLsResponse(
+                    FakeTransferClient(filesystem),
+                    "EP",
+                    {},
+                    checkpoint=checkpoint,
+                    frontier_memory_limit=8,
+                )
+            )
+        )
+        assert checkpoint.completed
+    # everything is seen, with at most the directory in progress listed twice
+    assert set(seen) == set(expect)
+    assert len(seen) <= len(expect) + 1
@@ -0,0 +1,97 @@
+import http.server
+import json
+import threading
+
+import pytest
+import responses
+from globus_sdk import DeleteData, TransferData
+
+from globus_cli.services.transfer import CompactItemList, CustomTransferClient
+
+
+class _TaskSubmitHandler(http.server.BaseHTTPRequestHandler):
+    """
+    A stand-in for the Transfer API, which records the headers and body of each
+    request, decoding chunked bodies, and accepts it as a task.
+    """
+
+    def do_POST(self):
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+                if not size:
+                    break
+            body = b"".join(chunks)
+        else:
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            chunks = None
+        self.server.requests.append((self.path, dict(self.headers), body, chunks))
+
+        response = json.dumps({"code": "Accepted", "task_id": "TASK"}).encode()
+        self.send_response(202)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def transfer_server():
+    server = http.server.HTTPServer(("127.0.0.1", 0), _TaskSubmitHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_port}/"
+    responses.add_passthru(base_url)
+    yield server, base_url
+    server.shutdown()
+    server.server_close()
+
+
+def _compact_transfer_data(client, count):
+    data = TransferData(client, "SRC", "DST", submission_id="SUBMISSION")
+    data["DATA"] = CompactItemList()
+    for i in range(count):
+        data.add_item(f"/src/dir/file-{i}", f"/dst/dir/file-{i}")
+    return data
+
+
+def test_large_submissions_are_streamed(transfer_server):
+    server, base_url = transfer_server
+    client = CustomTransferClient(base_url=base_url)
+
+    data = _compact_transfer_data(client, 5000)
+    res = client.submit_transfer(data)
+    assert res["task_id"] == "TASK"
+
+    ((path, headers, body, chunks),) = server.requests
+    assert path.endswith("/transfer")
+    assert headers["Transfer-Encoding"] == "chunked"
+    assert "Content-Length" not in headers
+    assert headers["Content-Type"] == "application/json"
+    # the document went out in several chunks, not one copy of the whole body
+    assert len(chunks) > 2
+    document = json.loads(body)
+    assert document["submission_id"] == "SUBMISSION"
+    assert document["DATA"] == list(data["DATA"])
+
+
+def test_small_submissions_have_a_content_length(transfer_server):
+    server, base_url = transfer_server
+    client = CustomTransferClient(base_url=base_url)
+
+    data = DeleteData(client, "EP", submission_id="SUBMISSION")
+    data["DATA"] = CompactItemList()
+    data.add_item("/a")
+    client.submit_delete(data)
+
+    ((path, headers, body, _),) = server.requests
+    assert path.endswith("/delete")
+    assert "Transfer-Encoding" not in headers
+    assert json.loads(body)["DATA"] == [{"DATA_TYPE": "delete_item", "path": "/a"}]
@@ -0,0 +1,126 @@
+import json
+
+import pytest
+from globus_sdk import DeleteData
+
+from globus_cli.services.transfer import (
+    JournalMismatchError,
+    SubmissionJournal,
+    TaskShards,
+)
+
+SETTINGS = {"command": "delete", "endpoint": "EP", "max_items_per_task": 2}
+
+
+class FakeTransferClient:
+    def __init__(self):
+        self.next_id = 0
+        self.submitted = []
+
+    def get_submission_id(self):
+        self.next_id += 1
+        return {"value": f"submission-{self.next_id}"}
+
+    def submit_delete(self, data):
+        self.submitted.append(data["submission_id"])
+        return {"task_id": f"task-for-{data['submission_id']}"}
+
+
+def _submit(client, journal, paths):
+    shards = TaskShards(
+        lambda submission_id: DeleteData(client, "EP", submission_id=submission_id),
+        client.submit_delete,
+        2,
+        get_submission_id=lambda: client.get_submission_id()["value"],
+        journal=journal,
+    )
+    entries = []
+    for path in paths:
+        entries.extend(shards.add_item(path))
+    return entries + shards.flush()
+
+
+def _records(filename):
+    with open(filename) as fp:
+        return [json.loads(line) for line in fp]
+
+
+def test_journal_records_shards_and_acks(tmp_path):
+    filename = str(tmp_path / "journal")
+    with SubmissionJournal(filename) as journal:
+        journal.start(SETTINGS)
+        _submit(FakeTransferClient(), journal, ["a", "b", "c"])
+
+    header, *records = _records(filename)
+    assert header == {"version": 1, "settings": SETTINGS}
+    shards = [r for r in records if "shard" in r]
+    assert [(r["shard"], r["first_item"], r["items"]) for r in shards] == [
+        (1, 0, 2),
+        (2, 2, 1),
+    ]
+    acks = sorted((r["ack"], r["task_id"]) for r in records if "ack" in r)
+    assert acks == [(1, "task-for-submission-1"), (2, "task-for-submission-2")]
+
+
+def test_resume_submits_only_unacknowledged_shards(tmp_path):
+    filename = str(tmp_path / "journal")
+    with SubmissionJournal(filename) as journal:
+        journal.start(SETTINGS)
+        _submit(FakeTransferClient(), journal, ["a", "b", "c", "d"])
+    # drop the acknowledgement of the second shard, as if we died before it
+    lines = (tmp_path / "journal").read_text().splitlines(keepends=True)
+    (tmp_path / "journal").write_text(
+        "".join(line for line in lines if '"ack":2' not in line)
+    )
+
+    client = FakeTransferClient()
+    client.next_id = 100
+    with SubmissionJournal(filename, resume=True) as journal:
+        journal.start(SETTINGS)
+        entries = _submit(client, journal, ["a", "b", "c", "d", "e"])
+
+    # shard 2 is sent again with its own submission ID, and shard 3 is new
+    assert client.submitted == ["submission-2", "submission-101"]
+    assert [(e["shard"], e["task_id"]) for e in entries] == [
+        (1, "task-for-submission-1"),
+        (2, "task-for-submission-2"),
+        (3, "task-for-submission-101"),
+    ]
+
+
+def test_resume_ignores_a_torn_final_line(tmp_path):
+    filename = str(tmp_path / "journal")
+    with SubmissionJournal(filename) as journal:
+        journal.start(SETTINGS)
+        _submit(FakeTransferClient(), journal, ["a", "b"])
+    with open(filename, "a") as fp:
+        fp.write('{"shard":2,"submiss')
+
+    client = FakeTransferClient()
+    with SubmissionJournal(filename, resume=True) as journal:
+        journal.start(SETTINGS)
+        _submit(client, journal, ["a", "b", "c"])
+    assert client.submitted == ["submission-1"]
+    assert (tmp_path / "journal").read_text().endswith("}\n")
+
+
+def test_resume_with_different_settings_fails(tmp_path):
+    filename = str(tmp_path / "journal")
+    with SubmissionJournal(filename) as journal:
+        journal.start(SETTINGS)
+    with pytest.raises(JournalMismatchError, match="different settings"):
+        SubmissionJournal(filename, resume=True).start(
+            dict(SETTINGS, max_items_per_task=3)
+        )
+
+
+def test_resume_with_different_items_fails(tmp_path):
+    filename = str(tmp_path / "journal")
+    with SubmissionJournal(filename) as journal:
+        journal.start(SETTINGS)
+        _submit(FakeTransferClient(), journal, ["a", "b"])
+
+    with SubmissionJournal(filename, resume=True) as journal:
+        journal.start(SETTINGS)
+        with pytest.raises(JournalMismatchError, match="batch items 1 to 2"):
+            _submit(FakeTransferClient(), journal, ["a", "x"])
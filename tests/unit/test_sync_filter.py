@@ -0,0 +1,100 @@
+import pytest
+
+from globus_cli.services.transfer import SyncPrefilter
+from tests.unit.test_tree_diff import FakeTransferClient
+
+OLD = "2020-01-01 00:00:00+00:00"
+NEW = "2020-06-01 00:00:00+00:00"
+
+SOURCE = {
+    "/src/": {"same.txt": (4, OLD), "new.txt": (1, NEW), "newer.txt": (3, NEW)},
+    "/src/a/": {"resized.txt": (5, OLD), "same.txt": (2, OLD)},
+}
+DEST = {
+    "/dst/": {"same.txt": (4, OLD), "newer.txt": (3, OLD), "new.txt": "dir"},
+    "/dst/a/": {"resized.txt": (6, OLD), "same.txt": (2, OLD)},
+}
+
+
+def _item(source_path, dest_path, **kwargs):
+    return dict(source_path=source_path, destination_path=dest_path, **kwargs)
+
+
+def _prefilter(client, sync_level="mtime", **kwargs):
+    return SyncPrefilter(client, "SRC", "DST", sync_level=sync_level, **kwargs)
+
+
+def test_sync_prefilter_skips_unchanged_files():
+    client = FakeTransferClient({"SRC": SOURCE, "DST": DEST})
+    prefilter = _prefilter(client)
+    items = [
+        _item("/src/same.txt", "/dst/same.txt"),
+        _item("/src/new.txt", "/dst/new.txt"),
+        _item("/src/newer.txt", "/dst/newer.txt"),
+        _item("/src/a/resized.txt", "/dst/a/resized.txt"),
+        _item("/src/a/same.txt", "/dst/a/same.txt"),
+        _item("/src/a/same.txt", "/dst/b/same.txt"),
+    ]
+    kept = list(prefilter.filter(items))
+    assert [item["source_path"] for item in kept] == [
+        "/src/new.txt",
+        "/src/newer.txt",
+        "/src/a/resized.txt",
+        "/src/a/same.txt",
+    ]
+    assert kept[-1]["destination_path"] == "/dst/b/same.txt"
+    assert (prefilter.skipped_count, prefilter.skipped_bytes) == (2, 6)
+    # each directory is only listed once
+    assert sorted(client.calls) == [
+        ("DST", "/dst/"),
+        ("DST", "/dst/a/"),
+        ("DST", "/dst/b/"),
+        ("SRC", "/src/"),
+        ("SRC", "/src/a/"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "sync_level, up_to_date",
+    [("exists", True), ("size", True), ("mtime", False)],
+)
+def test_sync_prefilter_sync_levels(sync_level, up_to_date):
+    client = FakeTransferClient({"SRC": SOURCE, "DST": DEST})
+    prefilter = _prefilter(client, sync_level=sync_level)
+    assert prefilter.is_up_to_date("/src/newer.txt", "/dst/newer.txt") is up_to_date
+
+
+@pytest.mark.parametrize(
+    "source_mtime, dest_mtime", [(None, OLD), (OLD, None), (None, None)]
+)
+def test_sync_prefilter_keeps_files_without_mtime(source_mtime, dest_mtime):
+    source = {"/src/": {"f.txt": (1, source_mtime)}}
+    dest = {"/dst/": {"f.txt": (1, dest_mtime)}}
+    prefilter = _prefilter(FakeTransferClient({"SRC": source, "DST": dest}))
+    assert not prefilter.is_up_to_date("/src/f.txt", "/dst/f.txt")
+
+
+def test_sync_prefilter_keeps_recursive_and_checksum_items():
+    client = FakeTransferClient({"SRC": SOURCE, "DST": DEST})
+    prefilter = _prefilter(client)
+    items = [
+        _item("/src/a/", "/dst/a/", recursive=True),
+        _item("/src/same.txt", "/dst/same.txt", external_checksum="abc"),
+        _item("/src/same.txt", "/dst/same.txt", recursive=False),
+    ]
+    assert list(prefilter.filter(items)) == items[:2]
+    assert prefilter.skipped_count == 1
+
+
+def test_sync_prefilter_evicts_old_listings():
+    client = FakeTransferClient({"SRC": SOURCE, "DST": DEST})
+    prefilter = _prefilter(client, max_listings=2)
+    for _ in range(2):
+        assert prefilter.is_up_to_date("/src/same.txt", "/dst/same.txt")
+        assert prefilter.is_up_to_date("/src/a/same.txt", "/dst/a/same.txt")
+    assert len(client.calls) == 8
+
+
+def test_sync_prefilter_rejects_checksum_sync_level():
+    with pytest.raises(ValueError):
+        _prefilter(FakeTransferClient({}), sync_level="checksum")
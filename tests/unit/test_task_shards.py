@@ -0,0 +1,171 @@
+import itertools
+import threading
+
+import globus_sdk
+import pytest
+import requests
+from globus_sdk import DeleteData
+
+from globus_cli.services.transfer import TaskShards
+
+
+class FakeTransferClient:
+    def __init__(self, failures=()):
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._failures = list(failures)
+        self.submitted = []
+        self.submission_id_count = 0
+
+    def get_submission_id(self):
+        self.submission_id_count += 1
+        return {"value": f"submission-{next(self._ids)}"}
+
+    def submit_delete(self, data):
+        with self._lock:
+            self.submitted.append((data["submission_id"], data["DATA"][0]["path"]))
+            if self._failures:
+                raise self._failures.pop(0)
+        return {"task_id": f"task-{data['DATA'][0]['path']}"}
+
+
+def _api_error(status):
+    response = requests.Response()
+    response.status_code = status
+    response.headers["Content-Type"] = "application/json"
+    response._content = b'{"code": "Error", "message": "failed"}'
+    response.request = requests.Request("POST", "https://example.org/").prepare()
+    return globus_sdk.TransferAPIError(response)
+
+
+def _shards(client, max_items, **kwargs):
+    return TaskShards(
+        lambda submission_id: DeleteData(client, "EP", submission_id=submission_id),
+        client.submit_delete,
+        max_items,
+        get_submission_id=lambda: client.get_submission_id()["value"],
+        **kwargs,
+    )
+
+
+def _submit_all(shards, paths):
+    entries = []
+    for path in paths:
+        entries.extend(shards.add_item(path))
+    return entries + shards.flush()
+
+
+def test_shards_are_submitted_as_they_fill():
+    client = FakeTransferClient()
+    shards = _shards(client, 2)
+
+    assert _submit_all(shards, ["a", "b", "c"]) == [
+        {
+            "shard": 1,
+            "task_id": "task-a",
+            "submission_id": "submission-1",
+            "items": 2,
+        },
+        {
+            "shard": 2,
+            "task_id": "task-c",
+            "submission_id": "submission-2",
+            "items": 1,
+        },
+    ]
+    assert client.submitted == [("submission-1", "a"), ("submission-2", "c")]
+    assert (shards.shard_count, shards.item_count) == (2, 3)
+
+
+def test_flush_without_items_submits_nothing():
+    client = FakeTransferClient()
+    shards = _shards(client, 2)
+    assert len(_submit_all(shards, ["a", "b"])) == 1
+    assert len(client.submitted) == 1
+
+
+def test_parallel_submissions_keep_shard_order():
+    client = FakeTransferClient()
+    release = threading.Event()
+    submit = client.submit_delete
+
+    def slow_first_submit(data):
+        # the first shard completes last
+        if data["DATA"][0]["path"] == "p0":
+            release.wait(timeout=5)
+        return submit(data)
+
+    client.submit_delete = slow_first_submit
+    shards = _shards(client, 1, parallelism=3)
+
+    entries = []
+    for i in range(3):
+        entries.extend(shards.add_item(f"p{i}"))
+    # nothing is done until the first shard is
+    assert entries == []
+    release.set()
+    entries.extend(shards.flush())
+
+    assert [entry["task_id"] for entry in entries] == ["task-p0", "task-p1", "task-p2"]
+    assert [entry["shard"] for entry in entries] == [1, 2, 3]
+
+
+@pytest.mark.parametrize("shard_count, items", [(1, 1), (1, 3), (2, 4), (2, 6)])
+def test_no_submission_id_is_fetched_for_a_task_after_the_last(shard_count, items):
+    client = FakeTransferClient()
+    shards = _shards(client, 3)
+    _submit_all(shards, [f"p{i}" for i in range(items)])
+    assert shards.shard_count == shard_count
+    # an ID is fetched ahead of time only after a full task, which the last
+    # task is only when the items fill it exactly
+    assert client.submission_id_count == shard_count + (items % 3 == 0)
+
+
+def test_retries_reuse_the_submission_id():
+    client = FakeTransferClient(failures=[_api_error(507)])
+    shards = _shards(client, 1, retry_delay=0)
+    (entry,) = _submit_all(shards, ["a"])
+
+    assert entry["task_id"] == "task-a"
+    assert client.submitted == [("submission-1", "a"), ("submission-1", "a")]
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        ValueError("bad"),
+        _api_error(400),
+        # the transport retries these itself
+        _api_error(502),
+        globus_sdk.NetworkError("connection reset", ConnectionError()),
+    ],
+)
+def test_other_errors_are_not_retried(error):
+    client = FakeTransferClient(failures=[error])
+    shards = _shards(client, 1, retry_delay=0)
+    with pytest.raises(type(error)):
+        _submit_all(shards, ["a"])
+    assert len(client.submitted) == 1
+
+
+def test_close_returns_in_flight_submissions():
+    client = FakeTransferClient()
+    release = threading.Event()
+    submit = client.submit_delete
+
+    def blocked_submit(data):
+        release.wait(timeout=5)
+        return submit(data)
+
+    client.submit_delete = blocked_submit
+    shards = _shards(client, 1, parallelism=2)
+    assert shards.add_item("a") == []
+    release.set()
+    assert [entry["task_id"] for entry in shards.close()] == ["task-a"]
+
+
+@pytest.mark.parametrize("kwargs", [{"max_items": 0}, {"parallelism": 0}])
+def test_limits_must_be_positive(kwargs):
+    kwargs = dict({"max_items": 1}, **kwargs)
+    with pytest.raises(ValueError):
+        _shards(FakeTransferClient(), **kwargs)
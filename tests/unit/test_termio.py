@@ -1,8 +1,12 @@
+import json
 import os
 
+import click
+import jmespath
 import pytest
 
-from globus_cli.termio import term_is_interactive
+from globus_cli.parsing.command_state import CommandState
+from globus_cli.termio import formatted_print, term_is_interactive
 
 
 @pytest.mark.parametrize(
@@ -30,3 +34,50 @@ def test_term_interactive(ps1, force_flag, expect, monkeypatch):
         monkeypatch.delitem(os.environ, "GLOBUS_CLI_INTERACTIVE", raising=False)
 
     assert term_is_interactive() == expect
+
+
+def _jsonl_context(jmespath_expr=None):
+    state = CommandState()
+    state.output_format = "jsonl"
+    if jmespath_expr is not None:
+        state.jmespath_expr = jmespath.compile(jmespath_expr)
+    return click.Context(click.Command("test"), obj=state)
+
+
+def test_jsonl_output_streams_items(capsys):
+    printed_before_each_item = []
+
+    def items():
+        for i in range(3):
+            printed_before_each_item.append(capsys.readouterr().out)
+            yield {"name": f"item{i}", "size": i}
+
+    with _jsonl_context():
+        formatted_print(items(), json_converter=lambda x: {"DATA": list(x)})
+
+    # each item was printed before the next one was generated
+    assert printed_before_each_item == [
+        "",
+        '{"name":"item0","size":0}\n',
+        '{"name":"item1","size":1}\n',
+    ]
+    assert capsys.readouterr().out == '{"name":"item2","size":2}\n'
+
+
+def test_jsonl_output_single_document_and_jmespath(capsys):
+    with _jsonl_context(jmespath_expr="name"):
+        formatted_print({"name": "foo", "size": 1})
+        formatted_print([{"name": "bar"}, {"name": "baz"}])
+    assert [json.loads(x) for x in capsys.readouterr().out.splitlines()] == [
+        "foo",
+        "bar",
+        "baz",
+    ]
+
+
+def test_jsonl_output_rejects_whole_document_jmespath():
+    with _jsonl_context(jmespath_expr="DATA[].name"):
+        with pytest.raises(click.UsageError, match="cannot use 'DATA'"):
+            formatted_print(iter([{"name": "bar"}]))
+        # a single document can still be queried as a whole
+        formatted_print({"DATA": [{"name": "foo"}]})
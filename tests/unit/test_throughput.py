@@ -0,0 +1,70 @@
+import pytest
+
+from globus_cli.services.throughput import ThroughputMonitor
+
+
+def _task(bytes_transferred, status="ACTIVE", **kwargs):
+    return dict(status=status, bytes_transferred=bytes_transferred, **kwargs)
+
+
+def test_first_sample_uses_effective_rate():
+    monitor = ThroughputMonitor()
+    sample = monitor.sample(_task(1000, effective_bytes_per_second=50), now=10.0)
+    assert sample["instantaneous_bytes_per_second"] is None
+    assert sample["smoothed_bytes_per_second"] == 50
+    assert sample["elapsed_seconds"] == 0
+    assert sample["eta_seconds"] is None
+
+
+def test_first_sample_ignores_zero_effective_rate():
+    monitor = ThroughputMonitor()
+    monitor.sample(_task(0, effective_bytes_per_second=0), now=0.0)
+    sample = monitor.sample(_task(1000), now=10.0)
+    assert sample["smoothed_bytes_per_second"] == 100
+
+
+def test_instantaneous_rate_between_snapshots():
+    monitor = ThroughputMonitor()
+    monitor.sample(_task(0), now=0.0)
+    sample = monitor.sample(_task(1000), now=10.0)
+    assert sample["instantaneous_bytes_per_second"] == 100
+    # with nothing to smooth against, the average starts at the first rate
+    assert sample["smoothed_bytes_per_second"] == 100
+    assert sample["elapsed_seconds"] == 10
+
+
+def test_smoothed_rate_halves_weight_per_half_life():
+    monitor = ThroughputMonitor(half_life=10)
+    monitor.sample(_task(0), now=0.0)
+    monitor.sample(_task(1000), now=10.0)
+    # 200 B/s for one half-life moves the average halfway from 100 to 200
+    sample = monitor.sample(_task(3000), now=20.0)
+    assert sample["instantaneous_bytes_per_second"] == 200
+    assert sample["smoothed_bytes_per_second"] == pytest.approx(150)
+
+
+def test_snapshot_without_elapsed_time_keeps_rates():
+    monitor = ThroughputMonitor()
+    monitor.sample(_task(0), now=0.0)
+    monitor.sample(_task(1000), now=10.0)
+    sample = monitor.sample(_task(2000), now=10.0)
+    assert sample["instantaneous_bytes_per_second"] is None
+    assert sample["smoothed_bytes_per_second"] == 100
+
+
+def test_eta_from_total_bytes():
+    monitor = ThroughputMonitor(total_bytes=5000)
+    monitor.sample(_task(0), now=0.0)
+    assert monitor.sample(_task(1000), now=10.0)["eta_seconds"] == 40
+    assert monitor.sample(_task(5000), now=20.0)["eta_seconds"] == 0
+
+
+def test_eta_of_finished_tasks():
+    monitor = ThroughputMonitor(total_bytes=5000)
+    assert monitor.sample(_task(5000, "SUCCEEDED"), now=0.0)["eta_seconds"] == 0
+    assert monitor.sample(_task(10, "FAILED"), now=1.0)["eta_seconds"] is None
+
+
+def test_half_life_must_be_positive():
+    with pytest.raises(ValueError):
+        ThroughputMonitor(half_life=0)
@@ -0,0 +1,153 @@
+import json
+import threading
+
+import globus_sdk
+import pytest
+import requests
+
+from globus_cli.services.transfer import TreeDiff
+
+OLD = "2020-01-01 00:00:00+00:00"
+NEW = "2020-06-01 00:00:00+00:00"
+
+SOURCE = {
+    "/src/": {"a": "dir", "b": "dir", "same.txt": (4, OLD), "new.txt": (1, NEW)},
+    "/src/a/": {"resized.txt": (5, OLD), "newer.txt": (3, NEW), "older.txt": (3, OLD)},
+    "/src/b/": {"b.txt": (7, OLD)},
+}
+DEST = {
+    "/dst/": {"a": "dir", "same.txt": (4, OLD), "extra.txt": (2, OLD), "x": "dir"},
+    "/dst/a/": {"resized.txt": (6, OLD), "newer.txt": (3, OLD), "older.txt": (3, NEW)},
+}
+
+
+def _not_found():
+    response = requests.Response()
+    response.status_code = 404
+    response.headers["Content-Type"] = "application/json"
+    response._content = json.dumps(
+        {"code": "ClientError.NotFound", "message": "Directory not found"}
+    ).encode()
+    response.request = requests.Request("GET", "https://example.org").prepare()
+    return globus_sdk.TransferAPIError(response)
+
+
+class FakeTransferClient:
+    def __init__(self, filesystems):
+        self.filesystems = filesystems
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def operation_ls(self, endpoint_id, **params):
+        path = params["path"].rstrip("/") + "/"
+        with self._lock:
+            self.calls.append((endpoint_id, path))
+        contents = self.filesystems[endpoint_id].get(path)
+        if contents is None:
+            raise _not_found()
+        data = []
+        for name, info in contents.items():
+            if info == "dir":
+                data.append({"name": name, "type": "dir", "size": 4096})
+            else:
+                data.append(
+                    {
+                        "name": name,
+                        "type": "file",
+                        "size": info[0],
+                        "last_modified": info[1],
+                    }
+                )
+        return {"path": path, "DATA": data}
+
+
+def _diff(client, dest_path="/dst", **kwargs):
+    return TreeDiff(
+        client, "SRC", {"path": "/src"}, "DST", {"path": dest_path}, **kwargs
+    )
+
+
+def _statuses(tree_diff):
+    return sorted((d["status"], d["path"]) for d in tree_diff)
+
+
+def test_tree_diff_mtime():
+    client = FakeTransferClient({"SRC": SOURCE, "DST": DEST})
+    tree_diff = _diff(client)
+    assert _statuses(tree_diff) == [
+        ("added", "b"),
+        ("added", "b/b.txt"),
+        ("added", "new.txt"),
+        ("changed", "a/newer.txt"),
+        ("changed", "a/resized.txt"),
+        ("missing", "extra.txt"),
+        ("missing", "x"),
+    ]
+    assert tree_diff.summary == {
+        "added": {"files": 2, "bytes": 8},
+        "changed": {"files": 2, "bytes": 8},
+        "missing": {"files": 1, "bytes": 2},
+        "conflict": {"files": 0, "bytes": 0},
+    }
+    # directories only on the destination, or only on the source, are not listed
+    # on the destination
+    assert ("DST", "/dst/x/") not in client.calls
+    assert ("DST", "/dst/b/") not in client.calls
+
+
+@pytest.mark.parametrize(
+    "sync_level, changed",
+    [("exists", []), ("size", ["a/resized.txt"])],
+)
+def test_tree_diff_sync_levels(sync_level, changed):
+    client = FakeTransferClient({"SRC": SOURCE, "DST": DEST})
+    tree_diff = _diff(client, sync_level=sync_level)
+    assert [d["path"] for d in tree_diff if d["status"] == "changed"] == changed
+
+
+def test_tree_diff_missing_destination_root():
+    client = FakeTransferClient({"SRC": SOURCE, "DST": DEST})
+    docs = list(_diff(client, dest_path="/nowhere"))
+    assert {d["status"] for d in docs} == {"added"}
+    assert len(docs) == 8
+
+
+def test_tree_diff_parallel_matches_serial():
+    serial = _statuses(_diff(FakeTransferClient({"SRC": SOURCE, "DST": DEST})))
+    parallel = _statuses(
+        _diff(FakeTransferClient({"SRC": SOURCE, "DST": DEST}), parallelism=4)
+    )
+    assert parallel == serial
+
+
+def test_tree_diff_reports_type_conflicts():
+    source = {"/src/": {"d": "dir", "f": (1, OLD)}, "/src/d/": {"x.txt": (1, OLD)}}
+    dest = {"/dst/": {"d": (2, OLD), "f": "dir"}, "/dst/f/": {"y.txt": (1, OLD)}}
+    client = FakeTransferClient({"SRC": source, "DST": dest})
+    tree_diff = _diff(client)
+    assert _statuses(tree_diff) == [
+        ("added", "d/x.txt"),
+        ("conflict", "d"),
+        ("conflict", "f"),
+    ]
+    assert tree_diff.summary["missing"] == {"files": 0, "bytes": 0}
+    # the destination file is not listed as though it were a directory
+    assert ("DST", "/dst/d/") not in client.calls
+
+
+def test_tree_diff_with_spilling_frontier():
+    source = {"/src/": {f"d{i}": "dir" for i in range(20)}}
+    source.update({f"/src/d{i}/": {"f.txt": (1, NEW)} for i in range(20)})
+    dest = {"/dst/": {f"d{i}": "dir" for i in range(20)}}
+    dest.update({f"/dst/d{i}/": {"f.txt": (1, OLD)} for i in range(20)})
+    for parallelism in (1, 3):
+        client = FakeTransferClient({"SRC": source, "DST": dest})
+        tree_diff = _diff(client, parallelism=parallelism, frontier_memory_limit=4)
+        assert _statuses(tree_diff) == sorted(
+            ("changed", f"d{i}/f.txt") for i in range(20)
+        )
+
+
+def test_tree_diff_rejects_unknown_sync_level():
+    with pytest.raises(ValueError):
+        _diff(FakeTransferClient({"SRC": SOURCE, "DST": DEST}), sync_level="checksum")
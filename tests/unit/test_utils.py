@@ -1,4 +1,6 @@
-from globus_cli.utils import format_list_of_words, format_plural_str
+import pytest
+
+from globus_cli.utils import format_list_of_words, format_plural_str, format_size
 
 
 def test_format_word_list():
@@ -16,3 +18,18 @@ def test_format_plural_str():
     wordforms = {"this": "these", "command": "commands"}
     assert format_plural_str(fmt, wordforms, True) == "you need to run these commands"
     assert format_plural_str(fmt, wordforms, False) == "you need to run this command"
+
+
+@pytest.mark.parametrize(
+    "num_bytes, expect",
+    [
+        (0, "0"),
+        (1023, "1023"),
+        (1536, "1.5K"),
+        (10 * 1024, "10K"),
+        (5 * 1024**3 + 1, "5.0G"),
+        (2048 * 1024**5, "2048P"),
+    ],
+)
+def test_format_size(num_bytes, expect):
+    assert format_size(num_bytes) == expect